@@ -1,378 +1,1097 @@
-'''
-===================================================
-IMPORT EU ALEXA AUDIENCE DATA FROM CDW
-
-Ticket: https://adgear.atlassian.net/browse/SAI-5824
-Setup: https://adgear.atlassian.net/wiki/spaces/MAST/pages/19742589039/Python+Setup+on+Windows+Machine
-github: https://github.com/lhaynes-ss/Tickets/blob/main/alexa_eu.py
-runtime: ~1 minute
-
-Regions
-    - DE (Germany)
-    - GB (United Kingdom)
-
-s3 Locations: 
-    - s3://adgear-etl-audience-planner/remotefiles/udw/230912_[de|gb]_alexa_register_last_45_230912to231231.csv
-    - s3://adgear-etl-audience-planner/remotefiles/udw/220601_[de|gb]_alexa_10per_control.csv
-
-UDW Tables: 
-    - udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_[de|gb]_alexa_current_day
-    - udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_[de|gb]_alexa_last_45_registers
-    - udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_[de|gb]_alexa_new_control
-    - udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_[de|gb]_alexa_new_segment
-===================================================
-'''
-
-
-# import packages
-import datetime
-from datetime import date
-from datetime import datetime, timedelta
-import psycopg2
-import pandas as pd
-import snowflake.connector
-from snowflake.connector.pandas_tools import write_pandas
-import configparser
-from pathlib import Path
-
-
-
-# get config
-config = configparser.ConfigParser()
-config_path = Path('C:\\Users\\l.haynes\\Documents\\Samsung\\R&D\\alexa_eu\\config.ini')
-config.read(config_path)
-
-
-start_timestamp = datetime.now()
-
-#================================================================
-# START OPEN DB CONNECTIONS
-#================================================================
-
-cdw_conn = psycopg2.connect(
-    dbname = config["personalAccountEU"]["dbname"],
-    host = config["personalAccountEU"]["host"],
-    port = config["personalAccountEU"]["port"],
-    user = config["personalAccountEU"]["user"],
-    password = config["personalAccountEU"]["password"])
-cdw_cur = cdw_conn.cursor()
-print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> CDW connected")
-
-
-udw_conn = snowflake.connector.connect(
-    user = config["serviceAccount"]["user"],
-    password = config["serviceAccount"]["password"],
-    account = config["serviceAccount"]["account"],
-    warehouse = config["serviceAccount"]["warehouse"],
-    database = config["serviceAccount"]["database"],
-    schema = config["serviceAccount"]["schema"]
-)
-udw_cur = udw_conn.cursor()
-
-udw_cur.execute("USE ROLE UDW_CLIENTSOLUTIONS_REPORTING_MAINTAINER_ROLE_PROD;")
-udw_cur.execute("USE DATABASE UDW_PROD;")
-udw_cur.execute("USE WAREHOUSE UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD_MEDIUM;")
-udw_cur.execute("USE SCHEMA UDW_CLIENTSOLUTIONS_CS;")
-
-print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> UDW NA connected. UDW environment set up.")
-
-#================================================================
-# END OPEN DB CONNECTIONS
-#================================================================
-
-
-
-def yesterday_start_YYYYMMDDHH():
-    r = datetime.today() - timedelta(days = 1)
-    result = r.strftime('%Y-%m-%d').replace('-', '')
-    return result + '00'
-
-def yesterday_end_YYYYMMDDHH():
-    r = datetime.today() - timedelta(days = 1)
-    result = r.strftime('%Y-%m-%d').replace('-', '')
-    return result + '23'
-
-def fourtyfive_ago_YYYYMMDDHH():
-    period = datetime.today() - timedelta(days = 45)
-    period_ago = period.strftime('%Y-%m-%d').replace('-', '')
-    return period_ago + '23'
-
-yesterday_start = yesterday_start_YYYYMMDDHH()
-yesterday_end = yesterday_end_YYYYMMDDHH()
-fourfive_days_ago = fourtyfive_ago_YYYYMMDDHH()
-
-
-
-
-countries = ['DE','GB']
-
-for c in countries:
-
-    #=================================
-    # Copy data from CDW
-    #=================================
-    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Copying data from CDW to UDW...")
-
-    c_lower = c.lower()
-
-    # TABLES:
-    # udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_de_alexa_last_45_registers(psid VARCHAR(556));
-    # udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_gb_alexa_last_45_registers(psid VARCHAR(556));
-
-    # get registrations from last 45 days from CDW
-    query_eu_last_45_registers = f'''
-        DROP TABLE IF EXISTS last_45_registers;
-        CREATE TEMP TABLE last_45_registers AS (
-            SELECT DISTINCT  psid 
-            FROM data_kpi_src.fact_voice t
-            WHERE 
-                partition_country = '{c}'
-                AND category IN ('EV110')
-                AND payload_exe_goal IN ('LOGIN_ACTIVATETV')
-                AND payload_appid = 'com.samsung.tv.alexa-client'
-                AND partition_date BETWEEN '{fourfive_days_ago}' AND '{yesterday_end}'
-        );
-
-        SELECT * FROM last_45_registers;
-    '''
-
-    # capture last 45 day registrations from CDW
-    df_last_45_registers = pd.read_sql(query_eu_last_45_registers, con = cdw_conn)
-
-    # QUIRK!!! columns must be uppercase or error is thrown
-    df_last_45_registers.columns = map(lambda x: str(x).upper(), df_last_45_registers.columns)
-
-    # write last 45 day registrations to UDW
-    write_pandas(
-        conn        = udw_conn,                             # db connection
-        df          = df_last_45_registers,                 # pandas dataframe (data)
-        table_name  = f'CDW_{c}_ALEXA_LAST_45_REGISTERS',   # table to copy data into
-        schema      = 'UDW_CLIENTSOLUTIONS_CS',             # schema to use
-        overwrite   = True                                  # append data to table or overwrite it?
-    )
-
-
-    # TABLES:
-    # udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_de_alexa_current_day(psid VARCHAR(556));
-    # udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_gb_alexa_current_day(psid VARCHAR(556));
-
-    # get registrations from yesterday from CDW
-    query_eu_current_day = f'''
-        DROP TABLE IF EXISTS current_day;
-        CREATE TEMP TABLE current_day AS (
-            SELECT DISTINCT psid 
-            FROM data_kpi_src.fact_voice t
-            WHERE 
-                partition_country = '{c}'
-                AND category IN ('EV110')
-                AND payload_exe_goal IN ('LOGIN_ACTIVATETV')
-                AND payload_appid = 'com.samsung.tv.alexa-client'
-                AND partition_date BETWEEN '{yesterday_start}' AND '{yesterday_end}'
-        );
-
-        SELECT * FROM current_day;
-    '''
-
-    # capture current_day registrations from CDW
-    df_current_day = pd.read_sql(query_eu_current_day, con = cdw_conn)
-
-    # QUIRK!!! columns must be uppercase or error is thrown
-    df_current_day.columns = map(lambda x: str(x).upper(), df_current_day.columns)
-
-    # write current_day registrations to UDW
-    write_pandas(
-        conn        = udw_conn,                         # db connection
-        df          = df_current_day,                   # pandas dataframe (data)
-        table_name  = f'CDW_{c}_ALEXA_CURRENT_DAY',     # table to copy data into
-        schema      = 'UDW_CLIENTSOLUTIONS_CS',         # schema to use
-        overwrite   = True                              # append data to table or overwrite it?
-    )
-
-
-    #=================================
-    # Build audience in UDW
-    #=================================
-    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Building audiences...")
-
-    # create a 10% control from current_day registrations
-    query_udw_1 = f'''
-        DROP TABLE IF EXISTS aa_seg_100;
-    '''
-
-    query_udw_1b = f'''
-        CREATE TEMP TABLE aa_seg_100 AS (
-            SELECT
-                psid,
-                NTILE(100) OVER (ORDER BY RANDOM()) rownum
-            FROM udw_prod.udw_clientsolutions_cs.cdw_{c}_alexa_current_day
-        );
-    '''
-
-    udw_cur.execute(query_udw_1)
-    udw_cur.execute(query_udw_1b)
-
-
-    query_udw_2 = f'''
-        DROP TABLE IF EXISTS control;
-    '''
-
-    query_udw_2b = f'''
-        CREATE TEMP TABLE control AS (
-            SELECT DISTINCT
-                psid
-            FROM aa_seg_100
-            WHERE
-                rownum <= 10 
-        );
-    '''
-
-    udw_cur.execute(query_udw_2)
-    udw_cur.execute(query_udw_2b)
-
-
-    # the "current control" is the previous "new control"
-    # import previous "new control" from UDW
-    query_udw_3 = f'''
-        DROP TABLE IF EXISTS current_control;
-    '''
-
-    query_udw_3b = f'''
-        CREATE TEMP TABLE current_control AS (
-            SELECT 
-                psid
-            FROM udw_prod.udw_clientsolutions_cs.cdw_{c}_alexa_new_control
-        );
-    '''
-
-    udw_cur.execute(query_udw_3)
-    udw_cur.execute(query_udw_3b)
-
-
-    # generate the new control
-    # later we will save the "new control" to s3 and UDW
-    # new control = DISTINCT (this control + previous control) 
-    query_udw_4 = f'''
-        DROP TABLE IF EXISTS new_control;
-    '''
-
-    query_udw_4b = f'''
-        CREATE TEMP TABLE new_control AS (
-            SELECT 
-                psid
-            FROM control
-            UNION
-            SELECT 
-                psid
-            FROM current_control
-        );
-    '''
-
-    udw_cur.execute(query_udw_4)
-    udw_cur.execute(query_udw_4b)
-
-
-    # "new segment" = last 45 day registrations - new control
-    # later we will save the "new segment" to s3 and UDW
-    query_udw_5 = f'''
-        DROP TABLE IF EXISTS new_seg;
-    '''
-
-    query_udw_5b = f'''
-        CREATE TEMP TABLE new_seg AS (
-            SELECT 
-                psid
-            FROM udw_prod.udw_clientsolutions_cs.cdw_{c}_alexa_last_45_registers
-            WHERE 
-                psid NOT IN (
-                    SELECT 
-                        psid
-                    FROM new_control
-                )
-        );
-    '''
-
-    udw_cur.execute(query_udw_5)
-    udw_cur.execute(query_udw_5b)
-
-
-    # save new_control to UDW
-    query_udw_6 = f'''
-        CREATE OR REPLACE TABLE udw_prod.udw_clientsolutions_cs.cdw_{c}_alexa_new_control AS (
-            SELECT psid 
-            FROM new_control
-        );
-    '''
-
-    udw_cur.execute(query_udw_6)
-
-
-    # save new segment to UDW
-    query_udw_7 = f'''
-        CREATE OR REPLACE TABLE udw_prod.udw_clientsolutions_cs.cdw_{c}_alexa_new_segment AS (
-            SELECT psid 
-            FROM new_seg
-        );
-    '''
-
-    udw_cur.execute(query_udw_7)
-
-
-
-    #=================================
-    # save new control and new segment to s3
-    #=================================
-    # Stage: AUDIENCE_PLANNER_REMOTE_FILES_UDW_S
-    # SQL to Check in DbVis: LIST @UDW_PROD.UDW_CLIENTSOLUTIONS_CS.audience_planner_remote_files_udw_s PATTERN = '.*230912_.*';
-
-    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Saving data to s3...")
-
-    # saving segment
-    query_udw_100 = f'''
-        COPY INTO  @UDW_PROD.UDW_CLIENTSOLUTIONS_CS.audience_planner_remote_files_udw_s/230912_{c_lower}_alexa_register_last_45_230912to231231.csv
-        FROM (SELECT DISTINCT psid FROM new_seg)
-        file_format = (format_name = adbiz_data.analytics_csv COMPRESSION = 'none')
-        single = TRUE
-        header = TRUE
-        overwrite = TRUE
-        max_file_size = 4900000000; 
-    '''
-
-    udw_cur.execute(query_udw_100)
-
-
-    # saving control
-    query_udw_200 = f'''
-        COPY INTO  @UDW_PROD.UDW_CLIENTSOLUTIONS_CS.audience_planner_remote_files_udw_s/220601_{c_lower}_alexa_10per_control.csv
-        FROM (SELECT DISTINCT psid FROM new_control)
-        file_format = (format_name = adbiz_data.analytics_csv COMPRESSION = 'none')
-        single = TRUE
-        header = TRUE
-        overwrite = TRUE
-        max_file_size = 4900000000; 
-    '''
-
-    udw_cur.execute(query_udw_200)
-
-
-#================================================================
-# START CLOSE DB CONNECTIONS
-#================================================================
-udw_cur.close()
-udw_conn.close()
-
-cdw_cur.close()
-cdw_conn.close()
-
-#================================================================
-# END CLOSE DB CONNECTIONS
-#================================================================
-
-
-print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Task done. All connections disconnected.")
-end_timestamp = datetime.now()
-time_used = end_timestamp - start_timestamp
-
-
-print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Total running time: ", str(time_used).split('.')[0])
-
-
+'''
+===================================================
+IMPORT EU ALEXA AUDIENCE DATA FROM CDW
+
+Ticket: https://adgear.atlassian.net/browse/SAI-5824
+Setup: https://adgear.atlassian.net/wiki/spaces/MAST/pages/19742589039/Python+Setup+on+Windows+Machine
+github: https://github.com/lhaynes-ss/Tickets/blob/main/alexa_eu.py
+runtime: ~1 minute
+
+Countries run at the same time, each in its own worker with its own CDW and
+UDW sessions (temp tables are session scoped). Workers are capped by
+alexa_max_workers under [runSettings] in config.ini. alexa_control_sampling
+under [runSettings] picks how the control is sampled (random or hash).
+alexa_audience_build under [runSettings] picks where the audiences are built:
+statements (default), procedure (one CALL of sp_alexa_register_eu_daily), or
+transfer (CDW transfer, then the task of the country is started and followed
+until it finishes, see task_alexa_register_eu_daily.sql). alexa_task_timeout_minutes
+under [runSettings] caps the wait (default 60).
+alexa_unload_parts under [runSettings] also saves each audience as that many files
+written in parallel plus a _manifest.json of the parts (0 = one file only).
+Stage timings are appended to logs/alexa_eu_run_log.jsonl next to this script.
+
+Regions
+    - DE (Germany)
+    - GB (United Kingdom)
+
+s3 Locations: 
+    - s3://adgear-etl-audience-planner/remotefiles/udw/230912_[de|gb]_alexa_register_last_45_230912to231231.csv
+    - s3://adgear-etl-audience-planner/remotefiles/udw/220601_[de|gb]_alexa_10per_control.csv
+    - with alexa_unload_parts: [file]_part_000_of_[n].csv ... and [file]_manifest.json next to [file].csv
+
+UDW Tables: 
+    - udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_eu_alexa_registers_daily (one day of registrations is added per run)
+    - udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_eu_alexa_registers_load_log (days loaded into the daily table)
+    - udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_[de|gb]_alexa_current_day
+    - udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_[de|gb]_alexa_last_45_registers (view)
+    - udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_[de|gb]_alexa_new_control
+    - udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_[de|gb]_alexa_new_segment
+===================================================
+'''
+
+
+# import packages
+import datetime
+from datetime import date
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+import psycopg2
+import pandas as pd
+import snowflake.connector
+from snowflake.connector.pandas_tools import write_pandas
+import configparser
+from pathlib import Path
+import os
+import json
+import statistics
+import threading
+import time
+import uuid
+
+
+
+# get config
+config = configparser.ConfigParser()
+config_path = Path('C:\\Users\\l.haynes\\Documents\\Samsung\\R&D\\alexa_eu\\config.ini')
+config.read(config_path)
+
+
+start_timestamp = datetime.now()
+
+
+#================================================================
+# RUN HELPERS
+#================================================================
+# small copies of the connection, region, and run log helpers of pplus_pluto_unified/local_scripts,
+# so this script runs on its own
+
+def connect_cdw(config, cdw_config):
+    '''
+    open a CDW session.
+    '''
+
+    cdw_conn = psycopg2.connect(
+        dbname = config[cdw_config]["dbname"],
+        host = config[cdw_config]["host"],
+        port = config[cdw_config]["port"],
+        user = config[cdw_config]["user"],
+        password = config[cdw_config]["password"]
+    )
+
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> CDW connected ({cdw_config})")
+
+    return cdw_conn
+
+
+def connect_udw(config, udw_config):
+    '''
+    open a UDW session and set up the UDW environment.
+    '''
+
+    udw_conn = snowflake.connector.connect(
+        user = config[udw_config]["user"],
+        password = config[udw_config]["password"],
+        account = config[udw_config]["account"],
+        warehouse = config[udw_config]["warehouse"],
+        database = config[udw_config]["database"],
+        schema = config[udw_config]["schema"]
+    )
+
+    udw_cur = udw_conn.cursor()
+    udw_cur.execute("USE ROLE UDW_CLIENTSOLUTIONS_REPORTING_MAINTAINER_ROLE_PROD;")
+    udw_cur.execute("USE DATABASE UDW_PROD;")
+    udw_cur.execute("USE WAREHOUSE UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD_MEDIUM;")
+    udw_cur.execute("USE SCHEMA UDW_CLIENTSOLUTIONS_CS;")
+    udw_cur.close()
+
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> UDW NA connected.")
+
+    return udw_conn
+
+
+def get_max_workers(config, setting):
+    '''
+    read the worker count from the [runSettings] section of config.ini (default 3).
+    '''
+
+    try:
+        return max(1, config.getint('runSettings', setting))
+    except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
+        return 3
+
+
+def run_regions(loader, jobs, max_workers):
+    '''
+    run loader for every (region_name, args) job at the same time and return one
+    result dict per region in the same order as jobs. a failed region does not stop the others.
+    '''
+
+    def run_region(region_name, args):
+        region_start = datetime.now()
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{region_name}] Region started...")
+
+        try:
+            loader(*args)
+            error = None
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{region_name}] Region completed.")
+        except Exception as e:
+            error = e
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{region_name}] Region failed: {e}")
+
+        return {'region': region_name, 'success': error is None, 'error': error, 'running_time': datetime.now() - region_start}
+
+    results = {}
+
+    with ThreadPoolExecutor(max_workers = max_workers) as executor:
+        futures = {executor.submit(run_region, region_name, args): region_name for region_name, args in jobs}
+
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    for region_name, _ in jobs:
+        result = results[region_name]
+        status = 'SUCCESS' if result['success'] else 'FAILED'
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{region_name}] {status} in", str(result['running_time']).split('.')[0])
+
+    return [results[region_name] for region_name, _ in jobs]
+
+
+def raise_for_failed_regions(results):
+    '''
+    raise one exception that lists every failed region.
+    '''
+
+    failed = [r for r in results if not r['success']]
+
+    if len(failed) > 0:
+        raise Exception(f"{len(failed)} of {len(results)} regions failed. " + '; '.join([f"{r['region']}: {r['error']}" for r in failed]))
+
+
+class StageRecord:
+
+    def __init__(self, stage_name, tags):
+        self.stage = stage_name
+        self.tags = tags
+        self.rows = None
+        self.bytes = None
+        self.query_ids = []
+        self.started_at = datetime.now()
+        self.wall_seconds = None
+        self.status = 'running'
+        self.error = None
+
+
+    def add_query_id(self, cursor):
+        '''
+        record the id of the last query run on the cursor.
+        snowflake cursors carry it as sfqid. for redshift it is read with pg_last_query_id()
+        '''
+
+        try:
+            if hasattr(cursor, 'sfqid'):
+                if cursor.sfqid:
+                    self.query_ids.append(str(cursor.sfqid))
+                return
+
+            id_cur = cursor.connection.cursor()
+            id_cur.execute("SELECT pg_last_query_id();")
+            self.query_ids.append(str(id_cur.fetchone()[0]))
+            id_cur.close()
+
+        except Exception:
+            # query ids are for tracing only and must never fail a load
+            pass
+
+
+class RunMetrics:
+    '''
+    stage timings of the run, appended as JSON lines to logs/alexa_eu_run_log.jsonl next to this script.
+    a stage that takes more than twice its median over the last history_days is printed as slow.
+    '''
+
+    def __init__(self, job_name, log_path, history_days = 30):
+        self.job_name = job_name
+        self.run_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.log_path = Path(log_path)
+        self.history_days = history_days
+        self.stages = []
+        self._lock = threading.Lock()
+
+
+    @contextmanager
+    def stage(self, stage_name, **tags):
+        '''
+        time a block of code. failed stages are recorded with their error and the error is raised again.
+        '''
+
+        record = StageRecord(stage_name, tags)
+        start = time.perf_counter()
+
+        try:
+            yield record
+            record.status = 'success'
+
+        except Exception as e:
+            record.status = 'failed'
+            record.error = str(e)
+            raise
+
+        finally:
+            record.wall_seconds = time.perf_counter() - start
+
+            with self._lock:
+                self.stages.append(record)
+
+            label = ' '.join([f"{v}" for v in tags.values()])
+            rows = f", {record.rows:,} rows" if record.rows is not None else ''
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{stage_name}{' ' + label if label else ''}] {record.status} in {record.wall_seconds:.1f}s{rows}")
+
+
+    def write(self):
+        '''
+        append this run's stages to the run log and print any stage that is slower than usual.
+        entries older than history_days are skipped when the log is read.
+        '''
+
+        records = [
+            {
+                'run_id': self.run_id
+                ,'job': self.job_name
+                ,'stage': r.stage
+                ,'tags': r.tags
+                ,'started_at': r.started_at.isoformat(timespec = 'seconds')
+                ,'wall_seconds': round(r.wall_seconds, 3) if r.wall_seconds is not None else None
+                ,'rows': r.rows
+                ,'bytes': r.bytes
+                ,'query_ids': r.query_ids
+                ,'status': r.status
+                ,'error': r.error
+            }
+            for r in self.stages
+        ]
+
+        cutoff = (datetime.now() - timedelta(days = self.history_days)).isoformat(timespec = 'seconds')
+        history = []
+
+        if self.log_path.exists():
+            with open(self.log_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get('started_at', '') >= cutoff:
+                        history.append(entry)
+
+        for r in records:
+            past = [
+                h['wall_seconds'] for h in history
+                if h.get('stage') == r['stage']
+                and h.get('tags') == r['tags']
+                and h.get('status') == 'success'
+                and h.get('wall_seconds') is not None
+            ]
+
+            if len(past) == 0 or r['wall_seconds'] is None:
+                continue
+
+            median_seconds = statistics.median(past)
+
+            if median_seconds > 0 and r['wall_seconds'] > median_seconds * 2:
+                print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> SLOW STAGE: {r['stage']} {r['tags']} took {r['wall_seconds']:.1f}s (median {median_seconds:.1f}s over {len(past)} runs)")
+
+        # metrics are for monitoring only, so a log that can't be written does not fail the run
+        try:
+            self.log_path.parent.mkdir(parents = True, exist_ok = True)
+            with open(self.log_path, 'a') as f:
+                for entry in records:
+                    f.write(json.dumps(entry, default = str) + '\n')
+        except OSError as e:
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Run metrics could not be written: {e}")
+            return
+
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Run metrics written to {self.log_path} ({len(records)} stages)")
+
+
+metrics = RunMetrics(
+    'alexa_eu'
+    ,log_path = Path(os.path.dirname(os.path.abspath(__file__))) / 'logs' / 'alexa_eu_run_log.jsonl'
+    ,history_days = config.getint('runSettings', 'run_log_history_days', fallback = 30)
+)
+
+def yesterday_start_YYYYMMDDHH():
+    r = datetime.today() - timedelta(days = 1)
+    result = r.strftime('%Y-%m-%d').replace('-', '')
+    return result + '00'
+
+def yesterday_end_YYYYMMDDHH():
+    r = datetime.today() - timedelta(days = 1)
+    result = r.strftime('%Y-%m-%d').replace('-', '')
+    return result + '23'
+
+def window_days_YYYYMMDD():
+    # the 45 days before today, oldest first
+    return [(datetime.today() - timedelta(days = d)).strftime('%Y%m%d') for d in range(45, 0, -1)]
+
+yesterday_start = yesterday_start_YYYYMMDDHH()
+yesterday_end = yesterday_end_YYYYMMDDHH()
+yesterday_date = yesterday_start[:8]
+window_days = window_days_YYYYMMDD()
+
+# day partitioned registrations of every EU country. the 45 day set of a country is the
+# cdw_[c]_alexa_last_45_registers view over this table (see alexa_eu_registers_daily_migration.sql)
+registers_table = 'udw_prod.udw_clientsolutions_cs.cdw_eu_alexa_registers_daily'
+
+# one row per country and loaded day, also for days without registrations
+registers_load_log_table = 'udw_prod.udw_clientsolutions_cs.cdw_eu_alexa_registers_load_log'
+
+# how yesterday's registrations are sampled into the control
+# random = NTILE over a random sort (default), hash = stable hash buckets of the psid
+control_sampling = config.get('runSettings', 'alexa_control_sampling', fallback = 'random')
+if control_sampling not in ('random', 'hash'):
+    raise Exception(f"alexa_control_sampling must be random or hash, not '{control_sampling}'.")
+control_percent = 10
+control_hash_salt = 'alexa_eu_control'
+
+# where the audiences are built after the CDW transfer
+# statements = one statement per step from this script (default), procedure = one CALL of sp_alexa_register_eu_daily,
+# transfer = CDW transfer, then task_alexa_register_eu_daily_[c] is started to build the audiences
+audience_build = config.get('runSettings', 'alexa_audience_build', fallback = 'statements')
+
+# transfer mode: the configured sampling is saved here for the task, which is then followed in TASK_HISTORY
+run_settings_table = 'udw_prod.udw_clientsolutions_cs.alexa_eu_run_settings'
+task_timeout_minutes = config.getint('runSettings', 'alexa_task_timeout_minutes', fallback = 60)
+task_poll_seconds = 30
+
+# number of files each audience is saved as. 0 or 1 = one file (single = TRUE, default)
+# more = files written in parallel plus a manifest, next to the one file (see unload_audience_parts)
+unload_parts = config.getint('runSettings', 'alexa_unload_parts', fallback = 0)
+unload_stage = '@UDW_PROD.UDW_CLIENTSOLUTIONS_CS.audience_planner_remote_files_udw_s'
+
+# sp_alexa_register_eu_daily writes single files only
+if unload_parts > 1 and audience_build != 'statements':
+    raise Exception(f"alexa_unload_parts = {unload_parts} needs alexa_audience_build = statements, not '{audience_build}'.")
+
+
+countries = ['DE','GB']
+
+
+def unload_audience_parts(udw_cur, source_table, file_stem):
+    '''
+    save the distinct psids of source_table to the audience planner stage as unload_parts files
+    written at the same time, then a manifest of the parts. psids are assigned to parts by a hash,
+    so part names and contents do not depend on how the warehouse splits the work.
+    returns the number of rows saved.
+
+    files: [file_stem]_part_000_of_008.csv ... [file_stem]_part_007_of_008.csv, [file_stem]_manifest.json
+    the manifest is written last. read the parts listed in it (parts with 0 rows have file = null)
+    and check them with their rows and md5.
+    the single file [file_stem].csv is still written at the same time, as the planner reads it.
+    '''
+
+    part_expression = f"MOD(ABS(HASH(psid)), {unload_parts})"
+    part_name = lambda part: f"{file_stem}_part_{part:03d}_of_{unload_parts:03d}.csv"
+
+    # row count of every part
+    udw_cur.execute(f'''
+        SELECT 
+            part
+            ,COUNT(*)
+        FROM (
+            SELECT DISTINCT 
+                psid
+                ,{part_expression} AS part
+            FROM {source_table}
+        )
+        GROUP BY 
+            part
+        ;
+    ''')
+
+    part_rows = {int(part): int(row_count) for part, row_count in udw_cur.fetchall()}
+    row_count = sum(part_rows.values())
+
+    # the single file, written next to the parts until the planner reads the manifest
+    udw_cur.execute_async(f'''
+        COPY INTO  {unload_stage}/{file_stem}.csv
+        FROM (SELECT DISTINCT psid FROM {source_table})
+        file_format = (format_name = adbiz_data.analytics_csv COMPRESSION = 'none')
+        single = TRUE
+        header = TRUE
+        overwrite = TRUE
+        max_file_size = 4900000000; 
+    ''')
+    single_query_id = udw_cur.sfqid
+
+    # start one unload per part. the queries run at the same time in this session (they read its temp tables)
+    query_ids = []
+    for part in range(unload_parts):
+        udw_cur.execute_async(f'''
+            COPY INTO  {unload_stage}/{part_name(part)}
+            FROM (SELECT DISTINCT psid FROM {source_table} WHERE {part_expression} = {part})
+            file_format = (format_name = adbiz_data.analytics_csv COMPRESSION = 'none')
+            single = TRUE
+            header = TRUE
+            overwrite = TRUE
+            max_file_size = 4900000000; 
+        ''')
+        query_ids.append(udw_cur.sfqid)
+
+    # wait for every unload. raises if one failed, so no manifest is written for an incomplete set
+    udw_cur.get_results_from_sfqid(single_query_id)
+    rows_unloaded = sum([int(row[0]) for row in udw_cur.fetchall()])
+
+    if rows_unloaded != row_count:
+        raise Exception(f"{file_stem}.csv unloaded {rows_unloaded} rows, expected {row_count}.")
+
+    for part, query_id in enumerate(query_ids):
+        udw_cur.get_results_from_sfqid(query_id)
+        rows_unloaded = sum([int(row[0]) for row in udw_cur.fetchall()])
+
+        if rows_unloaded != part_rows.get(part, 0):
+            raise Exception(f"Part {part_name(part)} unloaded {rows_unloaded} rows, expected {part_rows.get(part, 0)}.")
+
+    # remove files an empty part left from an earlier run before the manifest is written
+    empty_parts = [part for part in range(unload_parts) if part_rows.get(part, 0) == 0]
+
+    for part in empty_parts:
+        udw_cur.execute(f"REMOVE {unload_stage}/{part_name(part)};")
+
+    # file size and md5 from the stage, so the consumer can check the files it downloads
+    udw_cur.execute(f"LIST {unload_stage} PATTERN = '.*{file_stem}_part_.*_of_{unload_parts:03d}[.]csv';")
+    stage_files = {os.path.basename(name): (int(size), md5) for name, size, md5, last_modified in udw_cur.fetchall()}
+    for part in empty_parts:
+        stage_files.pop(part_name(part), None)
+
+    manifest = {
+        'audience': file_stem
+        ,'created_at': datetime.now().isoformat()
+        ,'part_count': unload_parts
+        ,'row_count': row_count
+        ,'parts': [
+            {
+                'file': part_name(part) if part not in empty_parts else None
+                ,'rows': part_rows.get(part, 0)
+                ,'bytes': stage_files.get(part_name(part), (0, None))[0]
+                ,'md5': stage_files.get(part_name(part), (0, None))[1]
+            }
+            for part in range(unload_parts)
+        ]
+    }
+
+    udw_cur.execute(f'''
+        COPY INTO  {unload_stage}/{file_stem}_manifest.json
+        FROM (SELECT PARSE_JSON(%s))
+        file_format = (type = json COMPRESSION = 'none')
+        single = TRUE
+        overwrite = TRUE;
+    ''', (json.dumps(manifest),))
+
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> {file_stem}: {manifest['row_count']} rows saved in {unload_parts} parts")
+
+    return manifest['row_count']
+
+
+
+def build_audiences(c, udw_cur):
+    '''
+    build the control and segment of one country with one statement per step and save them to UDW and s3.
+    sp_alexa_register_eu_daily runs the same steps as one procedure call (alexa_audience_build = procedure).
+    '''
+
+    c_lower = c.lower()
+
+
+    #=================================
+    # Build audience in UDW
+    #=================================
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{c}] Building audiences...")
+
+    with metrics.stage('udw_build_audience', country = c) as stage:
+
+        # the "current control" is the previous "new control"
+        # import previous "new control" from UDW
+        query_udw_3 = f'''
+            DROP TABLE IF EXISTS current_control;
+        '''
+
+        query_udw_3b = f'''
+            CREATE TEMP TABLE current_control AS (
+                SELECT 
+                    psid
+                FROM udw_prod.udw_clientsolutions_cs.cdw_{c}_alexa_new_control
+            );
+        '''
+
+        if control_sampling == 'hash':
+
+            udw_cur.execute(query_udw_3)
+            udw_cur.execute(query_udw_3b)
+
+
+            # every psid sampled by hash is in the first 10 of 100 buckets, so the hash alone keeps them
+            # out of the segment. only control psids outside those buckets (sampled at random before the
+            # hash sampling) are joined. unlike the whole control, that set does not grow
+            query_udw_3c = f'''
+                DROP TABLE IF EXISTS random_sampled_control;
+            '''
+
+            query_udw_3d = f'''
+                CREATE TEMP TABLE random_sampled_control AS (
+                    SELECT psid
+                    FROM current_control
+                    WHERE MOD(ABS(HASH(psid, '{control_hash_salt}')), 100) >= {control_percent}
+                );
+            '''
+
+            udw_cur.execute(query_udw_3c)
+            udw_cur.execute(query_udw_3d)
+
+
+            # split the last 45 day registrations in one pass. yesterday's registrations go to the
+            # control when the hash of the psid falls in the first 10 of 100 buckets. the hash is
+            # stable, so a rerun gives the same control and no sort is needed
+            query_udw_4 = f'''
+                DROP TABLE IF EXISTS audience_split;
+            '''
+
+            query_udw_4b = f'''
+                CREATE TEMP TABLE audience_split AS (
+                    SELECT 
+                        l.psid
+                        ,MOD(ABS(HASH(l.psid, '{control_hash_salt}')), 100) < {control_percent} AS in_bucket
+                        ,in_bucket AND l.last_register_hour >= '{yesterday_start}' AS in_control
+                        ,rc.psid IS NOT NULL AS in_random_sampled_control
+                    FROM udw_prod.udw_clientsolutions_cs.cdw_{c}_alexa_last_45_registers l
+                        LEFT JOIN random_sampled_control rc ON rc.psid = l.psid
+                );
+            '''
+
+            udw_cur.execute(query_udw_4)
+            udw_cur.execute(query_udw_4b)
+
+
+            # new control = DISTINCT (this control + previous control) 
+            # new segment = last 45 day registrations - new control (the hash buckets and the random sampled psids)
+            query_udw_5 = f'''
+                DROP TABLE IF EXISTS new_control;
+            '''
+
+            query_udw_5b = f'''
+                CREATE TEMP TABLE new_control AS (
+                    SELECT psid FROM current_control
+                    UNION
+                    SELECT psid FROM audience_split WHERE in_control
+                );
+            '''
+
+            query_udw_5c = f'''
+                DROP TABLE IF EXISTS new_seg;
+            '''
+
+            query_udw_5d = f'''
+                CREATE TEMP TABLE new_seg AS (
+                    SELECT psid
+                    FROM audience_split
+                    WHERE 
+                        NOT in_bucket
+                        AND NOT in_random_sampled_control
+                );
+            '''
+
+            udw_cur.execute(query_udw_5)
+            udw_cur.execute(query_udw_5b)
+            udw_cur.execute(query_udw_5c)
+            udw_cur.execute(query_udw_5d)
+
+        else:
+
+            # create a 10% control from a random sample of current_day registrations
+            query_udw_1 = f'''
+                DROP TABLE IF EXISTS aa_seg_100;
+            '''
+
+            query_udw_1b = f'''
+                CREATE TEMP TABLE aa_seg_100 AS (
+                    SELECT
+                        psid,
+                        NTILE(100) OVER (ORDER BY RANDOM()) rownum
+                    FROM udw_prod.udw_clientsolutions_cs.cdw_{c}_alexa_current_day
+                );
+            '''
+
+            udw_cur.execute(query_udw_1)
+            udw_cur.execute(query_udw_1b)
+
+
+            query_udw_2 = f'''
+                DROP TABLE IF EXISTS control;
+            '''
+
+            query_udw_2b = f'''
+                CREATE TEMP TABLE control AS (
+                    SELECT DISTINCT
+                        psid
+                    FROM aa_seg_100
+                    WHERE
+                        rownum <= 10 
+                );
+            '''
+
+            udw_cur.execute(query_udw_2)
+            udw_cur.execute(query_udw_2b)
+
+
+            udw_cur.execute(query_udw_3)
+            udw_cur.execute(query_udw_3b)
+
+
+            # generate the new control
+            # later we will save the "new control" to s3 and UDW
+            # new control = DISTINCT (this control + previous control) 
+            query_udw_4 = f'''
+                DROP TABLE IF EXISTS new_control;
+            '''
+
+            query_udw_4b = f'''
+                CREATE TEMP TABLE new_control AS (
+                    SELECT 
+                        psid
+                    FROM control
+                    UNION
+                    SELECT 
+                        psid
+                    FROM current_control
+                );
+            '''
+
+            udw_cur.execute(query_udw_4)
+            udw_cur.execute(query_udw_4b)
+
+
+            # "new segment" = last 45 day registrations - new control
+            # later we will save the "new segment" to s3 and UDW
+            query_udw_5 = f'''
+                DROP TABLE IF EXISTS new_seg;
+            '''
+
+            query_udw_5b = f'''
+                CREATE TEMP TABLE new_seg AS (
+                    SELECT 
+                        l.psid
+                    FROM udw_prod.udw_clientsolutions_cs.cdw_{c}_alexa_last_45_registers l
+                        LEFT JOIN new_control nc ON nc.psid = l.psid
+                    WHERE 
+                        nc.psid IS NULL
+                );
+            '''
+
+            udw_cur.execute(query_udw_5)
+            udw_cur.execute(query_udw_5b)
+
+
+        # save new_control to UDW
+        query_udw_6 = f'''
+            CREATE OR REPLACE TABLE udw_prod.udw_clientsolutions_cs.cdw_{c}_alexa_new_control AS (
+                SELECT psid 
+                FROM new_control
+            );
+        '''
+
+        udw_cur.execute(query_udw_6)
+
+
+        # save new segment to UDW
+        query_udw_7 = f'''
+            CREATE OR REPLACE TABLE udw_prod.udw_clientsolutions_cs.cdw_{c}_alexa_new_segment AS (
+                SELECT psid 
+                FROM new_seg
+            );
+        '''
+
+        udw_cur.execute(query_udw_7)
+        stage.add_query_id(udw_cur)
+
+
+
+    #=================================
+    # save new control and new segment to s3
+    #=================================
+    # Stage: AUDIENCE_PLANNER_REMOTE_FILES_UDW_S
+    # SQL to Check in DbVis: LIST @UDW_PROD.UDW_CLIENTSOLUTIONS_CS.audience_planner_remote_files_udw_s PATTERN = '.*230912_.*';
+
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{c}] Saving data to s3...")
+
+    with metrics.stage('udw_save_s3', country = c) as stage:
+
+        if unload_parts > 1:
+
+            # parallel mode: each audience is written as unload_parts files with fixed names and a manifest,
+            # and as the one file the planner reads
+            stage.rows = unload_audience_parts(udw_cur, 'new_seg', f'230912_{c_lower}_alexa_register_last_45_230912to231231')
+            stage.rows += unload_audience_parts(udw_cur, 'new_control', f'220601_{c_lower}_alexa_10per_control')
+
+        else:
+
+            # saving segment
+            query_udw_100 = f'''
+                COPY INTO  @UDW_PROD.UDW_CLIENTSOLUTIONS_CS.audience_planner_remote_files_udw_s/230912_{c_lower}_alexa_register_last_45_230912to231231.csv
+                FROM (SELECT DISTINCT psid FROM new_seg)
+                file_format = (format_name = adbiz_data.analytics_csv COMPRESSION = 'none')
+                single = TRUE
+                header = TRUE
+                overwrite = TRUE
+                max_file_size = 4900000000; 
+            '''
+
+            udw_cur.execute(query_udw_100)
+
+
+            # saving control
+            query_udw_200 = f'''
+                COPY INTO  @UDW_PROD.UDW_CLIENTSOLUTIONS_CS.audience_planner_remote_files_udw_s/220601_{c_lower}_alexa_10per_control.csv
+                FROM (SELECT DISTINCT psid FROM new_control)
+                file_format = (format_name = adbiz_data.analytics_csv COMPRESSION = 'none')
+                single = TRUE
+                header = TRUE
+                overwrite = TRUE
+                max_file_size = 4900000000; 
+            '''
+
+            udw_cur.execute(query_udw_200)
+            stage.add_query_id(udw_cur)
+
+
+
+def log_procedure_steps(c, result, stage):
+    '''
+    log the timing and row count of every step reported by sp_alexa_register_eu_daily.
+    '''
+
+    for step in result['steps']:
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{c}] {step['step']}: {step['rows']} rows in {step['ms'] / 1000:.1f}s")
+
+        if step['step'] == 'new_seg':
+            stage.rows = step['rows']
+
+
+
+def call_audience_procedure(c, udw_cur):
+    '''
+    build and save the audiences of one country with one call to sp_alexa_register_eu_daily
+    and log the timing and row count of every step it reports.
+    '''
+
+    with metrics.stage('udw_audience_procedure', country = c) as stage:
+        udw_cur.execute("CALL udw_prod.udw_clientsolutions_cs.sp_alexa_register_eu_daily(%s, %s);", (c, control_sampling))
+        result = json.loads(udw_cur.fetchone()[0])
+        stage.add_query_id(udw_cur)
+        log_procedure_steps(c, result, stage)
+
+    return result
+
+
+
+def run_audience_task(c, udw_cur):
+    '''
+    start task_alexa_register_eu_daily_[c] once the registrations of the country are transferred
+    and wait for the run. the tasks have no schedule, so they never run on a stale or missing transfer.
+    the task definition is not changed. the configured sampling is saved to alexa_eu_run_settings,
+    which sp_alexa_register_eu_daily reads. raises when the run fails or does not finish in time.
+    '''
+
+    task_name = f'task_alexa_register_eu_daily_{c.lower()}'
+
+    with metrics.stage('udw_audience_task', country = c) as stage:
+
+        udw_cur.execute(f'''
+            MERGE INTO {run_settings_table} t
+            USING (SELECT %s AS country, %s AS control_sampling) s
+                ON t.country = s.country
+            WHEN MATCHED THEN UPDATE SET 
+                control_sampling = s.control_sampling
+                ,updated_at = CURRENT_TIMESTAMP()
+            WHEN NOT MATCHED THEN INSERT (country, control_sampling, updated_at)
+                VALUES (s.country, s.control_sampling, CURRENT_TIMESTAMP())
+            ;
+        ''', (c, control_sampling))
+
+        # EXECUTE TASK returns as soon as the run is queued. the run is found by its scheduled time
+        udw_cur.execute("SELECT CURRENT_TIMESTAMP();")
+        started_at = udw_cur.fetchone()[0]
+
+        udw_cur.execute(f"EXECUTE TASK udw_prod.udw_clientsolutions_cs.{task_name};")
+        stage.add_query_id(udw_cur)
+
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{c}] Registrations transferred. {task_name} started to build the audiences.")
+
+        deadline = time.monotonic() + task_timeout_minutes * 60
+
+        while True:
+            udw_cur.execute('''
+                SELECT 
+                    state
+                    ,return_value
+                    ,error_message
+                FROM TABLE(udw_prod.information_schema.task_history(
+                    task_name => %s
+                    ,scheduled_time_range_start => %s
+                ))
+                ORDER BY 
+                    scheduled_time DESC
+                LIMIT 1
+                ;
+            ''', (task_name.upper(), started_at))
+
+            row = udw_cur.fetchone()
+            state = row[0] if row else None
+
+            if state == 'SUCCEEDED':
+                break
+
+            if state in ('FAILED', 'CANCELLED', 'SKIPPED', 'FAILED_AND_AUTO_SUSPENDED'):
+                raise Exception(f"{task_name} {state.lower()}: {row[2]}")
+
+            if time.monotonic() > deadline:
+                raise Exception(f"{task_name} did not finish in {task_timeout_minutes} minutes (state: {state}).")
+
+            time.sleep(task_poll_seconds)
+
+        log_procedure_steps(c, json.loads(row[1]), stage)
+
+
+
+def process_country(c):
+    '''
+    copy the registrations of one country from CDW, build the audiences in UDW,
+    and save them to s3. opens its own sessions so countries can run at the same time.
+    '''
+
+    cdw_conn = cdw_cur = udw_conn = udw_cur = None
+
+    try:
+
+        #================================================================
+        # START OPEN DB CONNECTIONS
+        #================================================================
+
+        cdw_conn = connect_cdw(config, 'personalAccountEU')
+        cdw_cur = cdw_conn.cursor()
+
+        udw_conn = connect_udw(config, 'serviceAccount')
+        udw_cur = udw_conn.cursor()
+
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{c}] CDW and UDW connected. UDW environment set up.")
+
+        #================================================================
+        # END OPEN DB CONNECTIONS
+        #================================================================
+
+
+        #=================================
+        # Copy data from CDW
+        #=================================
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{c}] Copying data from CDW to UDW...")
+
+        # TABLES:
+        # udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_eu_alexa_registers_daily(country VARCHAR(2), register_date DATE, psid VARCHAR(556), last_register_hour VARCHAR(10));
+        # udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_de_alexa_last_45_registers (view over the daily table)
+        # udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_gb_alexa_last_45_registers (view over the daily table)
+
+        # days of the 45 day window already loaded. yesterday is always loaded again,
+        # so a rerun replaces it. days missing after a failed or skipped run are loaded as well.
+        # read from the load log, as a day without registrations has no rows in the daily table
+        udw_cur.execute(f'''
+            SELECT DISTINCT TO_CHAR(register_date, 'YYYYMMDD')
+            FROM {registers_load_log_table}
+            WHERE 
+                country = %s
+                AND register_date BETWEEN TO_DATE(%s, 'YYYYMMDD') AND TO_DATE(%s, 'YYYYMMDD')
+            ;
+        ''', (c, window_days[0], yesterday_date))
+
+        stored_days = set([row[0] for row in udw_cur.fetchall()])
+        load_from = min([d for d in window_days if d not in stored_days] + [yesterday_date])
+
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{c}] Loading registrations from {load_from} to {yesterday_date}...")
+
+        # get registrations per day from CDW with the latest registration hour of each psid on the day
+        query_eu_registers = f'''
+            SELECT 
+                psid 
+                ,LEFT(partition_date, 8) AS register_date
+                ,MAX(partition_date) AS last_register_hour
+            FROM data_kpi_src.fact_voice t
+            WHERE 
+                partition_country = '{c}'
+                AND category IN ('EV110')
+                AND payload_exe_goal IN ('LOGIN_ACTIVATETV')
+                AND payload_appid = 'com.samsung.tv.alexa-client'
+                AND partition_date BETWEEN '{load_from}00' AND '{yesterday_end}'
+            GROUP BY 
+                1, 2
+            ;
+        '''
+
+        # capture registrations from CDW
+        with metrics.stage('cdw_registers', country = c) as stage:
+            df_registers = pd.read_sql(query_eu_registers, con = cdw_conn)
+            stage.rows = len(df_registers)
+            stage.add_query_id(cdw_cur)
+
+        # QUIRK!!! columns must be uppercase or error is thrown
+        df_registers.columns = map(lambda x: str(x).upper(), df_registers.columns)
+        df_registers['REGISTER_DATE'] = df_registers['REGISTER_DATE'].astype(str)
+        df_registers['LAST_REGISTER_HOUR'] = df_registers['LAST_REGISTER_HOUR'].astype(str)
+
+        # write the registrations to a temp table, then replace the loaded days in the daily table
+        # and drop the days that fell out of the window
+        with metrics.stage('udw_append_registers', country = c) as stage:
+            udw_cur.execute('''
+                CREATE OR REPLACE TEMP TABLE alexa_registers_increment (
+                    psid                    VARCHAR(556)
+                    ,register_date          VARCHAR(8)
+                    ,last_register_hour     VARCHAR(10)
+                );
+            ''')
+
+            write_pandas(
+                conn        = udw_conn,                         # db connection
+                df          = df_registers,                     # pandas dataframe (data)
+                table_name  = 'ALEXA_REGISTERS_INCREMENT',      # table to copy data into
+                schema      = 'UDW_CLIENTSOLUTIONS_CS',         # schema to use
+                overwrite   = False                             # append data to table or overwrite it?
+            )
+
+            # the reloaded days leave the load log first. a failed insert leaves them missing,
+            # so the next run loads them again
+            udw_cur.execute(f'''
+                DELETE FROM {registers_load_log_table}
+                WHERE 
+                    country = %s
+                    AND (register_date >= TO_DATE(%s, 'YYYYMMDD') OR register_date < TO_DATE(%s, 'YYYYMMDD'))
+                ;
+            ''', (c, load_from, window_days[0]))
+
+            udw_cur.execute(f'''
+                DELETE FROM {registers_table}
+                WHERE 
+                    country = %s
+                    AND register_date >= TO_DATE(%s, 'YYYYMMDD')
+                ;
+            ''', (c, load_from))
+
+            udw_cur.execute(f'''
+                INSERT INTO {registers_table} (country, register_date, psid, last_register_hour)
+                SELECT 
+                    %s
+                    ,TO_DATE(register_date, 'YYYYMMDD')
+                    ,psid
+                    ,last_register_hour
+                FROM alexa_registers_increment
+                ;
+            ''', (c,))
+
+            udw_cur.execute(f'''
+                DELETE FROM {registers_table}
+                WHERE 
+                    country = %s
+                    AND register_date < TO_DATE(%s, 'YYYYMMDD')
+                ;
+            ''', (c, window_days[0]))
+
+            # log every loaded day with its row count (0 for a day without registrations)
+            day_rows = df_registers['REGISTER_DATE'].value_counts()
+            loaded_days = [(c, d, int(day_rows.get(d, 0))) for d in window_days if d >= load_from]
+
+            udw_cur.executemany(f'''
+                INSERT INTO {registers_load_log_table} (country, register_date, row_count, loaded_at)
+                VALUES (%s, TO_DATE(%s, 'YYYYMMDD'), %s, CURRENT_TIMESTAMP())
+            ''', loaded_days)
+
+            stage.rows = len(df_registers)
+            stage.bytes = int(df_registers.memory_usage(deep = True).sum())
+            stage.add_query_id(udw_cur)
+
+
+        # TABLES:
+        # udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_de_alexa_current_day(psid VARCHAR(556));
+        # udw_prod.UDW_CLIENTSOLUTIONS_CS.cdw_gb_alexa_current_day(psid VARCHAR(556));
+
+        # registrations from yesterday
+        query_udw_current_day = f'''
+            CREATE OR REPLACE TABLE udw_prod.udw_clientsolutions_cs.cdw_{c}_alexa_current_day AS (
+                SELECT DISTINCT psid 
+                FROM {registers_table}
+                WHERE 
+                    country = '{c}'
+                    AND register_date = TO_DATE('{yesterday_date}', 'YYYYMMDD')
+            );
+        '''
+
+        with metrics.stage('udw_current_day', country = c) as stage:
+            udw_cur.execute(query_udw_current_day)
+            stage.rows = int((df_registers['REGISTER_DATE'] == yesterday_date).sum())
+            stage.add_query_id(udw_cur)
+
+        del df_registers
+
+
+        #=================================
+        # Build audience in UDW and save to s3
+        #=================================
+        if audience_build == 'procedure':
+            call_audience_procedure(c, udw_cur)
+
+        elif audience_build == 'transfer':
+            run_audience_task(c, udw_cur)
+
+        else:
+            build_audiences(c, udw_cur)
+
+
+    finally:
+
+        #================================================================
+        # START CLOSE DB CONNECTIONS
+        #================================================================
+        for handle in [udw_cur, udw_conn, cdw_cur, cdw_conn]:
+            if handle is not None:
+                handle.close()
+
+        #================================================================
+        # END CLOSE DB CONNECTIONS
+        #================================================================
+
+
+
+# one worker per country. a failed country does not stop the others
+results = run_regions(
+    process_country
+    ,[(c, (c,)) for c in countries]
+    ,max_workers = get_max_workers(config, 'alexa_max_workers')
+)
+
+
+print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Task done. All connections disconnected.")
+end_timestamp = datetime.now()
+time_used = end_timestamp - start_timestamp
+
+
+print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Total running time: ", str(time_used).split('.')[0])
+
+metrics.write()
+
+raise_for_failed_regions(results)
+
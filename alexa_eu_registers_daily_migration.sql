@@ -0,0 +1,116 @@
+/***********************************
+
+Alexa EU Registrations Daily Table (one time migration)
+
+alexa_eu.py keeps the EU registrations in one table partitioned by day
+(register_date) and loads only the days that are missing from it, which is
+yesterday on a normal run. Days older than 45 days are deleted by the script.
+
+The loaded days are kept in a load log, one row per country and day with the
+row count of the day. A day without registrations has no rows in the daily
+table, so the missing days are read from the log instead.
+
+cdw_[c]_alexa_last_45_registers used to be a table overwritten every run. It
+becomes a view over the country's rows of the daily table, so the audience
+build reads it as before.
+
+Steps:
+1. Create the daily table
+2. Create the load log. When the daily table is already filled, backfill the log
+   from it so the next run does not load the whole window again
+3. Replace the last 45 day tables with views
+4. Run alexa_eu.py. The first run finds every day of the window missing and
+   loads the 45 days from CDW. Later runs load yesterday only.
+
+Adding a country: add it to countries in alexa_eu.py and create its view (step 3).
+
+***********************************/
+
+-- connection settings
+USE ROLE UDW_CLIENTSOLUTIONS_REPORTING_MAINTAINER_ROLE_PROD;
+USE WAREHOUSE UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD_MEDIUM;
+USE DATABASE UDW_PROD;
+USE SCHEMA UDW_CLIENTSOLUTIONS_CS;
+
+
+
+-- Step 1.
+-- one row per country, day, and psid. last_register_hour is the latest partition_date (YYYYMMDDHH) of the psid on the day
+CREATE TABLE IF NOT EXISTS udw_prod.udw_clientsolutions_cs.cdw_eu_alexa_registers_daily (
+    country                 VARCHAR(2)
+    ,register_date          DATE
+    ,psid                   VARCHAR(556)
+    ,last_register_hour     VARCHAR(10)
+)
+CLUSTER BY (country, register_date)
+;
+
+
+
+-- Step 2.
+-- one row per country and loaded day. row_count = 0 for a day without registrations
+CREATE TABLE IF NOT EXISTS udw_prod.udw_clientsolutions_cs.cdw_eu_alexa_registers_load_log (
+    country                 VARCHAR(2)
+    ,register_date          DATE
+    ,row_count              INT
+    ,loaded_at              TIMESTAMP_LTZ
+)
+;
+
+
+-- backfill (only when the daily table was filled before the log existed)
+INSERT INTO udw_prod.udw_clientsolutions_cs.cdw_eu_alexa_registers_load_log (country, register_date, row_count, loaded_at)
+SELECT
+    country
+    ,register_date
+    ,COUNT(*)
+    ,CURRENT_TIMESTAMP()
+FROM udw_prod.udw_clientsolutions_cs.cdw_eu_alexa_registers_daily
+GROUP BY
+    country
+    ,register_date
+;
+
+
+
+-- Step 3.
+-- the table only holds the 45 day window. alexa_eu.py deletes older days using its own clock,
+-- so the views do not filter on CURRENT_DATE() (the session timezone can be a day off)
+DROP TABLE IF EXISTS udw_prod.udw_clientsolutions_cs.cdw_de_alexa_last_45_registers;
+CREATE OR REPLACE VIEW udw_prod.udw_clientsolutions_cs.cdw_de_alexa_last_45_registers AS (
+    SELECT
+        psid
+        ,MAX(last_register_hour) AS last_register_hour
+    FROM udw_prod.udw_clientsolutions_cs.cdw_eu_alexa_registers_daily
+    WHERE
+        country = 'DE'
+    GROUP BY
+        psid
+);
+
+
+DROP TABLE IF EXISTS udw_prod.udw_clientsolutions_cs.cdw_gb_alexa_last_45_registers;
+CREATE OR REPLACE VIEW udw_prod.udw_clientsolutions_cs.cdw_gb_alexa_last_45_registers AS (
+    SELECT
+        psid
+        ,MAX(last_register_hour) AS last_register_hour
+    FROM udw_prod.udw_clientsolutions_cs.cdw_eu_alexa_registers_daily
+    WHERE
+        country = 'GB'
+    GROUP BY
+        psid
+);
+
+
+
+-- check the stored days after the first run (45 per country)
+SELECT
+    country
+    ,COUNT(DISTINCT register_date) AS days
+    ,MIN(register_date) AS first_day
+    ,MAX(register_date) AS last_day
+    ,COUNT(*) AS row_count
+FROM udw_prod.udw_clientsolutions_cs.cdw_eu_alexa_registers_daily
+GROUP BY
+    country
+;
@@ -0,0 +1,92 @@
+'''
+===================================================
+BENCHMARK: PANDAS CAST VS ARROW TRANSFER
+===================================================
+compares the two ways exposure rows are prepared for UDW, without any
+database connection:
+
+    pandas  = DataFrame.from_records + cast_exposure_df + parquet (what write_pandas uploads)
+    arrow   = rows_to_record_batch + parquet (what the streaming path uploads)
+
+rows are synthetic psycopg2-style tuples. run from the benchmarks folder:
+
+    python bench_arrow_transfer.py
+    python bench_arrow_transfer.py 1000000
+
+'''
+
+# import packages
+import sys
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# the loaders live in local_scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'local_scripts'))
+
+from custom_global_exposures import cast_exposure_df
+from arrow_transfer import rows_to_record_batch, EXP_PREP_SCHEMA
+
+
+columns = ['vao', 'vtifa', 'exposure_datetime', 'country', 'campaign_id', 'creative_id', 'flight_id', 'type', 'row_hash', 'partner_id']
+
+
+def make_rows(n):
+    start = datetime(2024, 1, 1)
+    countries = ['DE', 'GB', 'FR', 'IT', 'ES', 'AU', 'BR']
+
+    return [
+        (
+            random.randint(1000, 9999)
+            ,f'{random.getrandbits(64):016x}-tvid'
+            ,start + timedelta(seconds = random.randint(0, 14 * 86400))
+            ,random.choice(countries)
+            ,random.randint(100000, 999999)
+            ,random.randint(100000, 999999)
+            ,random.randint(100000, 999999)
+            ,random.choice([1, 2])
+            ,f'{random.getrandbits(128):032x}'
+            ,random.choice([0, 1])
+        )
+        for _ in range(n)
+    ]
+
+
+def bench_pandas(rows, out_path):
+    df = pd.DataFrame.from_records(rows, columns = columns)
+    df = cast_exposure_df(df)
+    df.columns = map(lambda x: str(x).upper(), df.columns)
+    df.to_parquet(out_path)
+
+
+def bench_arrow(rows, out_path):
+    batch = rows_to_record_batch(rows, columns, EXP_PREP_SCHEMA)
+    pq.write_table(pa.Table.from_batches([batch]), out_path)
+
+
+def timed(label, fn, rows, out_path):
+    start = time.perf_counter()
+    fn(rows, out_path)
+    seconds = time.perf_counter() - start
+    print(f"{label:<8} {seconds:>8.2f}s  {len(rows) / seconds:>12,.0f} rows/sec  {out_path.stat().st_size / 1e6:>8.1f} MB parquet")
+    return seconds
+
+
+if __name__ == '__main__':
+
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    print(f"generating {row_count:,} rows...")
+    rows = make_rows(row_count)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        before = timed('pandas', bench_pandas, rows, Path(tmp_dir) / 'pandas.parquet')
+        after = timed('arrow', bench_arrow, rows, Path(tmp_dir) / 'arrow.parquet')
+
+    print(f"speed up: {before / after:.1f}x")
@@ -0,0 +1,635 @@
+'''
+===================================================
+BENCHMARK: EXPOSURE AND APP USAGE LOADERS
+===================================================
+runs get_exposures_from_cdw_to_udw and get_app_usage_from_cdw_to_udw end to
+end on a laptop. CDW and UDW are replaced by local stand-ins:
+
+    CDW     = psycopg2-style connection that answers the fact table queries
+              (fact_delivery_event / app usage) with synthetic rows, in
+              chunks for the streaming cursor or all at once for read_sql
+    UDW     = snowflake-style connection that keeps tables in memory and
+              answers the queries the loaders run (watermark, map, PUT/COPY,
+              MIN/MAX, dedup INSERT). write_pandas is replaced by a fake
+              that writes the same parquet a real upload would
+    S3      = only used by the bulk transfer (--modes unload). any
+              S3-compatible endpoint, e.g. MinIO or moto_server. the CDW
+              stand-in answers UNLOAD by writing parquet files there and the
+              UDW stand-in reads them back for COPY INTO from the stage
+
+stage timings come from run_metrics, so the report shows the same stages the
+nightly run log does (extract, cast, upload, dedup). every case runs in its
+own process so peak RSS is measured per case. 10% of the rows are already in
+the destination table so the dedup has something to remove.
+
+run from the benchmarks folder:
+
+    python bench_loaders.py
+    python bench_loaders.py --sizes 100000 1000000 --loaders exposures --modes stream
+
+note: the full frame mode (--modes frame) holds every row in memory, as the
+loaders do with stream_chunk_size = 0. 10M rows needs several GB of RAM.
+
+the time-sliced mode (--modes slice, exposures only) reads 14 daily slices
+over max_slice_connections stand-in CDW connections that share one row source.
+
+the bulk transfer needs a local S3 stand-in:
+
+    moto_server -p 9000
+    python bench_loaders.py --modes unload --s3-endpoint http://localhost:9000
+
+'''
+
+# import packages
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import boto3
+
+# the loaders live in local_scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'local_scripts'))
+
+import custom_global_exposures as ex
+import custom_global_app_use as ap
+from map_cache import MapCache
+from run_metrics import RunMetrics
+
+
+default_sizes       = [100000, 1000000, 10000000]
+default_chunk_size  = 500000
+
+# share of the synthetic rows that are already in the destination table
+overlap_share       = 0.1
+
+exposure_columns    = ['vao', 'vtifa', 'exposure_datetime', 'country', 'campaign_id', 'creative_id', 'flight_id', 'type', 'row_hash', 'partner_id']
+app_usage_columns   = ['tifa', 'app_usage_datetime', 'country', 'app_id', 'time_spent_min', 'usage_count', 'date_imported', 'row_hash']
+
+# columns the UDW stand-in keeps for the MIN/MAX and dedup queries
+stored_columns      = ['ROW_HASH', 'PARTNER_ID', 'EXPOSURE_DATETIME', 'APP_USAGE_DATETIME']
+
+# external stage the UDW stand-in reads unloaded files from
+unload_stage        = 'BENCH_UNLOAD_STAGE'
+
+countries           = np.array(['DE', 'GB', 'FR', 'IT', 'ES', 'AU', 'BR'])
+start_time          = np.datetime64('2024-01-01T00:00:00')
+
+
+
+#================================================================
+# SYNTHETIC DATA
+#================================================================
+
+def row_hash(i):
+    # row hashes are derived from the row number so the overlap with the destination is known
+    return f'{i:032x}'
+
+
+def exposure_rows(first_row, n):
+    '''
+    rows as psycopg2 returns them for the fact_delivery_event query
+    '''
+
+    rng = np.random.default_rng(first_row)
+    idx = np.arange(first_row, first_row + n)
+    event_times = (start_time + rng.integers(0, 14 * 86400, n).astype('timedelta64[s]')).astype(object)
+
+    return list(zip(
+        rng.integers(1000, 3000, n).tolist()
+        ,[f'{i:016x}-tvid' for i in idx]
+        ,event_times
+        ,countries[rng.integers(0, len(countries), n)].tolist()
+        ,rng.integers(100000, 999999, n).tolist()
+        ,rng.integers(100000, 999999, n).tolist()
+        ,rng.integers(100000, 999999, n).tolist()
+        ,rng.integers(1, 3, n).tolist()
+        ,[row_hash(i) for i in idx]
+        ,[0] * n
+    ))
+
+
+def app_usage_rows(first_row, n):
+    '''
+    rows as psycopg2 returns them for the app usage query
+    '''
+
+    rng = np.random.default_rng(first_row)
+    idx = np.arange(first_row, first_row + n)
+    usage_times = (start_time + rng.integers(0, 14 * 86400, n).astype('timedelta64[s]')).astype(object)
+
+    return list(zip(
+        [f'{i:016x}-tifa' for i in idx]
+        ,usage_times
+        ,countries[rng.integers(0, len(countries), n)].tolist()
+        ,[str(a) for a in rng.integers(3201900000000, 3201999999999, n)]
+        ,rng.integers(0, 240, n).tolist()
+        ,rng.integers(1, 20, n).tolist()
+        ,[date.today()] * n
+        ,[row_hash(i) for i in idx]
+    ))
+
+
+
+#================================================================
+# CDW STAND-IN
+#================================================================
+
+class FakeCdwCursor:
+
+    def __init__(self, connection, name = None):
+        self.connection = connection
+        self.name = name
+        self.itersize = 2000
+        self.description = None
+        self.rowcount = -1
+        self._make_rows = None
+        self._columns = None
+        self._next_row = 0
+
+
+    def execute(self, query, params = None):
+
+        if isinstance(query, bytes):
+            query = query.decode()
+
+        # UNLOAD writes the fact table rows to S3 instead of returning them
+        if query.strip().startswith('UNLOAD'):
+            self.connection.unload(query)
+            self._make_rows, self._columns = None, None
+
+        elif 'SELECT reporting_start, reporting_end FROM variable_table' in query:
+            self._make_rows, self._columns = (lambda first_row, n: [(datetime(2024, 1, 1), datetime(2024, 1, 14, 23, 59, 59))] if first_row == 0 else []), ['reporting_start', 'reporting_end']
+
+        elif 'SELECT LEAST(quarter_start, reporting_start) FROM variable_table' in query:
+            self._make_rows, self._columns = (lambda first_row, n: [(datetime.combine(date.today() - timedelta(days = 14), datetime.min.time()),)] if first_row == 0 else []), ['least']
+
+        elif 'meta_taps_sra_app_lang_l' in query:
+            self._make_rows, self._columns = (lambda first_row, n: [('bench_app',)] if first_row == 0 else []), ['app_id']
+
+        elif 'pg_last_unload_count' in query:
+            unload_count = self.connection.unload_count
+            self._make_rows, self._columns = (lambda first_row, n: [(unload_count,)] if first_row == 0 else []), ['pg_last_unload_count']
+
+        # fact table queries return synthetic rows. everything else (temp tables, map load) is accepted as is
+        elif 'exposure_datetime' in query and 'SELECT' in query:
+            self._make_rows, self._columns = exposure_rows, exposure_columns
+        elif 'app_usage_datetime' in query and 'SELECT' in query:
+            self._make_rows, self._columns = app_usage_rows, app_usage_columns
+        elif 'pg_last_query_id' in query:
+            self._make_rows, self._columns = (lambda first_row, n: [(0,)] if first_row == 0 else []), ['pg_last_query_id']
+        else:
+            self._make_rows, self._columns = None, None
+
+        self._next_row = 0
+        self.description = [(c, None, None, None, None, None, None) for c in self._columns] if self._columns else None
+
+
+    def mogrify(self, template, args):
+        return template % tuple(str(a).encode() for a in args)
+
+
+    def fetchmany(self, size):
+
+        # slice connections take their rows from the shared source
+        if self.connection.shared_rows is not None and self._columns in (exposure_columns, app_usage_columns):
+            first_row, n = self.connection.shared_rows.claim(size)
+            return self._make_rows(first_row, n) if n > 0 else []
+
+        n = min(size, self.connection.row_count - self._next_row)
+        if self._make_rows is None or n <= 0:
+            return []
+
+        rows = self._make_rows(self._next_row, n)
+        self._next_row += n
+        return rows
+
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if len(rows) > 0 else None
+
+
+    def fetchall(self):
+
+        rows = []
+        while True:
+            chunk = self.fetchmany(default_chunk_size)
+            if len(chunk) == 0:
+                return rows
+            rows.extend(chunk)
+
+
+    def close(self):
+        pass
+
+
+class SharedRows:
+    '''
+    hands out row numbers to the slice connections, so together they return row_count rows
+    '''
+
+    def __init__(self, row_count):
+        self.row_count = row_count
+        self.next_row = 0
+        self.lock = threading.Lock()
+
+    def claim(self, size):
+        with self.lock:
+            first_row = self.next_row
+            n = max(0, min(size, self.row_count - first_row))
+            self.next_row += n
+            return first_row, n
+
+
+class FakeCdwConnection:
+
+    encoding = 'UTF8'
+    closed = False
+
+    def __init__(self, row_count, s3 = None, shared_rows = None):
+        self.row_count = row_count
+        self.s3 = s3
+        self.shared_rows = shared_rows
+        self.unload_count = 0
+
+    def cursor(self, name = None):
+        return FakeCdwCursor(self, name)
+
+
+    def unload(self, query):
+        '''
+        write the query's rows to S3 as parquet files, with lowercase column names as CDW does
+        '''
+
+        bucket, prefix = re.search(r"TO 's3://([^/]+)/(\S+?)'", query).groups()
+        make_rows, columns = (exposure_rows, exposure_columns) if 'exposure_datetime' in query else (app_usage_rows, app_usage_columns)
+
+        self.unload_count = 0
+        for part, first_row in enumerate(range(0, self.row_count, default_chunk_size)):
+            rows = make_rows(first_row, min(default_chunk_size, self.row_count - first_row))
+
+            buffer = io.BytesIO()
+            pd.DataFrame(rows, columns = columns).to_parquet(buffer, index = False)
+            self.s3.put_object(Bucket = bucket, Key = f'{prefix}{part:04d}_part_00.parquet', Body = buffer.getvalue())
+
+            self.unload_count += len(rows)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+
+#================================================================
+# UDW STAND-IN
+#================================================================
+
+class FakeUdwCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = None
+        self.rowcount = -1
+        self.sfqid = None
+        self._rows = []
+
+
+    def execute(self, query, params = None):
+
+        conn = self.connection
+        conn.query_number += 1
+        self.sfqid = f'bench-{conn.query_number}'
+        self.description = None
+        self.rowcount = -1
+        self._rows = []
+
+        sql = ' '.join(query.split())
+
+        if sql.startswith('PUT '):
+            conn.staged_file = re.search(r"PUT 'file://(.+?)'", sql).group(1)
+
+        elif sql.startswith('COPY INTO') and f'@{unload_stage}/' in sql:
+            conn.load_unloaded_files(re.search(r'COPY INTO (\S+)', sql).group(1), re.search(rf'@{unload_stage}/(\S+)', sql).group(1))
+
+        elif sql.startswith('COPY INTO'):
+            conn.load_parquet(re.search(r'COPY INTO (\S+)', sql).group(1), conn.staged_file)
+
+        elif sql.startswith('CREATE OR REPLACE TEMP TABLE') and ' AS (' not in sql:
+            conn.tables[table_key(re.search(r'TEMP TABLE (\S+)', sql).group(1))] = pd.DataFrame()
+
+        elif sql.startswith('SELECT MIN('):
+            match = re.search(r'SELECT MIN\((\w+)\), MAX\(\w+\) FROM (\S+?)(?: WHERE partner_id = (\d+))?;', sql)
+            df = conn.partner_rows(match.group(2), match.group(3))
+            column = match.group(1).upper()
+            self._rows = [(df[column].min(), df[column].max())] if len(df) > 0 else [(None, None)]
+
+        elif sql.startswith('INSERT INTO') and 'new_data' in sql:
+            self.rowcount = conn.dedup_insert(
+                re.search(r'INSERT INTO (\S+)', sql).group(1)
+                ,re.search(r'FROM (\S+) AS new_data', sql).group(1)
+                ,(re.search(r'new_data.partner_id = (\d+)', sql) or [None, None])[1]
+            )
+
+        elif 'so.vao' in sql and 'campaign_id' in sql:
+            self.description = [('VAO',), ('CAMPAIGN_ID',)]
+            self._rows = [(1000 + i, 100000 + i) for i in range(2000)]
+
+        elif 'high_water_ts' in sql and sql.startswith('SELECT'):
+            self._rows = [(None,)]
+
+
+    def fetchone(self):
+        return self._rows.pop(0) if len(self._rows) > 0 else None
+
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+    def close(self):
+        pass
+
+
+class FakeUdwConnection:
+
+    def __init__(self, s3 = None, s3_bucket = None):
+        self.s3 = s3
+        self.s3_bucket = s3_bucket
+        self.tables = {}
+        self.destination_hashes = {}
+        self.staged_file = None
+        self.query_number = 0
+
+
+    def cursor(self):
+        return FakeUdwCursor(self)
+
+
+    def load_parquet(self, table_name, file_path):
+        '''
+        read an uploaded parquet file into the table. only the columns the later
+        queries use are kept, so peak RSS reflects the loader and not the stand-in
+        '''
+
+        columns = [c for c in pq.read_schema(file_path).names if c.upper() in stored_columns]
+        df = pq.read_table(file_path, columns = columns).to_pandas()
+        df.columns = [c.upper() for c in df.columns]
+
+        key = table_key(table_name)
+        self.tables[key] = pd.concat([self.tables.get(key, pd.DataFrame()), df], ignore_index = True)
+
+
+    def load_unloaded_files(self, table_name, prefix):
+        '''
+        COPY INTO from the external stage. the stage points at the root of the bucket
+        '''
+
+        for page in self.s3.get_paginator('list_objects_v2').paginate(Bucket = self.s3_bucket, Prefix = prefix):
+            for f in page.get('Contents', []):
+                body = self.s3.get_object(Bucket = self.s3_bucket, Key = f['Key'])['Body'].read()
+                self.load_parquet(table_name, io.BytesIO(body))
+
+
+    def partner_rows(self, table_name, partner_id):
+        df = self.tables.get(table_key(table_name), pd.DataFrame())
+        if partner_id is not None and len(df) > 0:
+            df = df[df['PARTNER_ID'] == int(partner_id)]
+        return df
+
+
+    def dedup_insert(self, destination_table, prep_table, partner_id):
+        '''
+        anti join on row_hash, as the loaders' INSERT ... LEFT JOIN ... IS NULL does
+        '''
+
+        new_data = self.partner_rows(prep_table, partner_id)
+        existing = self.destination_hashes.setdefault(table_key(destination_table), set())
+
+        new_hashes = new_data.loc[~new_data['ROW_HASH'].isin(existing), 'ROW_HASH']
+        existing.update(new_hashes)
+
+        return len(new_hashes)
+
+
+    def is_closed(self):
+        return False
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeConnections:
+    '''
+    stands in for connection_manager.ConnectionManager
+    '''
+
+    def __init__(self, row_count, s3 = None, s3_bucket = None):
+        self._cdw = FakeCdwConnection(row_count, s3)
+        self._udw = FakeUdwConnection(s3, s3_bucket)
+        self._shared_rows = SharedRows(row_count)
+
+    def cdw(self, cdw_config):
+        return self._cdw
+
+    def open_cdw(self, cdw_config):
+        return FakeCdwConnection(self._cdw.row_count, shared_rows = self._shared_rows)
+
+    def udw(self):
+        return self._udw
+
+
+def table_key(table_name):
+    return table_name.split('.')[-1].upper()
+
+
+def fake_write_pandas(conn, df, table_name, schema = None, **kwargs):
+    '''
+    write the same parquet file write_pandas uploads, then load it into the in-memory table
+    '''
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = Path(tmp_dir) / 'write_pandas.parquet'
+        df.to_parquet(file_path, compression = 'gzip')
+        conn.load_parquet(table_name, file_path)
+
+    return True, 1, len(df), []
+
+
+
+#================================================================
+# RUN A CASE
+#================================================================
+
+def peak_rss_mb():
+
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        # bytes on mac, kilobytes on linux
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+    except ImportError:
+
+        # windows
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+
+
+def run_case(loader, row_count, mode, chunk_size, s3_endpoint = None, s3_bucket = None):
+    '''
+    run one loader against the stand-ins and return its stage timings and peak RSS
+    '''
+
+    ex.write_pandas = fake_write_pandas
+    ap.write_pandas = fake_write_pandas
+
+    s3 = None
+    if mode == 'unload':
+
+        # the loaders' own boto3 client talks to the same stand-in
+        os.environ.setdefault('AWS_ACCESS_KEY_ID', 'bench')
+        os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench')
+        os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+        s3 = boto3.client('s3', endpoint_url = s3_endpoint)
+        if s3_bucket not in [b['Name'] for b in s3.list_buckets().get('Buckets', [])]:
+            s3.create_bucket(Bucket = s3_bucket)
+
+        # the loaders read these from [unloadTransfer] in config.ini
+        unload_settings = lambda config: {
+            'bucket': s3_bucket, 'prefix': 'bench', 'region': '', 'iam_role': 'bench', 'udw_stage': unload_stage
+            ,'endpoint_url': s3_endpoint, 'max_file_size_mb': 256, 'min_window_days': 0, 'keep_files': False
+        }
+        ex.get_unload_settings = unload_settings
+        ap.get_unload_settings = unload_settings
+
+    connections = FakeConnections(row_count, s3, s3_bucket)
+    metrics = RunMetrics('bench_loaders', log_path = os.devnull)
+    stream_chunk_size = chunk_size if mode in ('stream', 'slice') else 0
+
+    destination_table = 'bench_destination'
+    connections.udw().destination_hashes[table_key(destination_table)] = set([row_hash(i) for i in range(int(row_count * overlap_share))])
+
+    # keep the loaders' progress output out of the report
+    # checkpoints are written to a temp folder so their cost is part of the timings
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), tempfile.TemporaryDirectory() as checkpoint_dir:
+
+        if loader == 'exposures':
+            ex.get_exposures_from_cdw_to_udw(
+                'bench_sales_orders', destination_table, 'benchCDW', 'benchUDW'
+                ,stream_chunk_size = stream_chunk_size
+                ,grace_hours = 48
+                ,connections = connections
+                ,map_cache = MapCache()
+                ,metrics = metrics
+                ,checkpoint_dir = checkpoint_dir
+                ,unload = mode == 'unload'
+                ,slice_hours = 24 if mode == 'slice' else 0
+            )
+        else:
+            ap.get_app_usage_from_cdw_to_udw(
+                destination_table, 'benchCDW', 'benchUDW', 'DE, GB', 'cdw_eu', 'Bench App'
+                ,stream_chunk_size = stream_chunk_size
+                ,connections = connections
+                ,metrics = metrics
+                ,unload = mode == 'unload'
+                ,change_detection = False
+            )
+
+    return {
+        'loader': loader
+        ,'rows': row_count
+        ,'mode': mode
+        ,'stages': [r.to_dict() for r in metrics.stages]
+        ,'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+
+
+def print_result(result):
+
+    print(f"\n{result['loader']} | {result['rows']:,} rows | {result['mode']} | peak RSS {result['peak_rss_mb']:,.0f} MB")
+
+    for stage in result['stages']:
+        seconds = stage['wall_seconds']
+        rows = stage['rows'] if stage['rows'] is not None else 0
+
+        # dedup reports rows inserted. throughput is measured on the rows it had to check
+        checked = result['rows'] if stage['stage'] == 'dedup_insert' else rows
+        throughput = f"{checked / seconds:>12,.0f} rows/sec" if seconds and checked else ''
+
+        print(f"    {stage['stage']:<26} {seconds:>8.2f}s  {rows:>12,} rows  {throughput}")
+
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description = 'offline loader benchmark')
+    parser.add_argument('--sizes', nargs = '+', type = int, default = default_sizes)
+    parser.add_argument('--loaders', nargs = '+', choices = ['exposures', 'app_usage'], default = ['exposures', 'app_usage'])
+    parser.add_argument('--modes', nargs = '+', choices = ['stream', 'frame', 'slice', 'unload'], default = ['stream', 'frame'])
+    parser.add_argument('--chunk-size', type = int, default = default_chunk_size)
+    parser.add_argument('--s3-endpoint', help = 'S3-compatible endpoint for --modes unload (e.g., http://localhost:9000)')
+    parser.add_argument('--s3-bucket', default = 'bench-unload')
+    parser.add_argument('--child', action = 'store_true', help = argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if 'unload' in args.modes and not args.s3_endpoint:
+        parser.error('--modes unload needs --s3-endpoint')
+
+
+    # child process: run a single case and hand the result back as json
+    if args.child:
+        result = run_case(args.loaders[0], args.sizes[0], args.modes[0], args.chunk_size, args.s3_endpoint, args.s3_bucket)
+        print('RESULT ' + json.dumps(result, default = str))
+        sys.exit(0)
+
+
+    print(f"benchmark started {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+
+    for loader in args.loaders:
+        for row_count in args.sizes:
+            for mode in args.modes:
+
+                # only the exposure loader reads in slices
+                if mode == 'slice' and loader != 'exposures':
+                    continue
+
+                child_args = ['--child', '--loaders', loader, '--sizes', str(row_count), '--modes', mode, '--chunk-size', str(args.chunk_size), '--s3-bucket', args.s3_bucket]
+                if args.s3_endpoint:
+                    child_args += ['--s3-endpoint', args.s3_endpoint]
+
+                child = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__)] + child_args
+                    ,capture_output = True
+                    ,text = True
+                )
+
+                lines = [l for l in child.stdout.splitlines() if l.startswith('RESULT ')]
+
+                if child.returncode != 0 or len(lines) == 0:
+                    print(f"\n{loader} | {row_count:,} rows | {mode} | FAILED (exit code {child.returncode})")
+                    print('    ' + (child.stderr.strip().splitlines() or ['no output'])[-1])
+                    continue
+
+                print_result(json.loads(lines[-1][len('RESULT '):]))
@@ -0,0 +1,128 @@
+'''
+===================================================
+APP ID CACHE
+===================================================
+resolves the CDW app_ids of an app (e.g., 'Pluto TV', 'Paramount+') from
+meta_apps.meta_taps_sra_app_lang_l once per region and keeps them, so the app
+usage queries can filter the fact tables on app_id literals instead of
+running the meta subquery inside every fact table scan.
+
+ids are kept in memory for the run and, when cache_dir is set, in a json file
+on disk until they are older than ttl_hours.
+
+'''
+
+# import packages
+from datetime import datetime, timedelta
+from pathlib import Path
+import json
+import os
+import threading
+
+
+#vars
+'''
+DEFINITION:
+------------
+cdw_cur             = open CDW cursor of the region
+app_name            = product name in meta_apps.meta_taps_sra_app_lang_l (prod_nm)
+region              = region key (e.g., 'cdw_eu'). ids are kept per region as each region has its own meta tables
+cache_dir           = (optional) folder for the on-disk cache, relative to this script unless absolute. None or '' = memory only
+ttl_hours           = age after which the ids are looked up again
+app_ids             = list of app_ids as strings
+
+EXAMPLE:
+-----------
+app_ids = get_app_ids(cdw_cur, 'Pluto TV', 'cdw_eu', config.get('runSettings', 'app_id_cache_dir', fallback = ''))
+app_id_filter = f"f.app_id IN ({app_id_literals(app_ids)})"
+'''
+
+
+# used when config.ini does not set app_id_cache_ttl_hours
+default_ttl_hours = 168
+
+cache_file_name = 'app_ids.json'
+
+# ids resolved in this process, shared by every job in the run
+_app_ids = {}
+_app_ids_lock = threading.Lock()
+
+
+def get_app_ids(cdw_cur, app_name, region, cache_dir = None, ttl_hours = default_ttl_hours):
+    '''
+    return the app_ids of the app in the region. looked up in CDW when they are
+    not cached or the cached ids are older than ttl_hours.
+    '''
+
+    key = f'{region}|{app_name}'
+
+    with _app_ids_lock:
+
+        entry = _app_ids.get(key)
+        file_path = get_cache_path(cache_dir)
+
+        if entry is None and file_path is not None and file_path.exists():
+            entry = json.loads(file_path.read_text()).get(key)
+
+        if entry is not None and datetime.now() - datetime.fromisoformat(entry['created_at']) < timedelta(hours = ttl_hours):
+            _app_ids[key] = entry
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> {len(entry['app_ids'])} app_ids for {app_name} in {region} read from cache")
+            return entry['app_ids']
+
+        cdw_cur.execute('''
+            SELECT DISTINCT app_id::VARCHAR
+            FROM meta_apps.meta_taps_sra_app_lang_l
+            WHERE prod_nm = %s
+            ;
+        ''', (app_name,))
+
+        app_ids = sorted([str(row[0]) for row in cdw_cur.fetchall() if row[0] is not None])
+
+        # an unknown app name would otherwise load no rows without an error
+        if len(app_ids) == 0:
+            raise Exception(f"No app_ids found for '{app_name}' in {region}.")
+
+        entry = {'app_ids': app_ids, 'created_at': datetime.now().isoformat()}
+        _app_ids[key] = entry
+
+        if file_path is not None:
+            _write_entry(file_path, key, entry)
+
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> {len(app_ids)} app_ids for {app_name} in {region} looked up in CDW")
+
+        return app_ids
+
+
+def get_cache_path(cache_dir):
+    '''
+    absolute path of the cache file, or None when the on-disk cache is off
+    '''
+
+    if not cache_dir:
+        return None
+
+    cache_root = Path(cache_dir)
+    if not cache_root.is_absolute():
+        cache_root = Path(os.path.dirname(os.path.abspath(__file__))) / cache_root
+
+    return cache_root / cache_file_name
+
+
+def app_id_literals(app_ids):
+    '''
+    quoted literals for an IN list (e.g., '123', '456')
+    '''
+
+    return ', '.join(["'" + app_id.replace("'", "''") + "'" for app_id in app_ids])
+
+
+def _write_entry(file_path, key, entry):
+
+    file_path.parent.mkdir(parents = True, exist_ok = True)
+    cache = json.loads(file_path.read_text()) if file_path.exists() else {}
+    cache[key] = entry
+
+    # write to a temp file first so a failed write never leaves a broken cache
+    temp_path = file_path.with_suffix('.tmp')
+    temp_path.write_text(json.dumps(cache, indent = 4))
+    os.replace(temp_path, file_path)
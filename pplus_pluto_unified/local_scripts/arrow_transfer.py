@@ -0,0 +1,155 @@
+'''
+===================================================
+ARROW TRANSFER FROM CDW TO UDW
+===================================================
+typed transfer layer between psycopg2 and snowflake. rows fetched from CDW are
+turned into arrow record batches with an explicit schema, written to parquet,
+and copied into the UDW prep table. timestamps stay timestamps the whole way,
+so there is no per-row python casting or string round trip.
+
+'''
+
+# import packages
+from datetime import datetime
+from pathlib import Path
+import tempfile
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+#vars
+'''
+DEFINITION:
+------------
+rows                = list of tuples returned by a psycopg2 fetch
+column_names        = column names from cursor.description
+schema              = arrow schema of the UDW prep table (EXP_PREP_SCHEMA, EXP_SUMMARY_PREP_SCHEMA, or APP_PREP_SCHEMA)
+udw_conn            = open snowflake connection. the prep table must exist in this session
+table_name          = UDW prep table to copy the parquet file into
+
+EXAMPLE:
+-----------
+batch = rows_to_record_batch(rows, ['vao', 'vtifa', ...], EXP_PREP_SCHEMA)
+upload_record_batches(udw_conn, [batch], 'EXP_PREP')
+'''
+
+
+# column names are uppercase to match the snowflake prep tables
+EXP_PREP_SCHEMA = pa.schema([
+    ('VAO',                 pa.int64())
+    ,('VTIFA',              pa.string())
+    ,('EXPOSURE_DATETIME',  pa.timestamp('us'))
+    ,('COUNTRY',            pa.string())
+    ,('CAMPAIGN_ID',        pa.int64())
+    ,('CREATIVE_ID',        pa.int64())
+    ,('FLIGHT_ID',          pa.int64())
+    ,('TYPE',               pa.int64())
+    ,('ROW_HASH',           pa.string())
+    ,('PARTNER_ID',         pa.int64())
+])
+
+# one row per device, campaign/creative/flight, type, and day (exposure summary mode)
+EXP_SUMMARY_PREP_SCHEMA = pa.schema([
+    ('VAO',                         pa.int64())
+    ,('VTIFA',                      pa.string())
+    ,('EXPOSURE_DATE',              pa.date32())
+    ,('COUNTRY',                    pa.string())
+    ,('CAMPAIGN_ID',                pa.int64())
+    ,('CREATIVE_ID',                pa.int64())
+    ,('FLIGHT_ID',                  pa.int64())
+    ,('TYPE',                       pa.int64())
+    ,('EXPOSURE_COUNT',             pa.int64())
+    ,('FIRST_EXPOSURE_DATETIME',    pa.timestamp('us'))
+    ,('LAST_EXPOSURE_DATETIME',     pa.timestamp('us'))
+    ,('ROW_HASH',                   pa.string())
+    ,('PARTNER_ID',                 pa.int64())
+])
+
+APP_PREP_SCHEMA = pa.schema([
+    ('TIFA',                pa.string())
+    ,('APP_USAGE_DATETIME', pa.timestamp('us'))
+    ,('COUNTRY',            pa.string())
+    ,('APP_ID',             pa.string())
+    ,('TIME_SPENT_MIN',     pa.int64())
+    ,('USAGE_COUNT',        pa.int64())
+    ,('DATE_IMPORTED',      pa.date32())
+    ,('ROW_HASH',           pa.string())
+])
+
+
+# temporary stage used for the parquet files. dropped with the session
+transfer_stage = 'ARROW_TRANSFER_STAGE'
+
+
+def rows_to_record_batch(rows, column_names, schema):
+    '''
+    build a typed record batch from psycopg2 rows.
+    columns are matched to the schema by name, so the query column order does not matter.
+    '''
+
+    positions = {str(name).upper(): i for i, name in enumerate(column_names)}
+    columns = list(zip(*rows)) if len(rows) > 0 else [() for _ in column_names]
+
+    arrays = []
+    for field in schema:
+        values = columns[positions[field.name]]
+
+        # let arrow infer the source type then cast in C. this covers types that differ
+        # between EU, APAC, and SA (e.g., numeric sums or integer app ids)
+        arrays.append(pa.array(values).cast(field.type))
+
+    return pa.RecordBatch.from_arrays(arrays, schema = schema)
+
+
+def upload_record_batches(udw_conn, batches, table_name, schema = 'UDW_CLIENTSOLUTIONS_CS'):
+    '''
+    write record batches to one parquet file and copy it into the UDW table.
+    returns the number of rows and the parquet file size in bytes.
+    '''
+
+    batches = list(batches)
+    row_count = sum([b.num_rows for b in batches])
+
+    if row_count == 0:
+        return 0, 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        file_path = Path(tmp_dir) / f'{table_name.lower()}_{datetime.now().strftime("%Y%m%d%H%M%S%f")}.parquet'
+        pq.write_table(pa.Table.from_batches(batches), file_path)
+
+        file_bytes = upload_parquet_file(udw_conn, file_path, table_name, schema)
+
+    return row_count, file_bytes
+
+
+def upload_parquet_file(udw_conn, file_path, table_name, schema = 'UDW_CLIENTSOLUTIONS_CS'):
+    '''
+    copy a local parquet file into the UDW table. the local file is kept.
+    returns the file size in bytes.
+    '''
+
+    file_path = Path(file_path)
+    file_bytes = file_path.stat().st_size
+
+    udw_cur = udw_conn.cursor()
+
+    try:
+        # QUIRK!!! PUT needs forward slashes and quotes for windows paths with spaces
+        udw_cur.execute(f"CREATE TEMPORARY STAGE IF NOT EXISTS {schema}.{transfer_stage};")
+        udw_cur.execute(f"PUT 'file://{file_path.as_posix()}' @{schema}.{transfer_stage} AUTO_COMPRESS = FALSE OVERWRITE = TRUE;")
+
+        # USE_LOGICAL_TYPE keeps parquet timestamps as timestamps
+        udw_cur.execute(f'''
+            COPY INTO {schema}.{table_name}
+            FROM @{schema}.{transfer_stage}/{file_path.name}
+            FILE_FORMAT = (TYPE = PARQUET USE_LOGICAL_TYPE = TRUE)
+            MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE
+            PURGE = TRUE
+            ;
+        ''')
+
+    finally:
+        udw_cur.close()
+
+    return file_bytes
@@ -0,0 +1,90 @@
+'''
+===================================================
+STREAM CDW QUERY RESULTS INTO UDW
+===================================================
+reads a CDW query through a named (server-side) psycopg2 cursor in fixed-size
+chunks and uploads each chunk into a UDW table as it arrives. only one chunk
+is held in memory at a time, so peak memory is set by the chunk size and not
+by the size of the result.
+
+chunks are converted to typed arrow record batches and sent to UDW as parquet
+(see arrow_transfer.py). when a checkpoint is passed, each chunk is also kept
+as a local parquet part so a failed run can upload it again without
+re-querying CDW (see checkpoint.py).
+
+'''
+
+# import packages
+from datetime import datetime
+from arrow_transfer import rows_to_record_batch, upload_record_batches, upload_parquet_file
+
+
+#vars
+'''
+DEFINITION:
+------------
+cdw_conn            = open psycopg2 connection. temp tables used by the query must exist in this session
+query               = CDW select statement to stream
+udw_conn            = open snowflake connection. the destination table must exist in this session
+table_name          = UDW table the chunks are written to (uppercase)
+arrow_schema        = arrow schema of the UDW table (e.g., EXP_PREP_SCHEMA)
+chunk_size          = number of rows fetched and uploaded per chunk
+cursor_name         = name of the server-side cursor
+checkpoint          = (optional) SliceCheckpoint that keeps each chunk on local disk
+
+EXAMPLE:
+-----------
+row_count, parquet_bytes = stream_cdw_query_to_udw(cdw_conn, cdw_get_exposure_query, udw_conn, 'EXP_PREP', EXP_PREP_SCHEMA, 500000, 'exposure_stream')
+'''
+
+
+def stream_cdw_query_to_udw(cdw_conn, query, udw_conn, table_name, arrow_schema, chunk_size, cursor_name, schema = 'UDW_CLIENTSOLUTIONS_CS', checkpoint = None):
+
+    total_rows = 0
+    total_bytes = 0
+    chunk_number = 0
+
+    # a named cursor keeps the result on the server and only sends rows on fetch
+    # QUIRK!!! the query is wrapped in a DECLARE statement so it can't end with a semicolon
+    stream_cur = cdw_conn.cursor(name = cursor_name)
+    stream_cur.itersize = chunk_size
+
+    try:
+        stream_cur.execute(query.strip().rstrip(';'))
+
+        while True:
+            rows = stream_cur.fetchmany(chunk_size)
+
+            if len(rows) == 0:
+                break
+
+            chunk_number += 1
+            columns = [d[0] for d in stream_cur.description]
+            batch = rows_to_record_batch(rows, columns, arrow_schema)
+
+            # release the python rows before the upload
+            del rows
+
+            batch_rows, batch_bytes = upload_batch(udw_conn, batch, table_name, schema, checkpoint)
+
+            total_rows += batch_rows
+            total_bytes += batch_bytes
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Chunk {chunk_number} loaded into UDW temp table ({total_rows} rows so far)...")
+
+            del batch
+
+    finally:
+        stream_cur.close()
+
+    return total_rows, total_bytes
+
+
+def upload_batch(udw_conn, batch, table_name, schema = 'UDW_CLIENTSOLUTIONS_CS', checkpoint = None):
+    '''
+    upload one record batch. with a checkpoint the batch is kept as a local part file and that file is uploaded
+    '''
+
+    if checkpoint is not None:
+        return batch.num_rows, upload_parquet_file(udw_conn, checkpoint.write_batch(batch), table_name, schema)
+
+    return upload_record_batches(udw_conn, [batch], table_name, schema)
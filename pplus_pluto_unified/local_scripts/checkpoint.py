@@ -0,0 +1,190 @@
+'''
+===================================================
+LOCAL PARQUET CHECKPOINTS
+===================================================
+keeps the rows extracted from CDW on local disk until they are stored in UDW.
+when a run fails after the CDW extraction (upload or dedup insert), the retry
+reads the checkpoint and goes straight to the upload instead of scanning the
+CDW fact table again.
+
+each region/window slice is a folder with the parquet part files and a
+manifest.json. the manifest is only marked complete once every part is
+written, so a slice from an extraction that failed part way is thrown away
+and extracted again. the folder is removed after a successful dedup insert.
+
+'''
+
+# import packages
+from datetime import datetime, timedelta
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+#vars
+'''
+DEFINITION:
+------------
+checkpoint_dir      = folder that holds the checkpoints. relative paths are relative to this file. '' = off (default)
+job_name            = loader the slice belongs to (e.g., 'exposures')
+cdw_config          = config property used for the CDW connection. identifies the region
+slice_key           = dict of values that identify the extraction (destination tables, reporting end, etc.)
+
+EXAMPLE:
+-----------
+checkpoint = SliceCheckpoint(get_checkpoint_root('checkpoints'), 'exposures', 'personalAccountEU', {'reporting_end': '2024-05-01'})
+
+if checkpoint.is_complete():
+    for file_path in checkpoint.part_paths():
+        upload_parquet_file(udw_conn, file_path, 'EXP_PREP')
+'''
+
+
+# slices left behind by runs that never succeeded are removed after this many days
+max_checkpoint_age_days = 7
+
+
+def get_checkpoint_root(checkpoint_dir):
+    '''
+    absolute checkpoint folder, or None when checkpoints are off.
+    '''
+
+    if not checkpoint_dir:
+        return None
+
+    checkpoint_root = Path(checkpoint_dir)
+    if not checkpoint_root.is_absolute():
+        checkpoint_root = Path(os.path.dirname(os.path.abspath(__file__))) / checkpoint_root
+
+    return checkpoint_root
+
+
+def remove_old_checkpoints(checkpoint_root, max_age_days = max_checkpoint_age_days):
+    '''
+    delete slice folders older than max_age_days.
+    '''
+
+    if checkpoint_root is None or not checkpoint_root.exists():
+        return
+
+    cutoff = datetime.now() - timedelta(days = max_age_days)
+
+    for slice_dir in checkpoint_root.iterdir():
+        if slice_dir.is_dir() and datetime.fromtimestamp(slice_dir.stat().st_mtime) < cutoff:
+            shutil.rmtree(slice_dir, ignore_errors = True)
+
+
+class SliceCheckpoint:
+
+    def __init__(self, checkpoint_root, job_name, cdw_config, slice_key):
+        self.slice_key = dict(slice_key, job = job_name, cdw_config = cdw_config)
+
+        key_hash = hashlib.md5(json.dumps(self.slice_key, sort_keys = True, default = str).encode()).hexdigest()[:12]
+        self.path = Path(checkpoint_root) / f"{job_name}_{cdw_config}_{key_hash}"
+        self.manifest_path = self.path / 'manifest.json'
+        self._part_count = 0
+
+
+    def read_manifest(self):
+
+        if not self.manifest_path.exists():
+            return None
+
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except ValueError:
+            return None
+
+
+    def is_complete(self):
+        '''
+        true when a previous attempt finished extracting this slice and every part file is still there.
+        '''
+
+        manifest = self.read_manifest()
+
+        if manifest is None or manifest.get('status') != 'complete':
+            return False
+
+        return all([(self.path / p).exists() for p in manifest['parts']])
+
+
+    def start(self, file_format):
+        '''
+        clear anything left by an incomplete attempt and open a new slice.
+        file_format is 'arrow' for typed record batches or 'frame' for a cast dataframe
+        '''
+
+        self.clear()
+        self.path.mkdir(parents = True, exist_ok = True)
+        self._part_count = 0
+        self._write_manifest({'status': 'extracting', 'format': file_format, 'parts': []})
+
+
+    def write_batch(self, batch):
+        '''
+        write one record batch as the next part file and return its path.
+        part names start with the slice name, as regions share the UDW stage.
+        '''
+
+        self._part_count += 1
+        file_path = self.path / f"{self.path.name}_part_{self._part_count:05d}.parquet"
+        pq.write_table(pa.Table.from_batches([batch]), file_path)
+
+        return file_path
+
+
+    def write_frame(self, df):
+        '''
+        write a cast dataframe as the next part file and return its path.
+        '''
+
+        self._part_count += 1
+        file_path = self.path / f"{self.path.name}_part_{self._part_count:05d}.parquet"
+        df.to_parquet(file_path, index = False)
+
+        return file_path
+
+
+    def mark_complete(self, row_count):
+
+        manifest = self.read_manifest()
+        manifest['status'] = 'complete'
+        manifest['row_count'] = row_count
+        manifest['parts'] = sorted([p.name for p in self.path.glob('*_part_*.parquet')])
+        self._write_manifest(manifest)
+
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Checkpoint saved: {row_count} rows in {len(manifest['parts'])} parts ({self.path.name})")
+
+
+    def part_paths(self):
+        return [self.path / p for p in self.read_manifest()['parts']]
+
+
+    def read_frame(self):
+        '''
+        read a 'frame' slice back into one dataframe.
+        '''
+
+        parts = [pd.read_parquet(p) for p in self.part_paths()]
+        return pd.concat(parts, ignore_index = True) if len(parts) > 0 else pd.DataFrame()
+
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors = True)
+
+
+    def _write_manifest(self, manifest):
+
+        manifest['slice_key'] = self.slice_key
+        manifest['updated_at'] = datetime.now().isoformat(timespec = 'seconds')
+
+        # write then rename so a crash never leaves a half written manifest
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(manifest, indent = 2, default = str))
+        os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,153 @@
+'''
+===================================================
+PARAMOUNT+ AND PLUTO
+IMPORT EXPOSURE DATA FROM CDW TO UDW
+
+Runs in place of paramount_plus_report_exposures.py and pluto_report_exposures.py.
+Both partners are pulled with one scan of the CDW fact table per region.
+
+Databases:
+    CDW EU
+    CDW APAC
+    CDW SA
+    UDW_PROD
+
+Source Tables:
+    cdw.data_ad_xdevice.fact_delivery_event
+    udw_clientsolutions_cs.paramount_operative_sales_orders
+    udw_clientsolutions_cs.pluto_operative_sales_orders
+
+Destination Tables:
+    udw_clientsolutions_cs.paramount_custom_global_exposure
+    udw_clientsolutions_cs.pluto_custom_global_exposure
+
+===================================================
+'''
+
+# import packages
+import custom_global_exposures as ex
+import region_executor as rx
+from connection_manager import ConnectionManager
+from run_metrics import RunMetrics
+from map_cache import MapCache
+import requests
+import json
+from datetime import datetime
+import configparser
+from pathlib import Path
+import os
+
+
+# shared db sessions and stage timings for the whole run
+connections = None
+metrics = None
+
+# notification sent to slack on failure
+slack_endpoint = 'https://hooks.slack.com/triggers/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'
+
+
+try:
+
+    # get config
+    current_path    = os.path.dirname(os.path.abspath(__file__))
+    config          = configparser.ConfigParser()
+    config_path     = Path(fr'{current_path}\config.ini')
+    config.read(config_path)
+
+
+    # stage timings are written to the run log when the run ends
+    metrics = RunMetrics('combined_report_exposures', history_days = config.getint('runSettings', 'run_log_history_days', fallback = 30))
+
+
+    # open the UDW session once. every region reuses it and the connection hooks
+    # run when it is opened
+    udw_config = 'serviceAccount'
+    connections = ConnectionManager(config, udw_config)
+
+    udw_cur = connections.udw().cursor()
+
+
+    # the creative maps are built once and reused by every region
+    map_cache = MapCache(
+        config.get('runSettings', 'map_cache_dir', fallback = '')
+        ,config.getint('runSettings', 'map_cache_max_age_hours', fallback = 20)
+    )
+
+
+    # paramount sales orders
+    # 13186 --> Paramount+ - Intl
+    # 13187 --> Paramount+  - US
+    with metrics.stage('sales_order_refresh', partner = 'paramount') as stage:
+        udw_cur.execute(f'''
+            CALL udw_clientsolutions_cs.sp_update_custom_operative_sales_orders(
+                advertiser_ids => '13186, 13187'
+                ,destination_table => 'udw_clientsolutions_cs.paramount_operative_sales_orders'
+            );
+        ''')
+        stage.add_query_id(udw_cur)
+
+
+    # pluto sales orders
+    # 13191 --> Pluto TV - Intl
+    # 13190 --> Pluto TV - US
+    with metrics.stage('sales_order_refresh', partner = 'pluto') as stage:
+        udw_cur.execute(f'''
+            CALL udw_clientsolutions_cs.sp_update_custom_operative_sales_orders(
+                advertiser_ids => '13191, 13190'
+                ,destination_table => 'udw_clientsolutions_cs.pluto_operative_sales_orders'
+            );
+        ''')
+        stage.add_query_id(udw_cur)
+
+    udw_cur.close()
+
+
+    #=============
+    # PARAMOUNT+ AND PLUTO
+    #=============
+    # (sales_order_table, destination_table) for each partner
+    partners = [
+        ('udw_clientsolutions_cs.paramount_operative_sales_orders', 'udw_clientsolutions_cs.paramount_custom_global_exposure')
+        ,('udw_clientsolutions_cs.pluto_operative_sales_orders', 'udw_clientsolutions_cs.pluto_custom_global_exposure')
+    ]
+
+
+    # pull EU, APAC, and SA at the same time. Each region has its own CDW session
+    # and shares the UDW session, so a failed region does not stop the others.
+    # Failures are raised together afterwards so they reach the slack notification below.
+    region_jobs = [
+        ('EU', (partners, 'personalAccountEU', udw_config))
+        ,('APAC', (partners, 'personalAccountAPAC', udw_config))
+        ,('SA', (partners, 'personalAccountSA', udw_config))
+    ]
+
+    region_results = rx.run_regions(ex.get_partner_exposures_from_cdw_to_udw, region_jobs, max_workers = rx.get_max_workers(config), connections = connections, map_cache = map_cache, metrics = metrics)
+    rx.raise_for_failed_regions(region_results)
+
+
+except Exception as e:
+
+    # create json
+    # message contains 'Task name/filename' failed
+    url = slack_endpoint
+    headers = {'Content-type': 'application/json'}
+    data = {
+        "date": f"{datetime.now().strftime("%Y-%m-%d %H:%M")}",
+        "message": f"Local Python task 'Combined Auto Mapping Data/combined_report_exposures' failed. Please review the windows task. {e}",
+        "process_name": "Local Python Task Monitor"
+    }
+
+    response = requests.post(url, data=json.dumps(data), headers=headers)
+
+    print(response.status_code)
+    print(response.content)
+
+finally:
+
+    # close connections
+    if connections is not None:
+        connections.close_all()
+
+    # save stage timings, including failed stages
+    if metrics is not None:
+        metrics.write()
@@ -0,0 +1,76 @@
+'''
+===================================================
+COMPACT DATAFRAME TYPES
+===================================================
+helpers used by the loaders' cast functions to keep large CDW frames small
+in memory: integer ids are narrowed to the smallest type that holds them,
+repeated values become categoricals, and free text ids are stored as arrow
+strings instead of python objects.
+
+the memory report prints the deep size of each column before and after the
+cast, so the effect on a large window can be checked in the task log.
+
+'''
+
+# import packages
+from datetime import datetime
+import pandas as pd
+
+
+#vars
+'''
+DEFINITION:
+------------
+series              = dataframe column to convert
+df                  = dataframe to measure
+before              = column sizes from column_memory() before the cast
+after               = column sizes from column_memory() after the cast
+label               = name of the frame in the report (e.g., 'exposures EU')
+
+EXAMPLE:
+-----------
+before = column_memory(cdw_exposure_df)
+cdw_exposure_df['vao'] = narrow_int(cdw_exposure_df['vao'])
+print_memory_report(before, column_memory(cdw_exposure_df), 'exposures personalAccountEU')
+'''
+
+
+def narrow_int(series):
+    '''
+    cast to the smallest signed integer type that holds every value.
+    nulls raise, as they did with astype(int)
+    '''
+
+    return pd.to_numeric(series.astype('int64'), downcast = 'integer')
+
+
+def to_category(series):
+    '''
+    repeated text values (e.g., country) stored once per distinct value
+    '''
+
+    return series.astype(str).astype('category')
+
+
+def to_arrow_string(series):
+    '''
+    text ids stored in one arrow buffer instead of one python object per row
+    '''
+
+    return series.astype(str).astype('string[pyarrow]')
+
+
+def column_memory(df):
+    return df.memory_usage(deep = True, index = False)
+
+
+def print_memory_report(before, after, label):
+
+    lines = [f"{'column':<22}{'before MB':>12}{'after MB':>12}"]
+
+    for column in before.index:
+        lines.append(f"{column:<22}{before[column] / 1024 ** 2:>12.1f}{after.get(column, 0) / 1024 ** 2:>12.1f}")
+
+    lines.append(f"{'total':<22}{before.sum() / 1024 ** 2:>12.1f}{after.sum() / 1024 ** 2:>12.1f}")
+
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Frame memory for {label}:\n" + '\n'.join(['        ' + l for l in lines]))
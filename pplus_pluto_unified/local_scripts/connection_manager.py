@@ -0,0 +1,211 @@
+'''
+===================================================
+SHARED DB CONNECTION MANAGER
+===================================================
+opens each warehouse session once per run and hands it out to every job in
+that run. the UDW session context (role, database, warehouse, schema) is
+applied once when the session is opened. sessions are health checked before
+they are handed out and reopened if they have gone stale.
+
+CDW sessions are opened once per config (one per cluster). jobs that use the
+same CDW config must run one after another, as they share temp tables.
+UDW temp tables are session scoped, so jobs that share the UDW session use
+session_table() to give their temp tables unique names.
+
+'''
+
+# import packages
+from datetime import datetime
+import re
+import threading
+import psycopg2
+import psycopg2.extensions
+import snowflake.connector
+
+
+#vars
+'''
+DEFINITION:
+------------
+config              = parsed config.ini
+udw_config          = config property used for the UDW connection
+cdw_config          = config property used for a CDW connection
+
+EXAMPLE:
+-----------
+connections = ConnectionManager(config, 'serviceAccount')
+udw_cur = connections.udw().cursor()
+cdw_cur = connections.cdw('personalAccountEU').cursor()
+connections.close_all()
+'''
+
+
+udw_session_hooks = [
+    "USE ROLE UDW_CLIENTSOLUTIONS_REPORTING_MAINTAINER_ROLE_PROD;"
+    ,"USE DATABASE UDW_PROD;"
+    ,"USE WAREHOUSE UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD_MEDIUM;"
+    ,"USE SCHEMA UDW_CLIENTSOLUTIONS_CS;"
+]
+
+
+def connect_udw(config, udw_config):
+    '''
+    open a UDW session and run the connection hooks.
+    '''
+
+    udw_conn = snowflake.connector.connect(
+        user = config[udw_config ]["user"],
+        password = config[udw_config ]["password"],
+        account = config[udw_config ]["account"],
+        warehouse = config[udw_config ]["warehouse"],
+        database = config[udw_config ]["database"],
+        schema = config[udw_config ]["schema"]
+    )
+
+    # run connection hooks
+    hook_cur = udw_conn.cursor()
+    for hook in udw_session_hooks:
+        hook_cur.execute(hook)
+    hook_cur.close()
+
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> UDW NA connected.")
+
+    return udw_conn
+
+
+def connect_cdw(config, cdw_config):
+    '''
+    open a CDW session.
+    '''
+
+    cdw_conn = psycopg2.connect(
+        dbname = config[cdw_config]["dbname"],
+        host = config[cdw_config]["host"],
+        port = config[cdw_config]["port"],
+        user = config[cdw_config]["user"],
+        password = config[cdw_config]["password"]
+    )
+
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> CDW connected ({cdw_config})")
+
+    return cdw_conn
+
+
+def session_table(table_name, job_key):
+    '''
+    unique temp table name for a job that shares a session with other jobs.
+    e.g., session_table('EXP_PREP', 'personalAccountEU') = 'EXP_PREP_PERSONALACCOUNTEU'
+    '''
+
+    return f"{table_name}_{re.sub(r'[^A-Za-z0-9]', '', job_key)}".upper()
+
+
+class ConnectionManager:
+
+    def __init__(self, config, udw_config = 'serviceAccount'):
+        self.config = config
+        self.udw_config = udw_config
+        self._udw_conn = None
+        self._cdw_conns = {}
+        self._lock = threading.Lock()
+
+
+    def udw(self):
+        '''
+        return the shared UDW session. reconnects if the session is stale.
+        '''
+
+        with self._lock:
+            if self._udw_conn is None or not self._udw_is_healthy():
+                if self._udw_conn is not None:
+                    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> UDW session is stale. Reconnecting...")
+                    self._close_quietly(self._udw_conn)
+
+                self._udw_conn = connect_udw(self.config, self.udw_config)
+
+            return self._udw_conn
+
+
+    def cdw(self, cdw_config):
+        '''
+        return the shared CDW session for a config. reconnects if the session is stale.
+        '''
+
+        with self._lock:
+            cdw_conn = self._cdw_conns.get(cdw_config)
+
+            if cdw_conn is None or not self._cdw_is_healthy(cdw_conn):
+                if cdw_conn is not None:
+                    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> CDW session ({cdw_config}) is stale. Reconnecting...")
+                    self._close_quietly(cdw_conn)
+
+                cdw_conn = connect_cdw(self.config, cdw_config)
+                self._cdw_conns[cdw_config] = cdw_conn
+
+            return cdw_conn
+
+
+    def open_cdw(self, cdw_config):
+        '''
+        open an extra CDW connection that is not shared (e.g., for parallel slices).
+        the caller closes it
+        '''
+
+        return connect_cdw(self.config, cdw_config)
+
+
+    def close_all(self):
+
+        with self._lock:
+            if self._udw_conn is not None:
+                self._close_quietly(self._udw_conn)
+                self._udw_conn = None
+
+            for cdw_conn in self._cdw_conns.values():
+                self._close_quietly(cdw_conn)
+
+            self._cdw_conns = {}
+
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> All connections disconnected.")
+
+
+    def _udw_is_healthy(self):
+
+        try:
+            if self._udw_conn.is_closed():
+                return False
+
+            check_cur = self._udw_conn.cursor()
+            check_cur.execute("SELECT 1;")
+            check_cur.close()
+            return True
+
+        except Exception:
+            return False
+
+
+    def _cdw_is_healthy(self, cdw_conn):
+
+        try:
+            if cdw_conn.closed:
+                return False
+
+            # a failed statement leaves the transaction aborted. clear it before reuse
+            if cdw_conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+                cdw_conn.rollback()
+
+            check_cur = cdw_conn.cursor()
+            check_cur.execute("SELECT 1;")
+            check_cur.close()
+            return True
+
+        except Exception:
+            return False
+
+
+    def _close_quietly(self, conn):
+
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -1,378 +1,623 @@
-'''
-===================================================
-IMPORT EXPOSURE DATA FROM CDW TO UDW
-===================================================
-imports app usage data for global regions from CDW to UDW.
-
-'''
-
-# import packages
-import datetime
-from datetime import date
-from datetime import datetime, timedelta
-import psycopg2
-import pandas as pd
-import snowflake.connector
-from snowflake.connector.pandas_tools import write_pandas
-import configparser
-from pathlib import Path
-import os
-
-
-#vars
-'''
-DEFINITION:
-------------
-destination_table   = name of table that app usage data will be written to
-cdw_config          = config property used for CDW connection
-udw_config          = config property used for CDW connection
-countries           = coma separated list of 2-digit country codes
-region              = key which indicates which db and region we are reporting on. CDW and EU, SA, APAC, NORDICS
-app_name            = the name of the app we are collecting usage data for 
-
-EXAMPLES:
------------
-destination_table   = 'udw_clientsolutions_cs.paramount_custom_app_usage'
-cdw_config          = 'personalAccountEU'
-udw_config          = 'serviceAccount'
-countries           = 'DE, FR, IT'
-region              = 'cdw_eu' or 'cdw_nordics'
-app_name            = 'Pluto TV'
-
-'''
-
-
-def get_app_usage_from_cdw_to_udw(destination_table, cdw_config, udw_config, countries, region, app_name):
-    
-    # get config
-    current_path    = os.path.dirname(os.path.abspath(__file__))
-    config          = configparser.ConfigParser()
-    config_path     = Path(fr'{current_path}\config.ini')
-    config.read(config_path)
-
-    
-    # output start time
-    start_timestamp = datetime.now()
-    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Opening connections...")
-    
-    
-    #================================================================
-    # START OPEN DB CONNECTIONS
-    #================================================================
-
-    try: 
-        
-        # connect to CDW
-        cdw_conn = psycopg2.connect(
-            dbname = config[cdw_config]["dbname"],
-            host = config[cdw_config]["host"],
-            port = config[cdw_config]["port"],
-            user = config[cdw_config]["user"],
-            password = config[cdw_config]["password"]
-        )
-
-        cdw_cur = cdw_conn.cursor()
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> CDW connected")
-
-
-        # connect to UDW
-        udw_conn = snowflake.connector.connect(
-            user = config[udw_config ]["user"],
-            password = config[udw_config ]["password"],
-            account = config[udw_config ]["account"],
-            warehouse = config[udw_config ]["warehouse"],
-            database = config[udw_config ]["database"],
-            schema = config[udw_config ]["schema"]
-        )
-
-        udw_cur = udw_conn.cursor()
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> UDW NA connected.")
-
-
-        #================================================================
-        # END OPEN DB CONNECTIONS
-        #================================================================
-
-        #================================================================
-        # START- PULL CDW APP USAGE DATA
-        #================================================================
-        
-        # workaround to split countries list up into a table in redshift as there 
-        # is no split-to-table function in redshift.
-        # this implementation can accept up to 20 values in the list
-        cdw_country_query = f'''
-            DROP TABLE IF EXISTS countries_table;
-            CREATE TEMP TABLE countries_table AS (
-                
-                WITH sequence_cte AS (
-                    SELECT 1 AS num UNION ALL
-                    SELECT 2 UNION ALL
-                    SELECT 3 UNION ALL
-                    SELECT 4 UNION ALL
-                    SELECT 5 UNION ALL
-                    SELECT 6 UNION ALL
-                    SELECT 7 UNION ALL
-                    SELECT 8 UNION ALL
-                    SELECT 9 UNION ALL
-                    SELECT 10 UNION ALL
-                    SELECT 11 UNION ALL
-                    SELECT 12 UNION ALL
-                    SELECT 13 UNION ALL
-                    SELECT 14 UNION ALL
-                    SELECT 15 UNION ALL
-                    SELECT 16 UNION ALL
-                    SELECT 17 UNION ALL
-                    SELECT 18 UNION ALL
-                    SELECT 19 UNION ALL
-                    SELECT 20
-                )
-
-                SELECT TRIM(SPLIT_PART('{countries}', ',', s.num)) AS country
-                FROM sequence_cte s
-                WHERE 
-                    country <> ''
-                    
-            );
-        '''
-
-        cdw_cur.execute(cdw_country_query)
-        
-        
-        # set dates in temp table as CDW does not have variables
-        # script updated to go back 6 months instead of x days on initial load, then 2 weeks going forward
-        #---------------------------------------------------------------------------------
-        #--------------
-        # production
-        #--------------
-        cdw_variable_query = f'''
-            DROP TABLE IF EXISTS variable_table;
-            CREATE TEMP TABLE variable_table AS (
-                SELECT 
-                    DATEADD('week', -2, CURRENT_DATE)::TIMESTAMP AS reporting_start
-                    ,(LEFT(DATEADD('day', -1, CURRENT_DATE), 10)::VARCHAR || ' 23:59:59')::TIMESTAMP AS reporting_end  
-                    ,DATEADD('week', -2, CURRENT_DATE)::TIMESTAMP AS quarter_start  
-                    -- ,DATE_TRUNC('quarter', CURRENT_DATE)::TIMESTAMP AS quarter_start
-            );
-        '''
-        
-        #--------------
-        # test
-        #--------------
-        # cdw_variable_query = f'''
-        #     DROP TABLE IF EXISTS variable_table;
-        #     CREATE TEMP TABLE variable_table AS (
-        #         SELECT 
-        #             '2023-11-01 00:00:00'::TIMESTAMP AS reporting_start
-        #             ,'2023-11-01 00:00:00'::TIMESTAMP AS quarter_start
-        #             ,'2024-04-30 23:59:59'::TIMESTAMP AS reporting_end  
-        #     );
-        # '''
-
-        cdw_cur.execute(cdw_variable_query)
-        
-        #---------------------------------------------------------------------------------
-
-
-        # query for app usage depending on region specified
-        if region in ('cdw_apac', 'cdw_eu', 'cdw_sa'):
-            
-            # get app data for EU, AU, SA
-            cdw_app_query = f'''
-                SELECT 
-                    psid_tvid(f.psid) AS tifa
-                    ,f.start_timestamp AS app_usage_datetime
-                    ,f.country
-                    ,f.app_id
-                    ,SUM(DATEDIFF('minutes', f.start_timestamp, f.end_timestamp)) AS time_spent_min
-                    ,COUNT(*) AS usage_count
-                    ,CURRENT_DATE AS date_imported
-                FROM data_tv_acr.fact_app_usage_session f
-                    JOIN variable_table v ON 1 = 1
-                WHERE 
-                    f.app_id IN (
-                        SELECT DISTINCT app_id 
-                        FROM meta_apps.meta_taps_sra_app_lang_l 
-                        WHERE prod_nm = '{app_name}'
-                    ) 
-                    AND f.country IN (SELECT DISTINCT ct.country FROM countries_table ct)
-                    AND DATEDIFF('second', f.start_timestamp, f.end_timestamp) >= 60
-                    AND f.partition_datehour BETWEEN 
-                        (TO_CHAR(CAST(LEAST(v.quarter_start, v.reporting_start) AS DATE), 'yyyymmdd') || '00') 
-                        AND (TO_CHAR(CAST(v.reporting_end AS DATE), 'yyyymmdd') || '23')
-                GROUP BY 1, 2, 3, 4, 7
-                ;
-            '''
-            
-        elif region in ('cdw_nordics'):
-            
-            # get app data for nordics
-            # a different table is used for nordics and no time duration data is available
-            # so we need a different query for notdics.
-            cdw_app_query = f'''
-                SELECT 
-                    psid_tvid(f.psid) AS tifa 
-                    ,f.event_time AS app_usage_datetime
-                    ,f.country
-                    ,f.app_id
-                    ,0 AS time_spent_min    --> time usage not available for nordics
-                    ,COUNT(*) AS usage_count
-                    ,CURRENT_DATE AS date_imported
-                FROM data_tv_smarthub.fact_app_opened_event f
-                    JOIN variable_table v ON 1 = 1
-                WHERE 
-                    f.app_id IN (
-                        SELECT DISTINCT app_id::VARCHAR 
-                        FROM meta_apps.meta_taps_sra_app_lang_l 
-                        WHERE prod_nm = '{app_name}'
-                    ) 
-                    AND f.country IN (SELECT DISTINCT ct.country FROM countries_table ct)
-                    AND f.partition_date BETWEEN 
-                        (TO_CHAR(CAST(LEAST(v.quarter_start, v.reporting_start) AS DATE), 'yyyymmdd')) 
-                        AND (TO_CHAR(CAST(v.reporting_end AS DATE), 'yyyymmdd'))
-                GROUP BY 1, 2, 3, 4, 7
-                ;
-            '''
-            
-        else:
-            
-            # if we are here, and invalid region was specified
-            raise Exception("Invalid region supplied.")
-            
-            
-        # store results of app usage query in a dataframe
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> CDW getting app usage...")
-        cdw_app_use_df = pd.read_sql(cdw_app_query, con = cdw_conn)
-        
-        
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> CDW preparing app usage data...")
-        
-        # specify data type for fields as these may be different between EU, APAC, and SA
-        if len(cdw_app_use_df) > 0:    
-            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Casting data type for each column...")
-            cdw_app_use_df['tifa']                  = cdw_app_use_df['tifa'].astype(str)
-            cdw_app_use_df['app_usage_datetime']    = cdw_app_use_df['app_usage_datetime'].apply(pd.to_datetime).dt.strftime('%Y-%m-%d %H:%M:%S').astype(str)
-            cdw_app_use_df['country']               = cdw_app_use_df['country'].astype(str)
-            cdw_app_use_df['app_id']                = cdw_app_use_df['app_id'].astype(str)
-            cdw_app_use_df['time_spent_min']        = cdw_app_use_df['time_spent_min'].astype(int)
-            cdw_app_use_df['usage_count']           = cdw_app_use_df['usage_count'].astype(int)
-            cdw_app_use_df['date_imported']         = cdw_app_use_df['date_imported'].apply(pd.to_datetime).dt.strftime('%Y-%m-%d').astype(str)
-        else:
-            print("No data to update!")
-            
-            
-        # run connection hooks again for UDW. May be unnecessary
-        udw_cur.execute("USE ROLE UDW_CLIENTSOLUTIONS_REPORTING_MAINTAINER_ROLE_PROD;")
-        udw_cur.execute("USE DATABASE UDW_PROD;")
-        udw_cur.execute("USE WAREHOUSE UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD_MEDIUM;")
-        udw_cur.execute("USE SCHEMA UDW_CLIENTSOLUTIONS_CS;")
-
-
-        # prepare to bring data into UDW by creating a temp table in UDW
-        udw_import_prep_query = f'''
-            CREATE TEMP TABLE APP_PREP (
-                tifa VARCHAR
-                ,app_usage_datetime TIMESTAMP
-                ,country VARCHAR
-                ,app_id VARCHAR
-                ,time_spent_min BIGINT
-                ,usage_count INT
-                ,date_imported DATE
-            );
-        '''
-
-        udw_cur.execute(udw_import_prep_query)
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> UDW temp table created...")
-        
-        
-        # write_pandas QUIRK!!! columns must be uppercase or error is thrown
-        cdw_app_use_df.columns = map(lambda x: str(x).upper(), cdw_app_use_df.columns)
-
-        # print(cdw_app_use_df)
-        
-        
-        # write CDW app use data into UDW
-        # write_pandas QUIRK!!! table name and schema should be uppercase
-        write_pandas(
-            conn            = udw_conn                      # db connection
-            ,df             = cdw_app_use_df                # pandas dataframe (data)
-            ,table_name     = 'APP_PREP'                    # table to copy data into
-            ,schema         = 'UDW_CLIENTSOLUTIONS_CS'      # schema to use
-        )
-
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Data loaded into UDW temp table...")
-        
-        
-        # insert new data (any rows not already in the UDW table)
-        udw_import_query = f'''
-            INSERT INTO {destination_table} (
-                SELECT
-                    tifa
-                    ,app_usage_datetime::TIMESTAMP
-                    ,country
-                    ,app_id
-                    ,time_spent_min
-                    ,usage_count
-                    ,date_imported::DATE AS date_imported
-                FROM app_prep AS new_data
-                WHERE 
-                    NOT EXISTS (
-                        SELECT 1
-                        FROM {destination_table} AS old_data
-                        WHERE 
-                            old_data.tifa                       = new_data.tifa
-                            AND old_data.app_usage_datetime     = new_data.app_usage_datetime 
-                            AND old_data.country                = new_data.country
-                            AND old_data.app_id                 = new_data.app_id
-                            AND old_data.time_spent_min         = new_data.time_spent_min
-                    )
-            )
-        ;
-        '''
-
-        udw_cur.execute(udw_import_query)
-
-        #================================================================
-        # END - PULL CDW EXPOSURE DATA
-        #================================================================
-        
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Process completed sucessfully.")
-    
-    except Exception as e:
-        
-        # get exception as pass it back up to the calling script
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Process failed.")
-        
-        raise Exception("App usage data was not able to be retrieved.") from e
-
-    finally:
-        
-        #================================================================
-        # START CLOSE DB CONNECTIONS
-        #================================================================
-
-        udw_cur.close()
-        udw_conn.close()
-
-        cdw_cur.close()
-        cdw_conn.close()
-
-
-        #================================================================
-        # END CLOSE DB CONNECTIONS
-        #================================================================
-        
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> All connections disconnected.")
-        end_timestamp = datetime.now()
-        time_used = end_timestamp - start_timestamp
-
-
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Total running time: ", str(time_used).split('.')[0])
-        
-        
-        return True
-
-
-
-
-
-
+'''
+===================================================
+IMPORT EXPOSURE DATA FROM CDW TO UDW
+===================================================
+imports app usage data for global regions from CDW to UDW.
+
+'''
+
+# import packages
+import datetime
+from datetime import date
+from datetime import datetime, timedelta
+import pandas as pd
+from snowflake.connector.pandas_tools import write_pandas
+import configparser
+from connection_manager import connect_cdw, connect_udw, session_table
+from run_metrics import RunMetrics
+from cdw_streaming import stream_cdw_query_to_udw
+from arrow_transfer import APP_PREP_SCHEMA
+from unload_transfer import get_unload_settings, use_unload_transfer, unload_cdw_query_to_udw
+from compact_frames import narrow_int, to_category, to_arrow_string, column_memory, print_memory_report
+from partition_manifest import get_changed_partitions, load_changed_partitions, update_partition_manifest
+from app_id_cache import get_app_ids, app_id_literals, default_ttl_hours
+from slice_extractor import extract_slices_to_udw, default_max_connections
+from pathlib import Path
+import os
+
+
+#vars
+'''
+DEFINITION:
+------------
+destination_table   = name of table that app usage data will be written to
+cdw_config          = config property used for CDW connection
+udw_config          = config property used for CDW connection
+countries           = coma separated list of 2-digit country codes
+region              = key which indicates which db and region we are reporting on. CDW and EU, SA, APAC, NORDICS
+app_name            = the name of the app we are collecting usage data for 
+stream_chunk_size   = (optional) rows per chunk for streaming mode. None = use config.ini, 0 = load all rows at once
+connections         = (optional) ConnectionManager shared by all jobs in the run. None = open and close connections here
+metrics             = (optional) RunMetrics shared by all jobs in the run. None = write this job's stages to the run log here
+unload              = (optional) True/False forces the S3 bulk transfer on or off (e.g., True for a 6 month reset). None = use config.ini
+change_detection    = (optional) True = only extract CDW partitions whose row count or checksum changed since they were loaded. None = use config.ini
+country_groups      = (optional) number of country groups read at the same time over separate CDW connections. None = use config.ini, 0 or 1 = one query for all countries
+
+EXAMPLES:
+-----------
+destination_table   = 'udw_clientsolutions_cs.paramount_custom_app_usage'
+cdw_config          = 'personalAccountEU'
+udw_config          = 'serviceAccount'
+countries           = 'DE, FR, IT'
+region              = 'cdw_eu' or 'cdw_nordics'
+app_name            = 'Pluto TV'
+
+'''
+
+
+def cast_app_use_df(cdw_app_use_df):
+    '''
+    specify data type for fields as these may be different between EU, APAC, and SA
+    types are kept compact (see compact_frames.py) so large windows fit in memory.
+    datetimes stay datetimes instead of strings and are uploaded with use_logical_type
+    '''
+
+    cdw_app_use_df['tifa']                  = to_arrow_string(cdw_app_use_df['tifa'])
+    cdw_app_use_df['app_usage_datetime']    = pd.to_datetime(cdw_app_use_df['app_usage_datetime'])
+    cdw_app_use_df['country']               = to_category(cdw_app_use_df['country'])
+    cdw_app_use_df['app_id']                = to_category(cdw_app_use_df['app_id'])
+    cdw_app_use_df['time_spent_min']        = narrow_int(cdw_app_use_df['time_spent_min'])
+    cdw_app_use_df['usage_count']           = narrow_int(cdw_app_use_df['usage_count'])
+    cdw_app_use_df['date_imported']         = to_category(pd.to_datetime(cdw_app_use_df['date_imported']).dt.strftime('%Y-%m-%d'))
+    cdw_app_use_df['row_hash']              = to_arrow_string(cdw_app_use_df['row_hash'])
+
+    return cdw_app_use_df
+
+
+def build_app_queries(region, app_ids, countries, change_detection = False):
+    '''
+    return the app usage query and the partition check query for the region.
+    countries are passed as literals, so any number of countries can be used
+    and each country group of the parallel mode gets its own query.
+    '''
+
+    country_literals = ', '.join(["'" + c.replace("'", "''") + "'" for c in countries])
+
+    # query for app usage depending on region specified
+    if region in ('cdw_apac', 'cdw_eu', 'cdw_sa'):
+
+        # get app data for EU, AU, SA
+        cdw_app_source = f'''
+            FROM data_tv_acr.fact_app_usage_session f
+                JOIN variable_table v ON 1 = 1
+            WHERE 
+                f.app_id IN ({app_id_literals(app_ids)})
+                AND f.country IN ({country_literals})
+                AND DATEDIFF('second', f.start_timestamp, f.end_timestamp) >= 60
+                AND f.partition_datehour BETWEEN 
+                    (TO_CHAR(CAST(LEAST(v.quarter_start, v.reporting_start) AS DATE), 'yyyymmdd') || '00') 
+                    AND (TO_CHAR(CAST(v.reporting_end AS DATE), 'yyyymmdd') || '23')
+        '''
+
+        cdw_app_query = f'''
+            SELECT 
+                psid_tvid(f.psid) AS tifa
+                ,f.start_timestamp AS app_usage_datetime
+                ,f.country
+                ,f.app_id
+                ,SUM(DATEDIFF('minutes', f.start_timestamp, f.end_timestamp)) AS time_spent_min
+                ,COUNT(*) AS usage_count
+                ,CURRENT_DATE AS date_imported
+            {cdw_app_source}
+                {'AND f.partition_datehour IN (SELECT cp.partition_key FROM changed_partitions cp)' if change_detection else ''}
+            GROUP BY 1, 2, 3, 4, 7
+            ;
+        '''
+
+        # row count and checksum of each hourly partition over the same rows as the app query
+        cdw_partition_query = f'''
+            SELECT 
+                f.partition_datehour AS partition_key
+                ,COUNT(*) AS row_count
+                ,SUM(FNV_HASH(f.end_timestamp, FNV_HASH(f.start_timestamp, FNV_HASH(f.psid)))::DECIMAL(38, 0))::VARCHAR AS checksum
+            {cdw_app_source}
+            GROUP BY 1
+            ;
+        '''
+
+    elif region in ('cdw_nordics'):
+
+        # get app data for nordics
+        # a different table is used for nordics and no time duration data is available
+        # so we need a different query for notdics.
+        cdw_app_source = f'''
+            FROM data_tv_smarthub.fact_app_opened_event f
+                JOIN variable_table v ON 1 = 1
+            WHERE 
+                f.app_id IN ({app_id_literals(app_ids)})
+                AND f.country IN ({country_literals})
+                AND f.partition_date BETWEEN 
+                    (TO_CHAR(CAST(LEAST(v.quarter_start, v.reporting_start) AS DATE), 'yyyymmdd')) 
+                    AND (TO_CHAR(CAST(v.reporting_end AS DATE), 'yyyymmdd'))
+        '''
+
+        cdw_app_query = f'''
+            SELECT 
+                psid_tvid(f.psid) AS tifa 
+                ,f.event_time AS app_usage_datetime
+                ,f.country
+                ,f.app_id
+                ,0 AS time_spent_min    --> time usage not available for nordics
+                ,COUNT(*) AS usage_count
+                ,CURRENT_DATE AS date_imported
+            {cdw_app_source}
+                {'AND f.partition_date IN (SELECT cp.partition_key FROM changed_partitions cp)' if change_detection else ''}
+            GROUP BY 1, 2, 3, 4, 7
+            ;
+        '''
+
+        # row count and checksum of each daily partition over the same rows as the app query
+        cdw_partition_query = f'''
+            SELECT 
+                f.partition_date AS partition_key
+                ,COUNT(*) AS row_count
+                ,SUM(FNV_HASH(f.event_time, FNV_HASH(f.psid))::DECIMAL(38, 0))::VARCHAR AS checksum
+            {cdw_app_source}
+            GROUP BY 1
+            ;
+        '''
+
+    else:
+
+        # if we are here, and invalid region was specified
+        raise Exception("Invalid region supplied.")
+
+
+    # add a row identity used for dedup in UDW
+    # must match the formula in snowflake_scripts/example_backfill_row_hash.sql
+    cdw_app_query = f'''
+        SELECT
+            q.*
+            ,MD5(
+                COALESCE(q.tifa::VARCHAR, '')
+                || '|' || COALESCE(TO_CHAR(q.app_usage_datetime, 'YYYY-MM-DD HH24:MI:SS'), '')
+                || '|' || COALESCE(q.country::VARCHAR, '')
+                || '|' || COALESCE(q.app_id::VARCHAR, '')
+                || '|' || COALESCE(q.time_spent_min::VARCHAR, '')
+            ) AS row_hash
+        FROM ({cdw_app_query.strip().rstrip(';')}) q
+        ;
+    '''
+
+    return cdw_app_query, cdw_partition_query
+
+
+def get_country_groups(udw_cur, destination_table, countries, group_count):
+    '''
+    split the countries into group_count groups of about the same volume.
+    the volume of a country is the number of rows it loaded into the destination
+    table over the last 2 weeks. countries without rows are spread by count.
+    '''
+
+    if group_count >= len(countries):
+        return [[c] for c in countries]
+
+    country_literals = ', '.join(["'" + c.replace("'", "''") + "'" for c in countries])
+
+    udw_cur.execute(f'''
+        SELECT country, COUNT(*)
+        FROM {destination_table}
+        WHERE 
+            app_usage_datetime >= DATEADD('week', -2, CURRENT_DATE)
+            AND country IN ({country_literals})
+        GROUP BY 1
+        ;
+    ''')
+
+    volumes = {str(country).upper(): int(row_count) for country, row_count in udw_cur.fetchall()}
+
+    # largest country first into the group with the least volume (then the fewest countries)
+    groups = [[] for i in range(group_count)]
+    group_volumes = [0] * group_count
+
+    for country in sorted(countries, key = lambda c: volumes.get(c, 0), reverse = True):
+        i = min(range(group_count), key = lambda g: (group_volumes[g], len(groups[g])))
+        groups[i].append(country)
+        group_volumes[i] += volumes.get(country, 0)
+
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Country groups by volume: " + ' | '.join([f"{', '.join(g)} ({v} rows)" for g, v in zip(groups, group_volumes)]))
+
+    return [g for g in groups if len(g) > 0]
+
+
+def get_app_usage_from_cdw_to_udw(destination_table, cdw_config, udw_config, countries, region, app_name, stream_chunk_size = None, connections = None, metrics = None, unload = None, change_detection = None, country_groups = None):
+    
+    # get config
+    current_path    = os.path.dirname(os.path.abspath(__file__))
+    config          = configparser.ConfigParser()
+    config_path     = Path(fr'{current_path}\config.ini')
+    config.read(config_path)
+
+
+    # stream CDW rows in chunks instead of loading the whole result at once
+    # falls back to stream_chunk_size under [runSettings] in config.ini. 0 or missing = off
+    if stream_chunk_size is None:
+        stream_chunk_size = config.getint('runSettings', 'stream_chunk_size', fallback = 0)
+
+
+    # compare per partition row counts and checksums with the manifest and only extract the partitions that moved
+    # (see partition_manifest.py). 'false' or missing = re-read the whole window
+    if change_detection is None:
+        change_detection = config.getboolean('runSettings', 'app_usage_change_detection', fallback = False)
+
+
+    # read groups of countries at the same time over separate CDW connections (streaming mode only)
+    # the connections per cluster are capped by max_slice_connections (see slice_extractor.py)
+    if country_groups is None:
+        country_groups = config.getint('runSettings', 'app_usage_country_groups', fallback = 0)
+
+
+    # stage timings for the run log. a job run on its own writes its own entries
+    own_metrics = metrics is None
+    if own_metrics:
+        metrics = RunMetrics('custom_global_app_use', history_days = config.getint('runSettings', 'run_log_history_days', fallback = 30))
+
+
+    # large windows can go from CDW to UDW through S3 (see unload_transfer.py)
+    # the transfer is picked once the window is set in cdw_variable_query below
+    unload_settings = get_unload_settings(config)
+
+    
+    # output start time
+    start_timestamp = datetime.now()
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Opening connections...")
+    
+    
+    #================================================================
+    # START OPEN DB CONNECTIONS
+    #================================================================
+
+    cdw_conn = cdw_cur = udw_conn = udw_cur = None
+
+    try: 
+        
+        # use the run's shared sessions when given, otherwise open our own
+        # the UDW connection hooks are run when the session is opened
+        if connections is not None:
+            cdw_conn = connections.cdw(cdw_config)
+            udw_conn = connections.udw()
+        else:
+            cdw_conn = connect_cdw(config, cdw_config)
+            udw_conn = connect_udw(config, udw_config)
+
+        cdw_cur = cdw_conn.cursor()
+        udw_cur = udw_conn.cursor()
+
+
+        # temp table gets a per-region name as the UDW session may be shared with other regions
+        prep_table = session_table('APP_PREP', region)
+
+
+        #================================================================
+        # END OPEN DB CONNECTIONS
+        #================================================================
+
+        #================================================================
+        # START- PULL CDW APP USAGE DATA
+        #================================================================
+        
+        # the countries are passed to the queries as literals (e.g., 'AT', 'DE'), so the list can have any length
+        country_list = [c.strip().upper() for c in countries.split(',') if c.strip() != '']
+
+
+        # set dates in temp table as CDW does not have variables
+        # script updated to go back 6 months instead of x days on initial load, then 2 weeks going forward
+        #---------------------------------------------------------------------------------
+        #--------------
+        # production
+        #--------------
+        cdw_variable_query = f'''
+            DROP TABLE IF EXISTS variable_table;
+            CREATE TEMP TABLE variable_table AS (
+                SELECT 
+                    DATEADD('week', -2, CURRENT_DATE)::TIMESTAMP AS reporting_start
+                    ,(LEFT(DATEADD('day', -1, CURRENT_DATE), 10)::VARCHAR || ' 23:59:59')::TIMESTAMP AS reporting_end  
+                    ,DATEADD('week', -2, CURRENT_DATE)::TIMESTAMP AS quarter_start  
+                    -- ,DATE_TRUNC('quarter', CURRENT_DATE)::TIMESTAMP AS quarter_start
+            );
+        '''
+        
+        #--------------
+        # test
+        #--------------
+        # cdw_variable_query = f'''
+        #     DROP TABLE IF EXISTS variable_table;
+        #     CREATE TEMP TABLE variable_table AS (
+        #         SELECT 
+        #             '2023-11-01 00:00:00'::TIMESTAMP AS reporting_start
+        #             ,'2023-11-01 00:00:00'::TIMESTAMP AS quarter_start
+        #             ,'2024-04-30 23:59:59'::TIMESTAMP AS reporting_end  
+        #     );
+        # '''
+
+        cdw_cur.execute(cdw_variable_query)
+        
+        #---------------------------------------------------------------------------------
+
+
+        # the bulk transfer is picked on the window every mode reads from variable_table
+        cdw_cur.execute("SELECT LEAST(quarter_start, reporting_start) FROM variable_table;")
+        window_days = (date.today() - cdw_cur.fetchone()[0].date()).days
+        unload_transfer = use_unload_transfer(unload_settings, window_days, unload)
+
+
+        # app_ids of the app are resolved once per region and cached (see app_id_cache.py)
+        # and passed to the fact queries as literals so CDW can filter on app_id directly
+        app_ids = get_app_ids(
+            cdw_cur
+            ,app_name
+            ,region
+            ,config.get('runSettings', 'app_id_cache_dir', fallback = '')
+            ,config.getint('runSettings', 'app_id_cache_ttl_hours', fallback = default_ttl_hours)
+        )
+
+
+        # app usage query for all countries of the region and the partition check query over the same rows
+        cdw_app_query, cdw_partition_query = build_app_queries(region, app_ids, country_list, change_detection)
+            
+            
+        # prepare to bring data into UDW by creating a temp table in UDW
+        udw_import_prep_query = f'''
+            CREATE OR REPLACE TEMP TABLE {prep_table} (
+                tifa VARCHAR
+                ,app_usage_datetime TIMESTAMP
+                ,country VARCHAR
+                ,app_id VARCHAR
+                ,time_spent_min BIGINT
+                ,usage_count INT
+                ,date_imported DATE
+                ,row_hash VARCHAR(32)
+            );
+        '''
+
+        udw_cur.execute(udw_import_prep_query)
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> UDW temp table created...")
+
+
+        # change detection pass: only the partitions that are new or changed since the last load are extracted
+        if change_detection:
+            with metrics.stage('cdw_partition_check', region = region) as stage:
+                cdw_cur.execute(cdw_partition_query)
+                partitions = cdw_cur.fetchall()
+                changed_partitions = get_changed_partitions(udw_cur, destination_table, region, partitions)
+                stage.rows = len(changed_partitions)
+                stage.add_query_id(cdw_cur)
+
+            load_changed_partitions(cdw_cur, changed_partitions)
+
+
+        if change_detection and len(changed_partitions) == 0:
+
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> No CDW partitions changed since the last load. Nothing to extract.")
+
+        elif unload_transfer:
+
+            # bulk mode: CDW unloads parquet to S3 and UDW copies it in. rows do not pass through this process
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> {window_days} day window. CDW transferring app usage through S3...")
+            with metrics.stage('cdw_unload_copy', region = region) as stage:
+                row_count, stage.bytes = unload_cdw_query_to_udw(cdw_conn, cdw_app_query, udw_conn, prep_table, unload_settings, f'app_usage_{region}')
+                stage.rows = row_count
+
+            if row_count == 0:
+                print("No data to update!")
+
+        elif stream_chunk_size and country_groups > 1 and len(country_list) > 1:
+
+            # parallel streaming mode: one query per country group, each on its own CDW connection
+            # with a country filter CDW can prune on. one uploader loads the chunks into UDW
+            groups = get_country_groups(udw_cur, destination_table, country_list, country_groups)
+
+            if connections is not None:
+                open_cdw = lambda: connections.open_cdw(cdw_config)
+            else:
+                open_cdw = lambda: connect_cdw(config, cdw_config)
+
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> CDW streaming app usage into UDW in {len(groups)} country groups...")
+
+            # each connection needs its own temp tables
+            def prepare_session(group_cur):
+                group_cur.execute(cdw_variable_query)
+                if change_detection:
+                    load_changed_partitions(group_cur, changed_partitions)
+
+            with metrics.stage('cdw_country_extract_upload', region = region) as stage:
+                row_count, stage.bytes = extract_slices_to_udw(
+                    open_cdw
+                    ,prepare_session
+                    ,lambda group_cur, group: None
+                    ,lambda group: build_app_queries(region, app_ids, group.split(', '), change_detection)[0]
+                    ,[(', '.join(g),) for g in groups]
+                    ,udw_conn
+                    ,prep_table
+                    ,APP_PREP_SCHEMA
+                    ,stream_chunk_size
+                    ,cdw_config
+                    ,config.getint(cdw_config, 'max_slice_connections', fallback = default_max_connections)
+                    ,'app_usage_country'
+                )
+                stage.rows = row_count
+
+            if row_count == 0:
+                print("No data to update!")
+
+        elif stream_chunk_size:
+
+            # streaming mode: read CDW rows in chunks and upload each chunk as typed parquet as it arrives
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> CDW streaming app usage into UDW in chunks of {stream_chunk_size} rows...")
+            with metrics.stage('cdw_extract_upload', region = region) as stage:
+                row_count, stage.bytes = stream_cdw_query_to_udw(cdw_conn, cdw_app_query, udw_conn, prep_table, APP_PREP_SCHEMA, stream_chunk_size, 'app_usage_stream')
+                stage.rows = row_count
+
+            if row_count == 0:
+                print("No data to update!")
+
+        else:
+
+            # store results of app usage query in a dataframe
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> CDW getting app usage...")
+            with metrics.stage('cdw_extract', region = region) as stage:
+                cdw_app_use_df = pd.read_sql(cdw_app_query, con = cdw_conn)
+                stage.rows = len(cdw_app_use_df)
+                stage.add_query_id(cdw_cur)
+
+
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> CDW preparing app usage data...")
+
+            # specify data type for fields as these may be different between EU, APAC, and SA
+            if len(cdw_app_use_df) > 0:
+                print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Casting data type for each column...")
+                memory_before = column_memory(cdw_app_use_df)
+
+                with metrics.stage('cast', region = region) as stage:
+                    cdw_app_use_df = cast_app_use_df(cdw_app_use_df)
+                    stage.rows = len(cdw_app_use_df)
+
+                print_memory_report(memory_before, column_memory(cdw_app_use_df), f'app usage {region}')
+            else:
+                print("No data to update!")
+
+
+            # write_pandas QUIRK!!! columns must be uppercase or error is thrown
+            cdw_app_use_df.columns = map(lambda x: str(x).upper(), cdw_app_use_df.columns)
+
+            # print(cdw_app_use_df)
+
+
+            # write CDW app use data into UDW
+            # write_pandas QUIRK!!! table name and schema should be uppercase
+            with metrics.stage('udw_upload', region = region) as stage:
+                write_pandas(
+                    conn            = udw_conn                      # db connection
+                    ,df             = cdw_app_use_df                # pandas dataframe (data)
+                    ,table_name     = prep_table                    # table to copy data into
+                    ,schema         = 'UDW_CLIENTSOLUTIONS_CS'      # schema to use
+                    ,use_logical_type = True                        # datetime columns are loaded as timestamps
+                )
+                stage.rows = len(cdw_app_use_df)
+                stage.bytes = int(cdw_app_use_df.memory_usage(deep = True).sum())
+
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Data loaded into UDW temp table...")
+        
+        
+        # get the date range of the incoming batch so the dedup only reads
+        # that slice of the destination table instead of its whole history
+        udw_cur.execute(f"SELECT MIN(app_usage_datetime), MAX(app_usage_datetime) FROM {prep_table};")
+        batch_start, batch_end = udw_cur.fetchone()
+
+
+        # insert new data (any rows not already in the UDW table)
+        # rows are matched on row_hash, which covers the five app usage key columns
+        if batch_start is not None:
+
+            udw_import_query = f'''
+                INSERT INTO {destination_table} (
+                    tifa
+                    ,app_usage_datetime
+                    ,country
+                    ,app_id
+                    ,time_spent_min
+                    ,usage_count
+                    ,date_imported
+                    ,row_hash
+                )
+                SELECT
+                    new_data.tifa
+                    ,new_data.app_usage_datetime::TIMESTAMP
+                    ,new_data.country
+                    ,new_data.app_id
+                    ,new_data.time_spent_min
+                    ,new_data.usage_count
+                    ,new_data.date_imported::DATE AS date_imported
+                    ,new_data.row_hash
+                FROM {prep_table} AS new_data
+                    LEFT JOIN (
+                        SELECT DISTINCT row_hash
+                        FROM {destination_table}
+                        WHERE app_usage_datetime BETWEEN '{batch_start}'::TIMESTAMP AND '{batch_end}'::TIMESTAMP
+                    ) AS old_data ON old_data.row_hash = new_data.row_hash
+                WHERE 
+                    old_data.row_hash IS NULL
+            ;
+            '''
+
+            with metrics.stage('dedup_insert', region = region) as stage:
+                udw_cur.execute(udw_import_query)
+                stage.rows = udw_cur.rowcount
+                stage.add_query_id(udw_cur)
+
+
+        # the changed partitions are stored, so record their counts and checksums for the next run
+        if change_detection:
+            update_partition_manifest(udw_cur, destination_table, region, changed_partitions, partitions)
+
+        #================================================================
+        # END - PULL CDW EXPOSURE DATA
+        #================================================================
+        
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Process completed sucessfully.")
+    
+    except Exception as e:
+        
+        # get exception as pass it back up to the calling script
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Process failed.")
+        
+        raise Exception("App usage data was not able to be retrieved.") from e
+
+    finally:
+        
+        #================================================================
+        # START CLOSE DB CONNECTIONS
+        #================================================================
+
+        if udw_cur is not None:
+            udw_cur.close()
+
+        if cdw_cur is not None:
+            cdw_cur.close()
+
+        if connections is None:
+
+            if udw_conn is not None:
+                udw_conn.close()
+
+            if cdw_conn is not None:
+                cdw_conn.close()
+
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> All connections disconnected.")
+
+        elif cdw_conn is not None and not cdw_conn.closed:
+
+            # end the CDW transaction so the shared session is clean for the next job
+            cdw_conn.rollback()
+
+
+        #================================================================
+        # END CLOSE DB CONNECTIONS
+        #================================================================
+        
+        end_timestamp = datetime.now()
+        time_used = end_timestamp - start_timestamp
+
+
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Total running time: ", str(time_used).split('.')[0])
+
+        if own_metrics:
+            metrics.write()
+        
+        
+    return True
+
+
+
+
+
@@ -1,382 +1,940 @@
-'''
-===================================================
-IMPORT EXPOSURE DATA FROM CDW TO UDW
-===================================================
-imports exposure data for global regions from CDW to UDW.
-
-'''
-
-# import packages
-import datetime
-from datetime import date
-from datetime import datetime, timedelta
-import psycopg2
-import pandas as pd
-import snowflake.connector
-from snowflake.connector.pandas_tools import write_pandas
-import configparser
-from pathlib import Path
-import os
-
-
-#vars
-'''
-DEFINITION:
-------------
-map_table           = name of table that contains mapping data
-destination_table   = name of table that expoure data will be written to
-cdw_config          = config property used for CDW connection
-udw_config          = config property used for CDW connection
-
-EXAMPLE:
------------
-map_table           = 'udw_clientsolutions_cs.paramount_custom_creative_mapping'
-destination_table   = 'udw_clientsolutions_cs.paramount_custom_global_exposure'
-cdw_config          = 'personalAccountEU'
-udw_config          = 'serviceAccount'
-'''
-
-
-def get_exposures_from_cdw_to_udw(sales_order_table, destination_table, cdw_config, udw_config):
-    
-    # get config
-    current_path    = os.path.dirname(os.path.abspath(__file__))
-    config          = configparser.ConfigParser()
-    config_path     = Path(fr'{current_path}\config.ini')
-    config.read(config_path)
-
-    
-    # output start time
-    start_timestamp = datetime.now()
-    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Opening connections...")
-    
-    
-    #================================================================
-    # START OPEN DB CONNECTIONS
-    #================================================================
-    
-    try:
-
-        # connect to CDW
-        cdw_conn = psycopg2.connect(
-            dbname = config[cdw_config]["dbname"],
-            host = config[cdw_config]["host"],
-            port = config[cdw_config]["port"],
-            user = config[cdw_config]["user"],
-            password = config[cdw_config]["password"]
-        )
-
-        cdw_cur = cdw_conn.cursor()
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> CDW connected")
-
-
-        # connect to UDW
-        udw_conn = snowflake.connector.connect(
-            user = config[udw_config ]["user"],
-            password = config[udw_config ]["password"],
-            account = config[udw_config ]["account"],
-            warehouse = config[udw_config ]["warehouse"],
-            database = config[udw_config ]["database"],
-            schema = config[udw_config ]["schema"]
-        )
-
-        udw_cur = udw_conn.cursor()
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> UDW NA connected.")
-
-
-        #================================================================
-        # END OPEN DB CONNECTIONS
-        #================================================================
-
-
-        #=============
-        # UDW
-        #=============
-        # run connection hooks
-        udw_cur.execute("USE ROLE UDW_CLIENTSOLUTIONS_REPORTING_MAINTAINER_ROLE_PROD;")
-        udw_cur.execute("USE DATABASE UDW_PROD;")
-        udw_cur.execute("USE WAREHOUSE UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD_MEDIUM;")
-        udw_cur.execute("USE SCHEMA UDW_CLIENTSOLUTIONS_CS;")
-        
-        
-        # set UDW dates for mapping query
-        # script updated to go back 6 months instead of x days on initial load, then 1 month going forward
-        # udw_cur.execute("SET reporting_start = (SELECT DATEADD('month', -6, CURRENT_DATE)::TIMESTAMP);") # initial load
-        udw_cur.execute("SET reporting_start = (SELECT DATEADD('month', -1, CURRENT_DATE)::TIMESTAMP);")
-        udw_cur.execute("SET reporting_end   = (SELECT (DATEADD('day', -1, CURRENT_DATE)::VARCHAR || ' 23:59:59')::TIMESTAMP);")
-        udw_cur.execute("SET quarter_start   = (SELECT DATE_TRUNC('quarter', CURRENT_DATE)::TIMESTAMP);")
-
-        
-        # generate creative map from UDW by combining sales order and campaign info
-        # load into a dataframe
-        get_map_query1 = f'''
-            CREATE TEMP TABLE cmpgn AS (
-                
-                -- get campaign data for active campaigns
-                SELECT DISTINCT
-                    oms_att.sales_order_id
-                    ,cmpgn.id AS campaign_id
-                    ,cmpgn.name AS campaign_name
-                    ,oms_att.package_sales_order_line_item_id
-                FROM trader.campaigns_latest AS cmpgn
-                    JOIN (
-                        SELECT DISTINCT
-                            cmpgn_att.campaign_id
-                            ,cmpgn_att.io_external_id AS sales_order_id
-                            ,cmpgn_att.li_external_id AS package_sales_order_line_item_id
-                        FROM trader.campaign_oms_attrs_latest AS cmpgn_att
-                    ) AS oms_att ON cmpgn.id = oms_att.campaign_id
-                WHERE 
-                    cmpgn.state != 'archived'
-            );
-        '''
-        
-        get_map_query2 = f'''
-            SELECT DISTINCT
-                so.vao
-                ,c.campaign_id
-            FROM TABLE('{sales_order_table}') so
-                JOIN cmpgn c ON c.package_sales_order_line_item_id = so.package_sales_order_line_item_id
-            WHERE 
-                1 = 1
-                AND so.vao IS NOT NULL
-                AND so.sales_order_name IS NOT NULL
-                AND so.sales_order_name != ''
-                AND c.campaign_id IS NOT NULL
-                AND so.package_sales_order_line_item_end_at >= LEAST($reporting_start, $quarter_start)
-                AND so.package_sales_order_line_item_start_at <= $reporting_end
-            ;
-        '''
-
-        udw_cur.execute(get_map_query1)
-        udw_df_map = pd.read_sql(get_map_query2, con = udw_conn)
-
-        
-        
-        #=============
-        # CDW
-        #=============
-        # change map column names to lower case for CDW
-        udw_df_map.columns = [c.lower() for c in udw_df_map.columns]
-
-
-        # specify data type for fields as these may be different between EU, APAC, and SA
-        udw_df_map['vao'] = udw_df_map['vao'].astype('Int64')
-        udw_df_map['campaign_id'] = udw_df_map['campaign_id'].astype('Int64')
-        
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> UDW data aggregated. Casting data type for each column...")
-
-
-        # create a temp table in CDW to hold data from UDW
-        cdw_import_prep_query = f'''
-            CREATE TEMP TABLE exp_prep (
-                vao             INT
-                ,campaign_id    INT
-            );
-        '''
-
-        cdw_cur.execute(cdw_import_prep_query)
-
-
-        # import map data into UDW temp table
-        for row in [tuple(array_list) for array_list in udw_df_map.values.tolist()]:
-            
-            format_str = '''
-                INSERT INTO exp_prep (
-                    vao
-                    ,campaign_id
-                )
-                VALUES (
-                    '{vao}',
-                    '{campaign_id}'
-                );
-            '''
-            
-            sql_command = format_str.format(
-                vao         = row[0]
-                ,campaign_id = row[1]
-            )
-            
-            cdw_cur.execute(sql_command)
-
-
-
-        #================================================================
-        # START- PULL CDW EXPOSURE DATA
-        #================================================================
-        
-        # set dates in temp table as CDW does not have variables
-        # script updated to go back 6 months instead of x days on initial load, then 2 weeks going forward
-        cdw_variable_query = f'''
-            DROP TABLE IF EXISTS variable_table;
-            CREATE TEMP TABLE variable_table AS (
-                SELECT 
-                    DATEADD('week', -2, CURRENT_DATE)::TIMESTAMP AS reporting_start
-                    ,(LEFT(DATEADD('day', -1, CURRENT_DATE), 10)::VARCHAR || ' 23:59:59')::TIMESTAMP AS reporting_end  
-                    ,DATEADD('week', -2, CURRENT_DATE)::TIMESTAMP AS quarter_start  
-                    -- ,DATE_TRUNC('quarter', CURRENT_DATE)::TIMESTAMP AS quarter_start
-            );
-        '''
-
-        cdw_cur.execute(cdw_variable_query)
-
-
-        # get exposure fact data with help of variables and map tables
-        cdw_get_exposure_query = f'''
-            SELECT
-                m.vao
-                ,f.samsung_tvid AS vtifa
-                ,f.event_time AS exposure_datetime
-                ,f.device_country AS country
-                ,f.campaign_id
-                ,f.creative_id
-                ,f.flight_id
-                ,f.type
-            FROM data_ad_xdevice.fact_delivery_event f
-                JOIN exp_prep m ON m.campaign_id = f.campaign_id
-                JOIN variable_table v ON 1 = 1
-            WHERE 
-                1 = 1
-                AND f.type IN (
-                    1       --> impressions
-                    ,2      --> clicks
-                )
-                AND (f.dropped != TRUE OR f.dropped IS NULL)
-                AND f.event_time BETWEEN LEAST(v.quarter_start, v.reporting_start) AND v.reporting_end
-            ;
-        '''
-
-        cdw_exposure_df = pd.read_sql(cdw_get_exposure_query, con = cdw_conn)
-
-        # specify data type for fields as these may be different between EU, APAC, and SA
-        if len(cdw_exposure_df) > 0:    
-            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> CDW data aggregated. Casting data type for each column...")
-            cdw_exposure_df['vao']                  = cdw_exposure_df['vao'].astype(int)
-            cdw_exposure_df['vtifa']                = cdw_exposure_df['vtifa'].astype(str)
-            cdw_exposure_df['exposure_datetime']    = cdw_exposure_df['exposure_datetime'].apply(pd.to_datetime).dt.strftime('%Y-%m-%d %H:%M:%S').astype(str)
-            cdw_exposure_df['country']              = cdw_exposure_df['country'].astype(str)
-            cdw_exposure_df['campaign_id']          = cdw_exposure_df['campaign_id'].astype(int)
-            cdw_exposure_df['creative_id']          = cdw_exposure_df['creative_id'].astype(int)
-            cdw_exposure_df['flight_id']            = cdw_exposure_df['flight_id'].astype(int)
-            cdw_exposure_df['type']                 = cdw_exposure_df['type'].astype(int)
-        else:
-            print("No data to update!")
-            
-
-        # run connection hooks again. May be unnecessary
-        udw_cur.execute("USE ROLE UDW_CLIENTSOLUTIONS_REPORTING_MAINTAINER_ROLE_PROD;")
-        udw_cur.execute("USE DATABASE UDW_PROD;")
-        udw_cur.execute("USE WAREHOUSE UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD_MEDIUM;")
-        udw_cur.execute("USE SCHEMA UDW_CLIENTSOLUTIONS_CS;")
-
-
-        # prepare to bring back into UDW by creating a temp table in UDW
-        udw_import_prep_query = f'''
-            CREATE TEMP TABLE EXP_PREP (
-                vao                     INT
-                ,vtifa                  VARCHAR
-                ,exposure_datetime      TIMESTAMP
-                ,country                VARCHAR(8)
-                ,campaign_id            INT
-                ,creative_id            INT
-                ,flight_id              INT
-                ,type                   INT
-            );
-        '''
-
-        udw_cur.execute(udw_import_prep_query)
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> UDW temp table created...")
-
-
-        # write_pandas QUIRK!!! columns must be uppercase or error is thrown
-        cdw_exposure_df.columns = map(lambda x: str(x).upper(), cdw_exposure_df.columns)
-
-
-        # write CDW exposure data into UDW
-        # write_pandas QUIRK!!! table name and schema should be uppercase
-        write_pandas(
-            conn            = udw_conn                      # db connection
-            ,df             = cdw_exposure_df               # pandas dataframe (data)
-            ,table_name     = 'EXP_PREP'                    # table to copy data into
-            ,schema         = 'UDW_CLIENTSOLUTIONS_CS'      # schema to use
-        )
-
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Data loaded into UDW temp table...")
-
-
-
-        # insert new data (any rows not already in the UDW table)
-        udw_import_query = f'''
-            INSERT INTO {destination_table} (
-                SELECT
-                    vao
-                    ,vtifa
-                    ,exposure_datetime
-                    ,country
-                    ,campaign_id
-                    ,creative_id
-                    ,flight_id
-                    ,type
-                    ,CURRENT_DATE::DATE AS date_imported
-                FROM exp_prep AS new_data
-                WHERE 
-                    NOT EXISTS (
-                        SELECT 1
-                        FROM {destination_table} AS old_data
-                        WHERE 
-                            old_data.vao                    = new_data.vao
-                            AND old_data.vtifa              = new_data.vtifa 
-                            AND old_data.exposure_datetime  = new_data.exposure_datetime
-                            AND old_data.country            = new_data.country
-                            AND old_data.campaign_id        = new_data.campaign_id
-                            AND old_data.creative_id        = new_data.creative_id
-                            AND old_data.flight_id          = new_data.flight_id
-                            AND old_data.type               = new_data.type
-                    )
-            )
-        ;
-        '''
-
-        udw_cur.execute(udw_import_query)
-
-
-        #================================================================
-        # END - PULL CDW EXPOSURE DATA
-        #================================================================
-        
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Process completed sucessfully.")
-
-    except Exception as e:
-        
-        # get exception as pass it back up to the calling script
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Process failed.")
-        
-        raise Exception("Exposure data was not able to be retrieved.") from e
-        
-    finally: 
-        
-        #================================================================
-        # START CLOSE DB CONNECTIONS
-        #================================================================
-
-        udw_cur.close()
-        udw_conn.close()
-
-        cdw_cur.close()
-        cdw_conn.close()
-
-
-        #================================================================
-        # END CLOSE DB CONNECTIONS
-        #================================================================
-
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> All connections disconnected.")
-        end_timestamp = datetime.now()
-        time_used = end_timestamp - start_timestamp
-
-
-        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Total running time: ", str(time_used).split('.')[0])
-        
-        
-        return True
-
+'''
+===================================================
+IMPORT EXPOSURE DATA FROM CDW TO UDW
+===================================================
+imports exposure data for global regions from CDW to UDW.
+
+'''
+
+# import packages
+import datetime
+from datetime import date
+from datetime import datetime, timedelta
+import psycopg2
+import psycopg2.extras
+import pandas as pd
+from snowflake.connector.pandas_tools import write_pandas
+import configparser
+from connection_manager import connect_cdw, connect_udw, session_table
+from cdw_streaming import stream_cdw_query_to_udw
+from arrow_transfer import EXP_PREP_SCHEMA, EXP_SUMMARY_PREP_SCHEMA, upload_parquet_file
+from extraction_state import get_extraction_start, update_watermark
+from map_cache import MapCache
+from run_metrics import RunMetrics
+from checkpoint import SliceCheckpoint, get_checkpoint_root, remove_old_checkpoints
+from unload_transfer import get_unload_settings, use_unload_transfer, unload_cdw_query_to_udw
+from compact_frames import narrow_int, to_category, to_arrow_string, column_memory, print_memory_report
+from slice_extractor import get_time_slices, extract_slices_to_udw, default_max_connections
+from pathlib import Path
+import os
+
+
+#vars
+'''
+DEFINITION:
+------------
+map_table           = name of table that contains mapping data
+destination_table   = name of table that expoure data will be written to
+cdw_config          = config property used for CDW connection
+udw_config          = config property used for CDW connection
+stream_chunk_size   = (optional) rows per chunk for streaming mode. None = use config.ini, 0 = load all rows at once
+grace_hours         = (optional) hours re-read before the watermark for late events. None = use config.ini
+backfill_start      = (optional) date to extract from instead of the watermark (e.g., '2024-05-01' for a 6 month initial load)
+connections         = (optional) ConnectionManager shared by all jobs in the run. None = open and close connections here
+map_cache           = (optional) MapCache shared by all regions in the run. None = use the on-disk cache from config.ini only
+partners            = list of (sales_order_table, destination_table) pulled together in one CDW scan (multi-partner mode)
+metrics             = (optional) RunMetrics shared by all jobs in the run. None = write this job's stages to the run log here
+checkpoint_dir      = (optional) folder for local extraction checkpoints. None = use config.ini (off when not set), '' = off
+unload              = (optional) True/False forces the S3 bulk transfer on or off. None = use it for long windows set in config.ini
+slice_hours         = (optional) hours per slice when streaming the window over several CDW connections. None = use config.ini, 0 = off
+summary             = (optional) True = group the events per device, campaign/creative/flight, type, and day in CDW and load the summary tables. None = use config.ini
+
+EXAMPLE:
+-----------
+map_table           = 'udw_clientsolutions_cs.paramount_custom_creative_mapping'
+destination_table   = 'udw_clientsolutions_cs.paramount_custom_global_exposure'
+cdw_config          = 'personalAccountEU'
+udw_config          = 'serviceAccount'
+partners            = [
+    ('udw_clientsolutions_cs.paramount_operative_sales_orders', 'udw_clientsolutions_cs.paramount_custom_global_exposure')
+    ,('udw_clientsolutions_cs.pluto_operative_sales_orders', 'udw_clientsolutions_cs.pluto_custom_global_exposure')
+]
+'''
+
+
+# number of map rows sent per multi-row INSERT when loading the map into CDW
+map_batch_size = 1000
+
+# summary mode loads {destination_table}_summary instead of the event table
+summary_table_suffix = '_summary'
+
+
+def load_map_to_cdw(cdw_cur, udw_df_map, batch_size = map_batch_size):
+    '''
+    bulk load the vao/campaign map into the CDW exp_prep temp table.
+    each row carries the partner it belongs to and the partner's extraction start.
+    rows are sent as multi-row VALUES batches so the number of round trips
+    depends on the size of the map rather than one INSERT per row.
+    '''
+
+    load_start = datetime.now()
+
+    rows = [
+        (int(vao), int(campaign_id), int(partner_id), str(extract_start))
+        for vao, campaign_id, partner_id, extract_start in udw_df_map[['vao', 'campaign_id', 'partner_id', 'extract_start']].itertuples(index = False, name = None)
+    ]
+
+    psycopg2.extras.execute_values(
+        cdw_cur
+        ,"INSERT INTO exp_prep (vao, campaign_id, partner_id, extract_start) VALUES %s;"
+        ,rows
+        ,page_size = batch_size
+    )
+
+    # report load throughput
+    load_seconds = (datetime.now() - load_start).total_seconds()
+    rows_per_second = len(rows) / load_seconds if load_seconds > 0 else float(len(rows))
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Map loaded into CDW: {len(rows)} rows in {load_seconds:.2f}s ({rows_per_second:,.0f} rows/sec)")
+
+    return len(rows)
+
+
+def prepare_slice_session(cdw_cur, cdw_import_prep_query, udw_df_map):
+    '''
+    create the exp_prep temp table and load the map on a slice connection
+    '''
+
+    cdw_cur.execute(cdw_import_prep_query)
+    load_map_to_cdw(cdw_cur, udw_df_map)
+
+
+def set_slice_variables(cdw_cur, slice_start, slice_end):
+    '''
+    limit the exposure query on a slice connection to one slice of the window
+    '''
+
+    cdw_cur.execute(f'''
+        DROP TABLE IF EXISTS variable_table;
+        CREATE TEMP TABLE variable_table AS (
+            SELECT 
+                '{slice_start}'::TIMESTAMP AS reporting_start
+                ,'{slice_end}'::TIMESTAMP AS reporting_end
+                ,'{slice_start}'::TIMESTAMP AS quarter_start
+        );
+    ''')
+
+
+def get_map_window(extract_start):
+    '''
+    reporting window of the creative map as dates. line items that end on or after
+    the earliest of 1 month ago, the quarter start, and the extraction start are kept.
+    '''
+
+    today = date.today()
+    month_ago = (pd.Timestamp(today) - pd.DateOffset(months = 1)).date()
+    quarter_start = date(today.year, 3 * ((today.month - 1) // 3) + 1, 1)
+
+    window_start = min(month_ago, quarter_start, extract_start.date())
+    window_end = today - timedelta(days = 1)
+
+    return window_start, window_end
+
+
+def build_creative_map(udw_conn, sales_order_table, window_start, window_end, cmpgn_table):
+    '''
+    generate creative map from UDW by combining sales order and campaign info
+    '''
+
+    get_map_query1 = f'''
+        CREATE OR REPLACE TEMP TABLE {cmpgn_table} AS (
+            
+            -- get campaign data for active campaigns
+            SELECT DISTINCT
+                oms_att.sales_order_id
+                ,cmpgn.id AS campaign_id
+                ,cmpgn.name AS campaign_name
+                ,oms_att.package_sales_order_line_item_id
+            FROM trader.campaigns_latest AS cmpgn
+                JOIN (
+                    SELECT DISTINCT
+                        cmpgn_att.campaign_id
+                        ,cmpgn_att.io_external_id AS sales_order_id
+                        ,cmpgn_att.li_external_id AS package_sales_order_line_item_id
+                    FROM trader.campaign_oms_attrs_latest AS cmpgn_att
+                ) AS oms_att ON cmpgn.id = oms_att.campaign_id
+            WHERE 
+                cmpgn.state != 'archived'
+        );
+    '''
+    
+    get_map_query2 = f'''
+        SELECT DISTINCT
+            so.vao
+            ,c.campaign_id
+        FROM TABLE('{sales_order_table}') so
+            JOIN {cmpgn_table} c ON c.package_sales_order_line_item_id = so.package_sales_order_line_item_id
+        WHERE 
+            1 = 1
+            AND so.vao IS NOT NULL
+            AND so.sales_order_name IS NOT NULL
+            AND so.sales_order_name != ''
+            AND c.campaign_id IS NOT NULL
+            AND so.package_sales_order_line_item_end_at >= '{window_start}'::TIMESTAMP
+            AND so.package_sales_order_line_item_start_at <= '{window_end} 23:59:59'::TIMESTAMP
+        ;
+    '''
+
+    udw_cur = udw_conn.cursor()
+
+    try:
+        udw_cur.execute(get_map_query1)
+        udw_df_map = pd.read_sql(get_map_query2, con = udw_conn)
+    finally:
+        udw_cur.close()
+
+    # change map column names to lower case for CDW
+    udw_df_map.columns = [c.lower() for c in udw_df_map.columns]
+
+    # specify data type for fields as these may be different between EU, APAC, and SA
+    udw_df_map['vao'] = udw_df_map['vao'].astype('Int64')
+    udw_df_map['campaign_id'] = udw_df_map['campaign_id'].astype('Int64')
+
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Creative map built from UDW ({len(udw_df_map)} rows)")
+
+    return udw_df_map
+
+
+def cast_exposure_df(cdw_exposure_df):
+    '''
+    specify data type for fields as these may be different between EU, APAC, and SA
+    types are kept compact (see compact_frames.py) so large windows fit in memory.
+    datetimes stay datetimes instead of strings and are uploaded with use_logical_type
+    '''
+
+    cdw_exposure_df['vao']                  = narrow_int(cdw_exposure_df['vao'])
+    cdw_exposure_df['vtifa']                = to_arrow_string(cdw_exposure_df['vtifa'])
+    cdw_exposure_df['exposure_datetime']    = pd.to_datetime(cdw_exposure_df['exposure_datetime'])
+    cdw_exposure_df['country']              = to_category(cdw_exposure_df['country'])
+    cdw_exposure_df['campaign_id']          = narrow_int(cdw_exposure_df['campaign_id'])
+    cdw_exposure_df['creative_id']          = narrow_int(cdw_exposure_df['creative_id'])
+    cdw_exposure_df['flight_id']            = narrow_int(cdw_exposure_df['flight_id'])
+    cdw_exposure_df['type']                 = narrow_int(cdw_exposure_df['type']).astype('category')
+    cdw_exposure_df['row_hash']             = to_arrow_string(cdw_exposure_df['row_hash'])
+    cdw_exposure_df['partner_id']           = narrow_int(cdw_exposure_df['partner_id'])
+
+    return cdw_exposure_df
+
+
+def cast_exposure_summary_df(cdw_exposure_df):
+    '''
+    same as cast_exposure_df for the columns of the exposure summary
+    '''
+
+    cdw_exposure_df['vao']                      = narrow_int(cdw_exposure_df['vao'])
+    cdw_exposure_df['vtifa']                    = to_arrow_string(cdw_exposure_df['vtifa'])
+    cdw_exposure_df['exposure_date']            = pd.to_datetime(cdw_exposure_df['exposure_date']).dt.date
+    cdw_exposure_df['country']                  = to_category(cdw_exposure_df['country'])
+    cdw_exposure_df['campaign_id']              = narrow_int(cdw_exposure_df['campaign_id'])
+    cdw_exposure_df['creative_id']              = narrow_int(cdw_exposure_df['creative_id'])
+    cdw_exposure_df['flight_id']                = narrow_int(cdw_exposure_df['flight_id'])
+    cdw_exposure_df['type']                     = narrow_int(cdw_exposure_df['type']).astype('category')
+    cdw_exposure_df['exposure_count']           = narrow_int(cdw_exposure_df['exposure_count'])
+    cdw_exposure_df['first_exposure_datetime']  = pd.to_datetime(cdw_exposure_df['first_exposure_datetime'])
+    cdw_exposure_df['last_exposure_datetime']   = pd.to_datetime(cdw_exposure_df['last_exposure_datetime'])
+    cdw_exposure_df['row_hash']                 = to_arrow_string(cdw_exposure_df['row_hash'])
+    cdw_exposure_df['partner_id']               = narrow_int(cdw_exposure_df['partner_id'])
+
+    return cdw_exposure_df
+
+
+def get_exposures_from_cdw_to_udw(sales_order_table, destination_table, cdw_config, udw_config, stream_chunk_size = None, grace_hours = None, backfill_start = None, connections = None, map_cache = None, metrics = None, checkpoint_dir = None, unload = None, slice_hours = None, summary = None):
+    '''
+    pull exposures for one partner. see get_partner_exposures_from_cdw_to_udw
+    '''
+
+    return get_partner_exposures_from_cdw_to_udw(
+        [(sales_order_table, destination_table)]
+        ,cdw_config
+        ,udw_config
+        ,stream_chunk_size = stream_chunk_size
+        ,grace_hours = grace_hours
+        ,backfill_start = backfill_start
+        ,connections = connections
+        ,map_cache = map_cache
+        ,metrics = metrics
+        ,checkpoint_dir = checkpoint_dir
+        ,unload = unload
+        ,slice_hours = slice_hours
+        ,summary = summary
+    )
+
+
+def get_partner_exposures_from_cdw_to_udw(partners, cdw_config, udw_config, stream_chunk_size = None, grace_hours = None, backfill_start = None, connections = None, map_cache = None, metrics = None, checkpoint_dir = None, unload = None, slice_hours = None, summary = None):
+    '''
+    pull exposures for one or more partners with a single scan of the CDW fact table.
+    the partner maps are loaded into CDW together, tagged with the partner, and
+    the rows are routed to each partner's destination table in UDW.
+    '''
+    
+    # get config
+    current_path    = os.path.dirname(os.path.abspath(__file__))
+    config          = configparser.ConfigParser()
+    config_path     = Path(fr'{current_path}\config.ini')
+    config.read(config_path)
+
+
+    # stream CDW rows in chunks instead of loading the whole result at once
+    # falls back to stream_chunk_size under [runSettings] in config.ini. 0 or missing = off
+    if stream_chunk_size is None:
+        stream_chunk_size = config.getint('runSettings', 'stream_chunk_size', fallback = 0)
+
+
+    # read the window in slices over several CDW connections when streaming. 0 or missing = off
+    if slice_hours is None:
+        slice_hours = config.getint('runSettings', 'slice_hours', fallback = 0)
+
+
+    # group the events per device and day in CDW and load the summary tables instead of one row per event
+    # the weekly report procedure reads the summary when exposure_summary_table is set
+    if summary is None:
+        summary = config.getboolean('runSettings', 'exposure_summary', fallback = False)
+
+    if summary:
+        partners = [(sales_order_table, f'{destination_table}{summary_table_suffix}') for sales_order_table, destination_table in partners]
+
+
+    # hours to re-read before the watermark to catch late-arriving events
+    if grace_hours is None:
+        grace_hours = config.getint('runSettings', 'late_arrival_grace_hours', fallback = 48)
+
+
+    # the creative map is the same for every region. without a shared cache only the disk cache is used
+    if map_cache is None:
+        map_cache = MapCache(
+            config.get('runSettings', 'map_cache_dir', fallback = '')
+            ,config.getint('runSettings', 'map_cache_max_age_hours', fallback = 20)
+        )
+
+
+    # stage timings for the run log. a job run on its own writes its own entries
+    own_metrics = metrics is None
+    if own_metrics:
+        metrics = RunMetrics('custom_global_exposures', history_days = config.getint('runSettings', 'run_log_history_days', fallback = 30))
+
+
+    # the extracted rows are kept on local disk until the dedup insert succeeds (see checkpoint.py)
+    # a retry on the same day uploads a complete checkpoint instead of querying CDW again
+    if checkpoint_dir is None:
+        checkpoint_dir = config.get('runSettings', 'checkpoint_dir', fallback = '')
+
+    checkpoint = None
+    checkpoint_root = get_checkpoint_root(checkpoint_dir)
+
+    if checkpoint_root is not None:
+        remove_old_checkpoints(checkpoint_root)
+        checkpoint = SliceCheckpoint(checkpoint_root, 'exposures', cdw_config, {
+            'destinations': [destination_table for sales_order_table, destination_table in partners]
+            ,'reporting_end': str(date.today() - timedelta(days = 1))
+            ,'grace_hours': grace_hours
+            ,'backfill_start': backfill_start
+        })
+
+    resume_format = checkpoint.read_manifest()['format'] if checkpoint is not None and checkpoint.is_complete() else None
+
+
+    # large windows (e.g., 6 month backfills) can go from CDW to UDW through S3 (see unload_transfer.py)
+    unload_settings = get_unload_settings(config)
+
+    
+    # output start time
+    start_timestamp = datetime.now()
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Opening connections...")
+    
+    
+    #================================================================
+    # START OPEN DB CONNECTIONS
+    #================================================================
+
+    cdw_conn = cdw_cur = udw_conn = udw_cur = None
+
+    try:
+
+        # use the run's shared sessions when given, otherwise open our own
+        # the UDW connection hooks are run when the session is opened
+        # CDW is not needed when the slice is uploaded from a checkpoint
+        if connections is not None:
+            udw_conn = connections.udw()
+            if resume_format is None:
+                cdw_conn = connections.cdw(cdw_config)
+        else:
+            udw_conn = connect_udw(config, udw_config)
+            if resume_format is None:
+                cdw_conn = connect_cdw(config, cdw_config)
+
+        udw_cur = udw_conn.cursor()
+        if cdw_conn is not None:
+            cdw_cur = cdw_conn.cursor()
+
+
+        # temp tables get a per-region name as the UDW session may be shared with other regions
+        cmpgn_table = session_table('CMPGN', cdw_config)
+        prep_table  = session_table('EXP_PREP', cdw_config)
+
+
+        #================================================================
+        # END OPEN DB CONNECTIONS
+        #================================================================
+
+
+        #=============
+        # UDW
+        #=============
+        # get the CDW extraction start and creative map for each partner
+        # the partner id is the position of the partner in the list
+        partner_maps = []
+        extract_starts = []
+
+        for partner_id, (sales_order_table, destination_table) in enumerate(partners):
+
+            # extraction start comes from the watermark of the last successful load
+            # or from backfill_start when a manual backfill is requested
+            extract_start = get_extraction_start(udw_cur, destination_table, cdw_config, grace_hours, backfill_start)
+
+            # summary rows cover whole days, so a re-read day is always read from midnight and replaces the stored day
+            if summary:
+                extract_start = datetime.combine(extract_start.date(), datetime.min.time())
+
+            extract_starts.append(extract_start)
+
+            # the map is only used by the CDW query
+            if resume_format is not None:
+                continue
+
+
+            # get the creative map for the reporting window. built once per run and reused by every region
+            # go back 1 month, or further when the extraction starts earlier (backfill)
+            window_start, window_end = get_map_window(extract_start)
+
+            with metrics.stage('map_build', region = cdw_config, destination = destination_table) as stage:
+                partner_map = map_cache.get(
+                    udw_conn
+                    ,sales_order_table
+                    ,window_start
+                    ,window_end
+                    ,lambda conn: build_creative_map(conn, sales_order_table, window_start, window_end, cmpgn_table)
+                )
+                stage.rows = len(partner_map)
+
+            partner_map['partner_id'] = partner_id
+            partner_map['extract_start'] = extract_start
+            partner_maps.append(partner_map)
+
+
+        # the bulk transfer is chosen on the length of the whole scan
+        window_days = (date.today() - min(extract_starts).date()).days
+        unload_transfer = resume_format is None and use_unload_transfer(unload_settings, window_days, unload)
+
+        
+        
+        #=============
+        # CDW
+        #=============
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> UDW data aggregated. Casting data type for each column...")
+
+
+        # create a temp table in CDW to hold data from UDW
+        cdw_import_prep_query = f'''
+            DROP TABLE IF EXISTS exp_prep;
+            CREATE TEMP TABLE exp_prep (
+                vao             INT
+                ,campaign_id    INT
+                ,partner_id     SMALLINT
+                ,extract_start  TIMESTAMP
+            );
+        '''
+
+        # import map data into CDW temp table
+        if resume_format is None:
+            udw_df_map = pd.concat(partner_maps, ignore_index = True)
+
+            with metrics.stage('cdw_map_load', region = cdw_config) as stage:
+                cdw_cur.execute(cdw_import_prep_query)
+                stage.rows = load_map_to_cdw(cdw_cur, udw_df_map)
+
+
+
+        #================================================================
+        # START- PULL CDW EXPOSURE DATA
+        #================================================================
+        
+        # set dates in temp table as CDW does not have variables
+        # extraction starts at the watermark minus the grace period (see extraction_state.py)
+        # the scan covers the earliest partner start. each partner is then limited to its own start by the map
+        cdw_variable_query = f'''
+            DROP TABLE IF EXISTS variable_table;
+            CREATE TEMP TABLE variable_table AS (
+                SELECT 
+                    '{min(extract_starts)}'::TIMESTAMP AS reporting_start
+                    ,(LEFT(DATEADD('day', -1, CURRENT_DATE), 10)::VARCHAR || ' 23:59:59')::TIMESTAMP AS reporting_end  
+                    ,'{min(extract_starts)}'::TIMESTAMP AS quarter_start  
+            );
+        '''
+
+        if resume_format is None:
+            cdw_cur.execute(cdw_variable_query)
+
+
+        # exposure fact rows for the window, limited to the mapped campaigns
+        cdw_exposure_source = '''
+            FROM data_ad_xdevice.fact_delivery_event f
+                JOIN exp_prep m ON m.campaign_id = f.campaign_id
+                JOIN variable_table v ON 1 = 1
+            WHERE 
+                1 = 1
+                AND f.type IN (
+                    1       --> impressions
+                    ,2      --> clicks
+                )
+                AND (f.dropped != TRUE OR f.dropped IS NULL)
+                AND f.event_time BETWEEN LEAST(v.quarter_start, v.reporting_start) AND v.reporting_end
+                AND f.event_time >= m.extract_start
+        '''
+
+        # get exposure fact data with help of variables and map tables
+        cdw_get_exposure_query = f'''
+            SELECT
+                m.vao
+                ,f.samsung_tvid AS vtifa
+                ,f.event_time AS exposure_datetime
+                ,f.device_country AS country
+                ,f.campaign_id
+                ,f.creative_id
+                ,f.flight_id
+                ,f.type
+                -- row identity used for dedup in UDW
+                -- must match the formula in snowflake_scripts/example_backfill_row_hash.sql
+                ,MD5(
+                    COALESCE(m.vao::VARCHAR, '')
+                    || '|' || COALESCE(f.samsung_tvid::VARCHAR, '')
+                    || '|' || COALESCE(TO_CHAR(f.event_time, 'YYYY-MM-DD HH24:MI:SS'), '')
+                    || '|' || COALESCE(f.device_country::VARCHAR, '')
+                    || '|' || COALESCE(f.campaign_id::VARCHAR, '')
+                    || '|' || COALESCE(f.creative_id::VARCHAR, '')
+                    || '|' || COALESCE(f.flight_id::VARCHAR, '')
+                    || '|' || COALESCE(f.type::VARCHAR, '')
+                ) AS row_hash
+                ,m.partner_id
+            {cdw_exposure_source}
+            ;
+        '''
+
+        # prepare to bring back into UDW by creating a temp table in UDW
+        udw_import_prep_query = f'''
+            CREATE OR REPLACE TEMP TABLE {prep_table} (
+                vao                     INT
+                ,vtifa                  VARCHAR
+                ,exposure_datetime      TIMESTAMP
+                ,country                VARCHAR(8)
+                ,campaign_id            INT
+                ,creative_id            INT
+                ,flight_id              INT
+                ,type                   INT
+                ,row_hash               VARCHAR(32)
+                ,partner_id             INT
+            );
+        '''
+        prep_schema = EXP_PREP_SCHEMA
+
+
+        # summary mode: one row per device, campaign/creative/flight, type, and day
+        # with the number of events and the first and last event time of the day
+        if summary:
+            cdw_get_exposure_query = f'''
+                SELECT
+                    m.vao
+                    ,f.samsung_tvid AS vtifa
+                    ,TRUNC(f.event_time) AS exposure_date
+                    ,f.device_country AS country
+                    ,f.campaign_id
+                    ,f.creative_id
+                    ,f.flight_id
+                    ,f.type
+                    ,COUNT(*) AS exposure_count
+                    ,MIN(f.event_time) AS first_exposure_datetime
+                    ,MAX(f.event_time) AS last_exposure_datetime
+                    -- row identity of the summary row (the group) used for the merge in UDW
+                    ,MD5(
+                        COALESCE(m.vao::VARCHAR, '')
+                        || '|' || COALESCE(f.samsung_tvid::VARCHAR, '')
+                        || '|' || COALESCE(TO_CHAR(TRUNC(f.event_time), 'YYYY-MM-DD'), '')
+                        || '|' || COALESCE(f.device_country::VARCHAR, '')
+                        || '|' || COALESCE(f.campaign_id::VARCHAR, '')
+                        || '|' || COALESCE(f.creative_id::VARCHAR, '')
+                        || '|' || COALESCE(f.flight_id::VARCHAR, '')
+                        || '|' || COALESCE(f.type::VARCHAR, '')
+                    ) AS row_hash
+                    ,m.partner_id
+                {cdw_exposure_source}
+                GROUP BY
+                    m.vao
+                    ,f.samsung_tvid
+                    ,TRUNC(f.event_time)
+                    ,f.device_country
+                    ,f.campaign_id
+                    ,f.creative_id
+                    ,f.flight_id
+                    ,f.type
+                    ,m.partner_id
+                ;
+            '''
+
+            udw_import_prep_query = f'''
+                CREATE OR REPLACE TEMP TABLE {prep_table} (
+                    vao                         INT
+                    ,vtifa                      VARCHAR
+                    ,exposure_date              DATE
+                    ,country                    VARCHAR(8)
+                    ,campaign_id                INT
+                    ,creative_id                INT
+                    ,flight_id                  INT
+                    ,type                       INT
+                    ,exposure_count             INT
+                    ,first_exposure_datetime    TIMESTAMP
+                    ,last_exposure_datetime     TIMESTAMP
+                    ,row_hash                   VARCHAR(32)
+                    ,partner_id                 INT
+                );
+            '''
+            prep_schema = EXP_SUMMARY_PREP_SCHEMA
+
+        udw_cur.execute(udw_import_prep_query)
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> UDW temp table created...")
+
+
+        if resume_format == 'arrow':
+
+            # a previous attempt streamed this slice. upload its parquet parts without querying CDW
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Uploading checkpoint {checkpoint.path.name} instead of querying CDW...")
+            with metrics.stage('checkpoint_upload', region = cdw_config) as stage:
+                stage.bytes = sum([upload_parquet_file(udw_conn, file_path, prep_table) for file_path in checkpoint.part_paths()])
+                stage.rows = checkpoint.read_manifest()['row_count']
+
+        elif unload_transfer:
+
+            # bulk mode: CDW unloads parquet to S3 and UDW copies it in. rows do not pass through this process
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> {window_days} day window. Transferring through S3...")
+            with metrics.stage('cdw_unload_copy', region = cdw_config) as stage:
+                row_count, stage.bytes = unload_cdw_query_to_udw(cdw_conn, cdw_get_exposure_query, udw_conn, prep_table, unload_settings, f'exposures_{cdw_config}')
+                stage.rows = row_count
+
+            if row_count == 0:
+                print("No data to update!")
+
+        elif stream_chunk_size and slice_hours and resume_format is None:
+
+            # sliced streaming mode: the window is split into slices that are read over several CDW connections
+            # at once and uploaded by one uploader (see slice_extractor.py)
+            cdw_cur.execute("SELECT reporting_start, reporting_end FROM variable_table;")
+            reporting_start, reporting_end = cdw_cur.fetchone()
+            slices = get_time_slices(reporting_start, reporting_end, slice_hours)
+
+            # slice connections are opened on the region's cluster and closed when the slices are read
+            if connections is not None:
+                open_cdw = lambda: connections.open_cdw(cdw_config)
+            else:
+                open_cdw = lambda: connect_cdw(config, cdw_config)
+
+            if checkpoint is not None:
+                checkpoint.start('arrow')
+
+            with metrics.stage('cdw_slice_extract_upload', region = cdw_config) as stage:
+                row_count, stage.bytes = extract_slices_to_udw(
+                    open_cdw
+                    ,lambda slice_cur: prepare_slice_session(slice_cur, cdw_import_prep_query, udw_df_map)
+                    ,set_slice_variables
+                    ,cdw_get_exposure_query
+                    ,slices
+                    ,udw_conn
+                    ,prep_table
+                    ,prep_schema
+                    ,stream_chunk_size
+                    ,cdw_config
+                    ,config.getint(cdw_config, 'max_slice_connections', fallback = default_max_connections)
+                    ,'exposure_slice'
+                    ,checkpoint = checkpoint
+                )
+                stage.rows = row_count
+
+            if checkpoint is not None:
+                checkpoint.mark_complete(row_count)
+
+            if row_count == 0:
+                print("No data to update!")
+
+        elif stream_chunk_size and resume_format is None:
+
+            # streaming mode: read CDW rows in chunks and upload each chunk as typed parquet as it arrives
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Streaming CDW data into UDW in chunks of {stream_chunk_size} rows...")
+            if checkpoint is not None:
+                checkpoint.start('arrow')
+
+            with metrics.stage('cdw_extract_upload', region = cdw_config) as stage:
+                row_count, stage.bytes = stream_cdw_query_to_udw(cdw_conn, cdw_get_exposure_query, udw_conn, prep_table, prep_schema, stream_chunk_size, 'exposure_stream', checkpoint = checkpoint)
+                stage.rows = row_count
+
+            if checkpoint is not None:
+                checkpoint.mark_complete(row_count)
+
+            if row_count == 0:
+                print("No data to update!")
+
+        else:
+
+            if resume_format == 'frame':
+
+                # a previous attempt already extracted and cast this slice
+                print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Reading checkpoint {checkpoint.path.name} instead of querying CDW...")
+                with metrics.stage('checkpoint_read', region = cdw_config) as stage:
+                    cdw_exposure_df = checkpoint.read_frame()
+                    stage.rows = len(cdw_exposure_df)
+
+            else:
+
+                with metrics.stage('cdw_extract', region = cdw_config) as stage:
+                    cdw_exposure_df = pd.read_sql(cdw_get_exposure_query, con = cdw_conn)
+                    stage.rows = len(cdw_exposure_df)
+                    stage.add_query_id(cdw_cur)
+
+                # specify data type for fields as these may be different between EU, APAC, and SA
+                if len(cdw_exposure_df) > 0:
+                    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> CDW data aggregated. Casting data type for each column...")
+                    memory_before = column_memory(cdw_exposure_df)
+
+                    with metrics.stage('cast', region = cdw_config) as stage:
+                        cdw_exposure_df = cast_exposure_summary_df(cdw_exposure_df) if summary else cast_exposure_df(cdw_exposure_df)
+                        stage.rows = len(cdw_exposure_df)
+
+                    print_memory_report(memory_before, column_memory(cdw_exposure_df), f'exposures {cdw_config}')
+                else:
+                    print("No data to update!")
+
+
+                # write_pandas QUIRK!!! columns must be uppercase or error is thrown
+                cdw_exposure_df.columns = map(lambda x: str(x).upper(), cdw_exposure_df.columns)
+
+
+                # keep the cast rows so a failed upload or insert does not query CDW again
+                if checkpoint is not None:
+                    checkpoint.start('frame')
+                    checkpoint.write_frame(cdw_exposure_df)
+                    checkpoint.mark_complete(len(cdw_exposure_df))
+
+
+            # write CDW exposure data into UDW
+            # write_pandas QUIRK!!! table name and schema should be uppercase
+            with metrics.stage('udw_upload', region = cdw_config) as stage:
+                write_pandas(
+                    conn            = udw_conn                      # db connection
+                    ,df             = cdw_exposure_df               # pandas dataframe (data)
+                    ,table_name     = prep_table                    # table to copy data into
+                    ,schema         = 'UDW_CLIENTSOLUTIONS_CS'      # schema to use
+                    ,use_logical_type = True                        # datetime columns are loaded as timestamps
+                )
+                stage.rows = len(cdw_exposure_df)
+                stage.bytes = int(cdw_exposure_df.memory_usage(deep = True).sum())
+
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Data loaded into UDW temp table...")
+
+
+
+        # route the rows to each partner's destination table
+        for partner_id, (sales_order_table, destination_table) in enumerate(partners):
+
+            # get the date range of the incoming batch so the dedup only reads
+            # that slice of the destination table instead of its whole history
+            if summary:
+                udw_cur.execute(f"SELECT MIN(first_exposure_datetime), MAX(last_exposure_datetime) FROM {prep_table} WHERE partner_id = {partner_id};")
+            else:
+                udw_cur.execute(f"SELECT MIN(exposure_datetime), MAX(exposure_datetime) FROM {prep_table} WHERE partner_id = {partner_id};")
+            batch_start, batch_end = udw_cur.fetchone()
+
+
+            # insert new data (any rows not already in the UDW table)
+            # rows are matched on row_hash, which covers all eight exposure columns
+            if batch_start is None:
+                print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> No new data for {destination_table}")
+                continue
+
+            udw_import_query = f'''
+                INSERT INTO {destination_table} (
+                    vao
+                    ,vtifa
+                    ,exposure_datetime
+                    ,country
+                    ,campaign_id
+                    ,creative_id
+                    ,flight_id
+                    ,type
+                    ,date_imported
+                    ,row_hash
+                )
+                SELECT
+                    new_data.vao
+                    ,new_data.vtifa
+                    ,new_data.exposure_datetime
+                    ,new_data.country
+                    ,new_data.campaign_id
+                    ,new_data.creative_id
+                    ,new_data.flight_id
+                    ,new_data.type
+                    ,CURRENT_DATE::DATE AS date_imported
+                    ,new_data.row_hash
+                FROM {prep_table} AS new_data
+                    LEFT JOIN (
+                        SELECT DISTINCT row_hash
+                        FROM {destination_table}
+                        WHERE exposure_datetime BETWEEN '{batch_start}'::TIMESTAMP AND '{batch_end}'::TIMESTAMP
+                    ) AS old_data ON old_data.row_hash = new_data.row_hash
+                WHERE 
+                    new_data.partner_id = {partner_id}
+                    AND old_data.row_hash IS NULL
+            ;
+            '''
+
+            # summary rows are matched on the group. the batch re-reads whole days (see extract_start above),
+            # so a day that is already stored is replaced with the new totals. rows of a day that was
+            # read in more than one slice or chunk are added up first
+            if summary:
+                udw_import_query = f'''
+                    MERGE INTO {destination_table} AS old_data
+                    USING (
+                        SELECT
+                            p.vao
+                            ,p.vtifa
+                            ,p.exposure_date
+                            ,p.country
+                            ,p.campaign_id
+                            ,p.creative_id
+                            ,p.flight_id
+                            ,p.type
+                            ,SUM(p.exposure_count) AS exposure_count
+                            ,MIN(p.first_exposure_datetime) AS first_exposure_datetime
+                            ,MAX(p.last_exposure_datetime) AS last_exposure_datetime
+                            ,p.row_hash
+                        FROM {prep_table} p
+                        WHERE 
+                            p.partner_id = {partner_id}
+                        GROUP BY 
+                            1, 2, 3, 4, 5, 6, 7, 8, 12
+                    ) AS new_data ON old_data.row_hash = new_data.row_hash
+                        AND old_data.exposure_date BETWEEN '{batch_start}'::DATE AND '{batch_end}'::DATE
+                    WHEN MATCHED THEN UPDATE SET
+                        old_data.exposure_count = new_data.exposure_count
+                        ,old_data.first_exposure_datetime = new_data.first_exposure_datetime
+                        ,old_data.last_exposure_datetime = new_data.last_exposure_datetime
+                        ,old_data.date_imported = CURRENT_DATE::DATE
+                    WHEN NOT MATCHED THEN INSERT (
+                        vao
+                        ,vtifa
+                        ,exposure_date
+                        ,country
+                        ,campaign_id
+                        ,creative_id
+                        ,flight_id
+                        ,type
+                        ,exposure_count
+                        ,first_exposure_datetime
+                        ,last_exposure_datetime
+                        ,date_imported
+                        ,row_hash
+                    ) VALUES (
+                        new_data.vao
+                        ,new_data.vtifa
+                        ,new_data.exposure_date
+                        ,new_data.country
+                        ,new_data.campaign_id
+                        ,new_data.creative_id
+                        ,new_data.flight_id
+                        ,new_data.type
+                        ,new_data.exposure_count
+                        ,new_data.first_exposure_datetime
+                        ,new_data.last_exposure_datetime
+                        ,CURRENT_DATE::DATE
+                        ,new_data.row_hash
+                    )
+                ;
+                '''
+
+            with metrics.stage('dedup_insert', region = cdw_config, destination = destination_table) as stage:
+                udw_cur.execute(udw_import_query)
+                stage.rows = udw_cur.rowcount
+                stage.add_query_id(udw_cur)
+
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Data inserted into {destination_table}")
+
+
+            # move the watermark forward now that the batch is stored
+            update_watermark(udw_cur, destination_table, cdw_config, batch_end)
+
+
+        # every partner is stored, so the slice does not need to be kept
+        if checkpoint is not None:
+            checkpoint.clear()
+
+
+        #================================================================
+        # END - PULL CDW EXPOSURE DATA
+        #================================================================
+        
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Process completed sucessfully.")
+
+    except Exception as e:
+        
+        # get exception as pass it back up to the calling script
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Process failed.")
+        
+        raise Exception("Exposure data was not able to be retrieved.") from e
+        
+    finally: 
+        
+        #================================================================
+        # START CLOSE DB CONNECTIONS
+        #================================================================
+
+        if udw_cur is not None:
+            udw_cur.close()
+
+        if cdw_cur is not None:
+            cdw_cur.close()
+
+        if connections is None:
+
+            if udw_conn is not None:
+                udw_conn.close()
+
+            if cdw_conn is not None:
+                cdw_conn.close()
+
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> All connections disconnected.")
+
+        elif cdw_conn is not None and not cdw_conn.closed:
+
+            # end the CDW transaction so the shared session is clean for the next job
+            cdw_conn.rollback()
+
+
+        #================================================================
+        # END CLOSE DB CONNECTIONS
+        #================================================================
+
+        end_timestamp = datetime.now()
+        time_used = end_timestamp - start_timestamp
+
+
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Total running time: ", str(time_used).split('.')[0])
+
+        if own_metrics:
+            metrics.write()
+        
+        
+    return True
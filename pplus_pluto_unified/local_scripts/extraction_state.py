@@ -0,0 +1,92 @@
+'''
+===================================================
+CDW EXTRACTION WATERMARKS
+===================================================
+keeps track of the latest event time loaded from CDW for each destination
+table (partner) and CDW region, so nightly runs only extract new data.
+
+the state table is created by snowflake_scripts/example_init_extraction_state.sql
+
+'''
+
+# import packages
+from datetime import datetime, timedelta
+
+
+#vars
+'''
+DEFINITION:
+------------
+destination_table   = UDW table the extracted rows are written to. identifies the partner
+cdw_config          = config property used for the CDW connection. identifies the region
+grace_hours         = hours subtracted from the watermark to pick up late-arriving events
+backfill_start      = (optional) manual start date that overrides the watermark (e.g., '2024-05-01')
+high_water_ts       = latest event time that was loaded successfully
+
+EXAMPLE:
+-----------
+extract_start = get_extraction_start(udw_cur, 'udw_clientsolutions_cs.pluto_custom_global_exposure', 'personalAccountEU', 48)
+update_watermark(udw_cur, 'udw_clientsolutions_cs.pluto_custom_global_exposure', 'personalAccountEU', batch_end)
+'''
+
+
+state_table = 'udw_clientsolutions_cs.custom_cdw_extraction_state'
+
+# used when there is no watermark yet for a table and region
+default_lookback_days = 14
+
+
+def get_extraction_start(udw_cur, destination_table, cdw_config, grace_hours, backfill_start = None):
+    '''
+    return the timestamp the CDW extraction should start from.
+    backfill_start wins when given. otherwise the watermark minus the grace
+    period is used, or the default look back when no watermark exists yet.
+    '''
+
+    if backfill_start:
+        extract_start = datetime.strptime(str(backfill_start)[:10], '%Y-%m-%d')
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Backfill requested. Extracting from {extract_start}")
+        return extract_start
+
+    udw_cur.execute(f'''
+        SELECT high_water_ts
+        FROM {state_table}
+        WHERE
+            destination_table = %s
+            AND cdw_config = %s
+        ;
+    ''', (destination_table.lower(), cdw_config))
+
+    row = udw_cur.fetchone()
+
+    if row is None or row[0] is None:
+        extract_start = datetime.combine(datetime.now().date() - timedelta(days = default_lookback_days), datetime.min.time())
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> No watermark found. Extracting from {extract_start}")
+    else:
+        extract_start = row[0] - timedelta(hours = grace_hours)
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Watermark {row[0]}. Extracting from {extract_start} ({grace_hours} hour grace period)")
+
+    return extract_start
+
+
+def update_watermark(udw_cur, destination_table, cdw_config, high_water_ts):
+    '''
+    record the latest loaded event time. the watermark never moves backwards,
+    so a backfill of older data does not reset it.
+    '''
+
+    udw_cur.execute(f'''
+        MERGE INTO {state_table} AS s
+        USING (
+            SELECT
+                %s AS destination_table
+                ,%s AS cdw_config
+                ,%s::TIMESTAMP AS high_water_ts
+        ) AS n ON s.destination_table = n.destination_table AND s.cdw_config = n.cdw_config
+        WHEN MATCHED THEN UPDATE SET
+            s.high_water_ts = GREATEST(s.high_water_ts, n.high_water_ts)
+            ,s.last_run_ts = CURRENT_TIMESTAMP
+        WHEN NOT MATCHED THEN INSERT (destination_table, cdw_config, high_water_ts, last_run_ts)
+            VALUES (n.destination_table, n.cdw_config, n.high_water_ts, CURRENT_TIMESTAMP)
+        ;
+    ''', (destination_table.lower(), cdw_config, str(high_water_ts)))
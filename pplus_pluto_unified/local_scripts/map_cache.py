@@ -0,0 +1,138 @@
+'''
+===================================================
+CREATIVE MAP CACHE
+===================================================
+keeps the vao/campaign map built from UDW for the length of a run, so the
+EU, APAC, and SA pulls of a partner scan the campaign tables once instead of
+once per region. maps are keyed by sales order table and reporting window.
+
+an optional on-disk cache keeps the map between runs. a cached file is used
+only while the sales order rows the map reads are unchanged since it was
+written (row count and a hash of their columns) and it is not older than
+max_age_hours, as the campaign tables change on their own.
+sp_update_custom_operative_sales_orders sets last_update_ts on every refresh,
+so the fingerprint does not use it.
+
+'''
+
+# import packages
+from datetime import datetime, timedelta
+from pathlib import Path
+import json
+import threading
+import pandas as pd
+
+
+#vars
+'''
+DEFINITION:
+------------
+cache_dir           = (optional) folder for the on-disk cache. None or '' = memory only
+max_age_hours       = age after which an on-disk map is rebuilt even if the sales orders did not change
+udw_conn            = open snowflake connection used to check the sales order table and build the map
+sales_order_table   = partner operative sales order table the map is built from
+window_start        = first date of the reporting window (date)
+window_end          = last date of the reporting window (date)
+build_map           = function that takes udw_conn and returns the map dataframe
+
+EXAMPLE:
+-----------
+map_cache = MapCache(config.get('runSettings', 'map_cache_dir', fallback = ''))
+udw_df_map = map_cache.get(udw_conn, 'udw_clientsolutions_cs.pluto_operative_sales_orders', window_start, window_end, build_map)
+'''
+
+
+# used when config.ini does not set map_cache_max_age_hours
+default_max_age_hours = 20
+
+
+class MapCache:
+
+    def __init__(self, cache_dir = None, max_age_hours = default_max_age_hours):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_age_hours = max_age_hours
+        self._maps = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+
+    def get(self, udw_conn, sales_order_table, window_start, window_end, build_map):
+        '''
+        return the map for the sales order table and window. the map is built
+        once per key. regions that ask for a key that is being built wait for it.
+        '''
+
+        key = (sales_order_table.lower(), str(window_start), str(window_end))
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+
+            if key not in self._maps:
+                self._maps[key] = self._load(udw_conn, key, build_map)
+            else:
+                print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Creative map reused from this run ({len(self._maps[key])} rows)")
+
+            # callers change column names and types, so each gets its own copy
+            return self._maps[key].copy()
+
+
+    def _load(self, udw_conn, key, build_map):
+
+        if self.cache_dir is None:
+            return build_map(udw_conn)
+
+        sales_order_table, window_start, window_end = key
+        file_path = self.cache_dir / f"{sales_order_table.replace('.', '_')}_{window_start}_{window_end}.parquet"
+        meta_path = file_path.with_suffix('.json')
+
+        fingerprint = get_sales_order_fingerprint(udw_conn, sales_order_table)
+
+        if file_path.exists() and meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            cache_age = datetime.now() - datetime.fromisoformat(meta['created_at'])
+
+            if meta['fingerprint'] == fingerprint and cache_age < timedelta(hours = self.max_age_hours):
+                df_map = pd.read_parquet(file_path)
+                print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Creative map read from disk cache ({len(df_map)} rows)")
+                return df_map
+
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", "---> Creative map disk cache is out of date. Rebuilding...")
+
+        df_map = build_map(udw_conn)
+
+        self.cache_dir.mkdir(parents = True, exist_ok = True)
+        df_map.to_parquet(file_path, index = False)
+        meta_path.write_text(json.dumps({'fingerprint': fingerprint, 'created_at': datetime.now().isoformat()}))
+
+        return df_map
+
+
+def get_sales_order_fingerprint(udw_conn, sales_order_table):
+    '''
+    row count and order independent hash of the sales order columns used by the map.
+    changes only when those rows change, not on every refresh of the table.
+    '''
+
+    udw_cur = udw_conn.cursor()
+
+    try:
+        udw_cur.execute(f'''
+            SELECT 
+                COUNT(*)
+                ,HASH_AGG(
+                    vao
+                    ,sales_order_name
+                    ,package_sales_order_line_item_id
+                    ,package_sales_order_line_item_start_at
+                    ,package_sales_order_line_item_end_at
+                )::VARCHAR
+            FROM {sales_order_table}
+            ;
+        ''')
+        row_count, row_hash = udw_cur.fetchone()
+    finally:
+        udw_cur.close()
+
+    return f"{row_count}|{row_hash}"
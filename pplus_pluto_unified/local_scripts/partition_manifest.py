@@ -0,0 +1,137 @@
+'''
+===================================================
+CDW PARTITION MANIFEST
+===================================================
+change detection for the app usage re-pulls. the row count and checksum of
+each CDW partition (partition_datehour or partition_date) in the reporting
+window are compared with the values stored when the partition was last
+loaded. only partitions that are new or changed are extracted again, so late
+data is still picked up without reading the whole window every night.
+
+the manifest table is created by snowflake_scripts/example_init_partition_manifest.sql
+
+'''
+
+# import packages
+from datetime import datetime
+import psycopg2.extras
+
+
+#vars
+'''
+DEFINITION:
+------------
+destination_table   = UDW table the extracted rows are written to. identifies the partner
+region              = region key (e.g., 'cdw_eu'). identifies the CDW region and countries
+partitions          = list of (partition_key, row_count, checksum) read from CDW for the whole window
+changed             = partitions returned by get_changed_partitions
+partition_key       = value of partition_datehour (e.g., '2024090112') or partition_date (e.g., '20240901')
+checksum            = order independent checksum of the partition rows (sum of row hashes)
+
+EXAMPLE:
+-----------
+cdw_cur.execute(cdw_partition_query)
+partitions = cdw_cur.fetchall()
+changed = get_changed_partitions(udw_cur, 'udw_clientsolutions_cs.pluto_custom_app_usage', 'cdw_eu', partitions)
+load_changed_partitions(cdw_cur, changed)
+...
+update_partition_manifest(udw_cur, 'udw_clientsolutions_cs.pluto_custom_app_usage', 'cdw_eu', changed, partitions)
+'''
+
+
+manifest_table = 'udw_clientsolutions_cs.custom_cdw_partition_manifest'
+
+
+def get_changed_partitions(udw_cur, destination_table, region, partitions):
+    '''
+    return the CDW partitions whose row count or checksum differ from the manifest.
+    partitions missing from the manifest (new or never loaded) are changed.
+    '''
+
+    udw_cur.execute(f'''
+        SELECT partition_key, row_count, checksum
+        FROM {manifest_table}
+        WHERE
+            destination_table = %s
+            AND region = %s
+        ;
+    ''', (destination_table.lower(), region))
+
+    stored = {str(key): (int(row_count), str(checksum)) for key, row_count, checksum in udw_cur.fetchall()}
+
+    changed = [
+        (str(key), int(row_count), str(checksum))
+        for key, row_count, checksum in partitions
+        if stored.get(str(key)) != (int(row_count), str(checksum))
+    ]
+
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> {len(changed)} of {len(partitions)} CDW partitions are new or changed")
+
+    return changed
+
+
+def load_changed_partitions(cdw_cur, changed):
+    '''
+    keep the changed partition keys in a CDW temp table so the extraction query can filter on them
+    '''
+
+    cdw_cur.execute('''
+        DROP TABLE IF EXISTS changed_partitions;
+        CREATE TEMP TABLE changed_partitions (
+            partition_key   VARCHAR(16)
+        );
+    ''')
+
+    psycopg2.extras.execute_values(
+        cdw_cur
+        ,"INSERT INTO changed_partitions (partition_key) VALUES %s;"
+        ,[(key,) for key, row_count, checksum in changed]
+    )
+
+
+def update_partition_manifest(udw_cur, destination_table, region, changed, partitions):
+    '''
+    record the row count and checksum of the partitions that were loaded.
+    call after the rows are stored so a failed run extracts the partitions again.
+    partitions older than the oldest one in the window are removed.
+    '''
+
+    if len(changed) == 0:
+        return
+
+    values = ',\n'.join(['(%s, %s, %s, %s, %s)'] * len(changed))
+    params = []
+    for key, row_count, checksum in changed:
+        params.extend([destination_table.lower(), region, key, row_count, checksum])
+
+    udw_cur.execute(f'''
+        MERGE INTO {manifest_table} AS s
+        USING (
+            SELECT
+                column1 AS destination_table
+                ,column2 AS region
+                ,column3 AS partition_key
+                ,column4 AS row_count
+                ,column5 AS checksum
+            FROM VALUES
+            {values}
+        ) AS n ON s.destination_table = n.destination_table
+            AND s.region = n.region
+            AND s.partition_key = n.partition_key
+        WHEN MATCHED THEN UPDATE SET
+            s.row_count = n.row_count
+            ,s.checksum = n.checksum
+            ,s.last_loaded_ts = CURRENT_TIMESTAMP
+        WHEN NOT MATCHED THEN INSERT (destination_table, region, partition_key, row_count, checksum, last_loaded_ts)
+            VALUES (n.destination_table, n.region, n.partition_key, n.row_count, n.checksum, CURRENT_TIMESTAMP)
+        ;
+    ''', params)
+
+    udw_cur.execute(f'''
+        DELETE FROM {manifest_table}
+        WHERE
+            destination_table = %s
+            AND region = %s
+            AND partition_key < %s
+        ;
+    ''', (destination_table.lower(), region, min([str(key) for key, row_count, checksum in partitions])))
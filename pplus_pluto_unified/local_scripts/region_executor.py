@@ -0,0 +1,118 @@
+'''
+===================================================
+CONCURRENT REGION EXECUTOR
+===================================================
+runs the same loader function for several CDW regions at the same time.
+each region runs in its own worker thread, so one failed region does not
+cancel the others. results for every region are
+collected and can be passed to the slack failure hook in the calling script.
+
+'''
+
+# import packages
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import configparser
+
+
+#vars
+'''
+DEFINITION:
+------------
+region_name         = label used in logs and in the failure message (e.g., 'EU')
+loader              = function to call for the region (e.g., ex.get_exposures_from_cdw_to_udw)
+args                = positional arguments passed to the loader for that region
+max_workers         = maximum number of regions that run at the same time
+shared_kwargs       = (optional) keyword arguments passed to the loader for every region (e.g., connections)
+
+EXAMPLE:
+-----------
+jobs = [
+    ('EU', (sales_order_table, destination_table, 'personalAccountEU', udw_config)),
+    ('APAC', (sales_order_table, destination_table, 'personalAccountAPAC', udw_config)),
+]
+
+results = run_regions(ex.get_exposures_from_cdw_to_udw, jobs, max_workers = 3, connections = connections)
+raise_for_failed_regions(results)
+'''
+
+
+# used when config.ini does not contain a [runSettings] section
+default_max_workers = 3
+
+
+def get_max_workers(config, setting = 'max_workers'):
+    '''
+    read the region worker count from the [runSettings] section of config.ini.
+    '''
+
+    try:
+        return max(1, config.getint('runSettings', setting))
+    except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
+        return default_max_workers
+
+
+def _run_region(region_name, loader, args, shared_kwargs):
+
+    start_timestamp = datetime.now()
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{region_name}] Region started...")
+
+    try:
+        loader(*args, **shared_kwargs)
+        error = None
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{region_name}] Region completed.")
+    except Exception as e:
+        error = e
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{region_name}] Region failed: {e}")
+
+    return {
+        'region': region_name
+        ,'success': error is None
+        ,'error': error
+        ,'running_time': datetime.now() - start_timestamp
+    }
+
+
+def run_regions(loader, jobs, max_workers = default_max_workers, **shared_kwargs):
+    '''
+    run loader for every (region_name, args) job concurrently and return one
+    result dict per region in the same order as jobs.
+    '''
+
+    results = {}
+
+    with ThreadPoolExecutor(max_workers = max_workers) as executor:
+        futures = {
+            executor.submit(_run_region, region_name, loader, args, shared_kwargs): region_name
+            for region_name, args in jobs
+        }
+
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    # output summary
+    for region_name, _ in jobs:
+        result = results[region_name]
+        status = 'SUCCESS' if result['success'] else 'FAILED'
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{region_name}] {status} in", str(result['running_time']).split('.')[0])
+
+    return [results[region_name] for region_name, _ in jobs]
+
+
+def raise_for_failed_regions(results):
+    '''
+    raise a single exception that lists every failed region so the calling
+    script can send one slack notification for the whole run.
+    '''
+
+    failed = [r for r in results if not r['success']]
+
+    if len(failed) > 0:
+
+        # loaders wrap the original error, so include the cause when there is one
+        details = []
+        for r in failed:
+            cause = r['error'].__cause__
+            details.append(f"{r['region']}: {r['error']}" + (f" ({cause})" if cause else ''))
+
+        raise Exception(f"{len(failed)} of {len(results)} regions failed. " + '; '.join(details))
@@ -0,0 +1,308 @@
+'''
+===================================================
+RUN METRICS
+===================================================
+records wall time, row count, bytes transferred, and CDW/UDW query ids for
+each stage of a run (map build, CDW query, cast, upload, dedup insert, etc.)
+and appends them as JSON lines to a local run log.
+
+the run log keeps a rolling history. when a run is written, each stage is
+compared with the median of the same job/stage over earlier runs, so a stage
+that slows down from one night to the next is easy to spot.
+
+jobs can share the run log. a run only appends its own lines, and entries
+older than history_days are pruned afterwards under a lock file, so runs that
+finish at the same time never drop each other's entries.
+
+'''
+
+# import packages
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+import json
+import os
+import statistics
+import threading
+import time
+import uuid
+
+
+#vars
+'''
+DEFINITION:
+------------
+job_name            = name of the run in the log (e.g., 'pluto_report_exposures')
+log_path            = (optional) JSON lines run log. None = logs/run_log.jsonl next to this file
+history_days        = days of history kept in the run log
+stage_name          = name of the stage being timed (e.g., 'cdw_extract')
+tags                = (optional) labels stored with the stage (e.g., region = 'EU')
+
+EXAMPLE:
+-----------
+metrics = RunMetrics('pluto_report_exposures')
+
+with metrics.stage('cdw_extract', region = 'EU') as stage:
+    cdw_cur.execute(query)
+    stage.rows = cdw_cur.rowcount
+    stage.add_query_id(cdw_cur)
+
+metrics.write()
+'''
+
+
+# used when config.ini does not set run_log_history_days
+default_history_days = 30
+
+# a stage is flagged when it takes this many times longer than its median
+slow_stage_factor = 2.0
+
+# how long a run waits for the run log lock, and when a lock left by a crashed run is taken over
+lock_timeout_seconds = 30
+stale_lock_seconds = 120
+
+
+class StageRecord:
+
+    def __init__(self, stage_name, tags):
+        self.stage = stage_name
+        self.tags = tags
+        self.rows = None
+        self.bytes = None
+        self.query_ids = []
+        self.started_at = datetime.now()
+        self.wall_seconds = None
+        self.status = 'running'
+        self.error = None
+
+
+    def add_query_id(self, cursor):
+        '''
+        record the id of the last query run on the cursor.
+        snowflake cursors carry it as sfqid. for redshift it is read with pg_last_query_id()
+        '''
+
+        try:
+            if hasattr(cursor, 'sfqid'):
+                if cursor.sfqid:
+                    self.query_ids.append(str(cursor.sfqid))
+                return
+
+            id_cur = cursor.connection.cursor()
+            id_cur.execute("SELECT pg_last_query_id();")
+            self.query_ids.append(str(id_cur.fetchone()[0]))
+            id_cur.close()
+
+        except Exception:
+            # query ids are for tracing only and must never fail a load
+            pass
+
+
+    def to_dict(self):
+
+        return {
+            'stage': self.stage
+            ,'tags': self.tags
+            ,'started_at': self.started_at.isoformat(timespec = 'seconds')
+            ,'wall_seconds': round(self.wall_seconds, 3) if self.wall_seconds is not None else None
+            ,'rows': self.rows
+            ,'bytes': self.bytes
+            ,'query_ids': self.query_ids
+            ,'status': self.status
+            ,'error': self.error
+        }
+
+
+class RunMetrics:
+
+    def __init__(self, job_name, log_path = None, history_days = default_history_days):
+        self.job_name = job_name
+        self.run_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.log_path = Path(log_path) if log_path else Path(os.path.dirname(os.path.abspath(__file__))) / 'logs' / 'run_log.jsonl'
+        self.history_days = history_days
+        self.stages = []
+        self._lock = threading.Lock()
+
+
+    @contextmanager
+    def stage(self, stage_name, **tags):
+        '''
+        time a block of code. rows, bytes, and query ids can be set on the record inside the block.
+        failed stages are recorded with their error and the error is raised again.
+        '''
+
+        record = StageRecord(stage_name, tags)
+        start = time.perf_counter()
+
+        try:
+            yield record
+            record.status = 'success'
+
+        except Exception as e:
+            record.status = 'failed'
+            record.error = str(e)
+            raise
+
+        finally:
+            record.wall_seconds = time.perf_counter() - start
+
+            with self._lock:
+                self.stages.append(record)
+
+            label = ' '.join([f"{v}" for v in tags.values()])
+            rows = f", {record.rows:,} rows" if record.rows is not None else ''
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> [{stage_name}{' ' + label if label else ''}] {record.status} in {record.wall_seconds:.1f}s{rows}")
+
+
+    def timed(self, stage_name, **tags):
+        '''
+        decorator version of stage(). records wall time only.
+        '''
+
+        def decorator(fn):
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(stage_name, **tags):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+    def write(self):
+        '''
+        append this run's stages to the run log, print any stage that is slower
+        than usual, then drop entries older than history_days.
+        '''
+
+        with self._lock:
+            records = [dict(r.to_dict(), run_id = self.run_id, job = self.job_name) for r in self.stages]
+
+        cutoff = (datetime.now() - timedelta(days = self.history_days)).isoformat(timespec = 'seconds')
+        history = [h for h in read_run_log(self.log_path) if h.get('started_at', '') >= cutoff]
+
+        self._report_slow_stages(records, history)
+
+        # metrics are for monitoring only, so a log that can't be written does not fail the run
+        try:
+            self.log_path.parent.mkdir(parents = True, exist_ok = True)
+            with _file_lock(self.log_path):
+                with open(self.log_path, 'a') as f:
+                    for entry in records:
+                        f.write(json.dumps(entry, default = str) + '\n')
+        except OSError as e:
+            print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Run metrics could not be written: {e}")
+            return
+
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Run metrics written to {self.log_path} ({len(records)} stages)")
+
+        prune_run_log(self.log_path, self.history_days)
+
+
+    def _report_slow_stages(self, records, history):
+
+        for r in records:
+            past = [
+                h['wall_seconds'] for h in history
+                if h.get('job') == self.job_name
+                and h.get('stage') == r['stage']
+                and h.get('tags') == r['tags']
+                and h.get('status') == 'success'
+                and h.get('wall_seconds') is not None
+            ]
+
+            if len(past) == 0 or r['wall_seconds'] is None:
+                continue
+
+            median_seconds = statistics.median(past)
+
+            if median_seconds > 0 and r['wall_seconds'] > median_seconds * slow_stage_factor:
+                print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> SLOW STAGE: {r['stage']} {r['tags']} took {r['wall_seconds']:.1f}s (median {median_seconds:.1f}s over {len(past)} runs)")
+
+
+def read_run_log(log_path):
+    '''
+    return every entry in the run log. unreadable lines are skipped.
+    '''
+
+    log_path = Path(log_path)
+
+    if not log_path.exists():
+        return []
+
+    entries = []
+    with open(log_path) as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+
+    return entries
+
+
+def prune_run_log(log_path, history_days):
+    '''
+    drop entries older than history_days from the run log. runs under the lock
+    file, so lines appended by other jobs at the same time are kept.
+    '''
+
+    log_path = Path(log_path)
+    cutoff = (datetime.now() - timedelta(days = history_days)).isoformat(timespec = 'seconds')
+
+    try:
+        with _file_lock(log_path):
+            entries = read_run_log(log_path)
+            kept = [e for e in entries if e.get('started_at', '') >= cutoff]
+
+            if len(kept) == len(entries):
+                return
+
+            # write then rename so a crash never leaves a half written log
+            tmp_path = log_path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                for entry in kept:
+                    f.write(json.dumps(entry, default = str) + '\n')
+            os.replace(tmp_path, log_path)
+
+    except OSError as e:
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Run log could not be pruned: {e}")
+
+
+@contextmanager
+def _file_lock(path):
+
+    # a lock file created with O_EXCL works the same on Windows and Linux
+    lock_path = Path(str(path) + '.lock')
+    deadline = time.monotonic() + lock_timeout_seconds
+
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            pass
+
+        try:
+            if time.time() - lock_path.stat().st_mtime > stale_lock_seconds:
+                lock_path.unlink()
+                continue
+        except FileNotFoundError:
+            continue
+
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{lock_path} is held by another run")
+
+        time.sleep(0.1)
+
+    try:
+        yield
+    finally:
+        os.close(fd)
+        try:
+            lock_path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,218 @@
+'''
+===================================================
+TIME-SLICED PARALLEL CDW EXTRACTION
+===================================================
+splits the extraction window of one region into slices of slice_hours and
+reads the slices at the same time over a small pool of CDW connections.
+each connection streams its slices through a server-side cursor and hands
+the chunks to a single uploader, so UDW receives the same typed parquet
+chunks as the one-connection streaming mode (see cdw_streaming.py).
+
+the number of connections is capped per cluster (max_slice_connections in
+the cluster's section of config.ini). the cap is shared by every job in the
+process, so regions or partners that run at the same time on the same
+cluster wait for a free connection instead of adding more load for other
+users of the cluster.
+
+slices do not have to be time ranges. a slice is a tuple that is passed to
+set_slice and, when the query is a function, to the query (e.g., the country
+groups of the app usage loader).
+
+'''
+
+# import packages
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+from arrow_transfer import rows_to_record_batch
+from cdw_streaming import upload_batch
+
+
+#vars
+'''
+DEFINITION:
+------------
+window_start        = first timestamp of the extraction window
+window_end          = last timestamp of the extraction window (inclusive)
+slice_hours         = hours per slice (e.g., 24 = one slice per day)
+open_cdw            = function that opens a new CDW connection. the connection is closed here
+prepare_session     = function that takes a CDW cursor and creates the temp tables the query needs
+set_slice           = function that takes a CDW cursor and the values of a slice (e.g., slice start and slice end) and sets them for the query
+query               = CDW select statement that reads one slice, or a function that takes the values of a slice and returns it
+cluster_key         = CDW config of the cluster. the connection cap is shared per key
+max_connections     = most connections open on the cluster at once
+checkpoint          = (optional) SliceCheckpoint that keeps each chunk on local disk
+
+EXAMPLE:
+-----------
+slices = get_time_slices(window_start, window_end, 24)
+row_count, parquet_bytes = extract_slices_to_udw(
+    lambda: connect_cdw(config, 'personalAccountEU'), prepare_session, set_slice, cdw_get_exposure_query
+    ,slices, udw_conn, 'EXP_PREP', EXP_PREP_SCHEMA, 500000, 'personalAccountEU', 2, 'exposure_slice'
+)
+'''
+
+
+# used when the cluster's section in config.ini does not set max_slice_connections
+default_max_connections = 2
+
+# connection slots per cluster, shared by every job in the process
+_cluster_slots = {}
+_cluster_slots_lock = threading.Lock()
+
+# put on the chunk queue by a reader when it has no more slices
+_reader_finished = object()
+
+
+def get_time_slices(window_start, window_end, slice_hours):
+    '''
+    split the window into (slice_start, slice_end) pairs. slice_end is inclusive
+    and one microsecond before the next slice, so BETWEEN never reads a row twice
+    '''
+
+    slices = []
+    slice_start = window_start
+
+    while slice_start <= window_end:
+        next_start = slice_start + timedelta(hours = slice_hours)
+        slices.append((slice_start, min(next_start - timedelta(microseconds = 1), window_end)))
+        slice_start = next_start
+
+    return slices
+
+
+def get_cluster_slots(cluster_key, max_connections):
+
+    with _cluster_slots_lock:
+        if cluster_key not in _cluster_slots:
+            _cluster_slots[cluster_key] = threading.BoundedSemaphore(max_connections)
+
+        return _cluster_slots[cluster_key]
+
+
+def extract_slices_to_udw(open_cdw, prepare_session, set_slice, query, slices, udw_conn, table_name, arrow_schema, chunk_size, cluster_key, max_connections, cursor_name, schema = 'UDW_CLIENTSOLUTIONS_CS', checkpoint = None):
+    '''
+    read the slices in parallel and upload every chunk into the UDW table.
+    returns the number of rows and the parquet bytes uploaded.
+    '''
+
+    slots = get_cluster_slots(cluster_key, max_connections)
+    reader_count = min(max_connections, len(slices))
+
+    slice_queue = queue.Queue()
+    for s in slices:
+        slice_queue.put(s)
+
+    # bounded so readers wait for the uploader instead of filling memory
+    chunk_queue = queue.Queue(maxsize = reader_count * 2)
+    stop = threading.Event()
+
+    total_rows = 0
+    total_bytes = 0
+    upload_error = None
+
+    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Reading {len(slices)} slices over {reader_count} CDW connections...")
+
+    with ThreadPoolExecutor(max_workers = reader_count) as executor:
+
+        futures = [
+            executor.submit(_read_slices, f'{cursor_name}_{i}', open_cdw, prepare_session, set_slice, query, slice_queue, chunk_queue, arrow_schema, chunk_size, slots, stop)
+            for i in range(reader_count)
+        ]
+
+        # the UDW session is only used from this thread
+        finished = 0
+        while finished < reader_count:
+            batch = chunk_queue.get()
+
+            if batch is _reader_finished:
+                finished += 1
+                continue
+
+            # after a failure the queue is only drained so the readers can exit
+            if stop.is_set():
+                continue
+
+            try:
+                batch_rows, batch_bytes = upload_batch(udw_conn, batch, table_name, schema, checkpoint)
+                total_rows += batch_rows
+                total_bytes += batch_bytes
+                print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Slice chunk loaded into UDW temp table ({total_rows} rows so far)...")
+
+            except Exception as e:
+                upload_error = e
+                stop.set()
+
+            del batch
+
+    # raise the first reader error, then any upload error
+    for f in futures:
+        f.result()
+
+    if upload_error is not None:
+        raise upload_error
+
+    return total_rows, total_bytes
+
+
+def _read_slices(cursor_name, open_cdw, prepare_session, set_slice, query, slice_queue, chunk_queue, arrow_schema, chunk_size, slots, stop):
+    '''
+    one reader: wait for a connection slot on the cluster, then stream slices
+    until none are left. the temp tables are created once per connection.
+    '''
+
+    try:
+        with slots:
+            cdw_conn = open_cdw()
+
+            try:
+                cdw_cur = cdw_conn.cursor()
+                prepare_session(cdw_cur)
+
+                while not stop.is_set():
+                    try:
+                        slice_values = slice_queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                    set_slice(cdw_cur, *slice_values)
+                    slice_query = query(*slice_values) if callable(query) else query
+                    _stream_slice(cdw_conn, slice_query, cursor_name, chunk_queue, arrow_schema, chunk_size, stop)
+                    print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Slice {' to '.join([str(v) for v in slice_values])} read")
+
+                cdw_cur.close()
+
+            finally:
+                cdw_conn.close()
+
+    except Exception:
+        stop.set()
+        raise
+
+    finally:
+        chunk_queue.put(_reader_finished)
+
+
+def _stream_slice(cdw_conn, query, cursor_name, chunk_queue, arrow_schema, chunk_size, stop):
+
+    # QUIRK!!! the query is wrapped in a DECLARE statement so it can't end with a semicolon
+    stream_cur = cdw_conn.cursor(name = cursor_name)
+    stream_cur.itersize = chunk_size
+
+    try:
+        stream_cur.execute(query.strip().rstrip(';'))
+
+        while not stop.is_set():
+            rows = stream_cur.fetchmany(chunk_size)
+
+            if len(rows) == 0:
+                break
+
+            batch = rows_to_record_batch(rows, [d[0] for d in stream_cur.description], arrow_schema)
+            del rows
+
+            chunk_queue.put(batch)
+
+    finally:
+        stream_cur.close()
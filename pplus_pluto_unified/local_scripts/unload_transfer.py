@@ -0,0 +1,173 @@
+'''
+===================================================
+BULK TRANSFER FROM CDW TO UDW THROUGH S3
+===================================================
+transfer engine for large windows (6 month backfills, app usage resets).
+CDW writes the query result straight to S3 as parquet with UNLOAD and UDW
+loads the files with COPY INTO from an external stage. the rows never pass
+through this process, so memory and run time do not grow with python.
+python only runs the statements, checks the files, and cleans up.
+
+settings are under [unloadTransfer] in config.ini. the UDW external stage
+must point at the root of the bucket (s3://<bucket>/). endpoint_url points
+boto3 at an S3-compatible stand-in (e.g., MinIO at http://localhost:9000)
+so the file listing and clean up can be tested locally.
+
+'''
+
+# import packages
+from datetime import datetime
+import uuid
+import boto3
+
+
+#vars
+'''
+DEFINITION:
+------------
+bucket              = S3 bucket CDW unloads to. blank = bulk transfer is off
+prefix              = folder in the bucket for the unloaded files. each run gets its own sub folder
+region              = (optional) AWS region of the bucket when it differs from the CDW cluster
+iam_role            = IAM role ARN CDW uses to write to the bucket
+udw_stage           = UDW external stage on s3://<bucket>/ (e.g., UDW_CLIENTSOLUTIONS_CS.CDW_UNLOAD_STAGE)
+endpoint_url        = (optional) S3 endpoint for boto3. blank = AWS
+max_file_size_mb    = largest parquet file CDW writes. bigger results are split into more files
+min_window_days     = loaders switch to the bulk transfer when the extraction window is at least this many days
+keep_files          = true = leave the unloaded files in S3 after the COPY (for troubleshooting)
+
+EXAMPLE:
+-----------
+unload_settings = get_unload_settings(config)
+row_count, file_bytes = unload_cdw_query_to_udw(cdw_conn, cdw_get_exposure_query, udw_conn, 'EXP_PREP', unload_settings, 'exposures_eu')
+'''
+
+
+# used when config.ini does not set them
+default_max_file_size_mb = 256
+default_min_window_days = 30
+
+
+def get_unload_settings(config):
+    '''
+    settings under [unloadTransfer], or None when no bucket is set.
+    '''
+
+    if not config.has_section('unloadTransfer') or not config.get('unloadTransfer', 'bucket', fallback = ''):
+        return None
+
+    return {
+        'bucket':               config.get('unloadTransfer', 'bucket')
+        ,'prefix':              config.get('unloadTransfer', 'prefix', fallback = 'cdw_unload').strip('/')
+        ,'region':              config.get('unloadTransfer', 'region', fallback = '')
+        ,'iam_role':            config.get('unloadTransfer', 'iam_role')
+        ,'udw_stage':           config.get('unloadTransfer', 'udw_stage')
+        ,'endpoint_url':        config.get('unloadTransfer', 'endpoint_url', fallback = '') or None
+        ,'max_file_size_mb':    config.getint('unloadTransfer', 'max_file_size_mb', fallback = default_max_file_size_mb)
+        ,'min_window_days':     config.getint('unloadTransfer', 'min_window_days', fallback = default_min_window_days)
+        ,'keep_files':          config.getboolean('unloadTransfer', 'keep_files', fallback = False)
+    }
+
+
+def use_unload_transfer(unload_settings, window_days, unload = None):
+    '''
+    true when the loader should use the bulk transfer.
+    unload = True/False forces the choice. None = use it for windows of at least min_window_days
+    '''
+
+    if unload_settings is None:
+        if unload:
+            raise Exception("Bulk transfer requested but no bucket is set under [unloadTransfer] in config.ini.")
+        return False
+
+    if unload is not None:
+        return unload
+
+    return window_days >= unload_settings['min_window_days']
+
+
+def unload_cdw_query_to_udw(cdw_conn, query, udw_conn, table_name, unload_settings, job_key, schema = 'UDW_CLIENTSOLUTIONS_CS'):
+    '''
+    UNLOAD the CDW query to S3 as parquet and COPY the files into the UDW table.
+    temp tables used by the query must exist in the CDW session.
+    returns the number of rows and the size of the parquet files in bytes.
+    '''
+
+    s3 = boto3.client('s3', endpoint_url = unload_settings['endpoint_url'])
+    bucket = unload_settings['bucket']
+
+    # every transfer gets its own folder so regions and retries never read each other's files
+    prefix = f"{unload_settings['prefix']}/{job_key.lower()}/{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}/"
+
+    # QUIRK!!! the query is passed to UNLOAD as a string, so quotes are doubled and the semicolon removed
+    unload_query = query.strip().rstrip(';').replace("'", "''")
+    region_option = f"REGION '{unload_settings['region']}'" if unload_settings['region'] else ''
+
+    cdw_cur = cdw_conn.cursor()
+    udw_cur = udw_conn.cursor()
+
+    try:
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> CDW unloading to s3://{bucket}/{prefix}...")
+        cdw_cur.execute(f'''
+            UNLOAD ('{unload_query}')
+            TO 's3://{bucket}/{prefix}part_'
+            IAM_ROLE '{unload_settings['iam_role']}'
+            FORMAT AS PARQUET
+            MAXFILESIZE {unload_settings['max_file_size_mb']} MB
+            {region_option}
+            ;
+        ''')
+
+        cdw_cur.execute("SELECT pg_last_unload_count();")
+        row_count = cdw_cur.fetchone()[0]
+
+        files = list_files(s3, bucket, prefix)
+        file_bytes = sum([f['Size'] for f in files])
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> CDW unloaded {row_count} rows in {len(files)} files ({file_bytes} bytes)")
+
+        if row_count == 0:
+            return 0, 0
+
+        # USE_LOGICAL_TYPE keeps parquet timestamps as timestamps
+        # CDW writes lowercase column names, which are matched to the uppercase prep table columns
+        udw_cur.execute(f'''
+            COPY INTO {schema}.{table_name}
+            FROM @{unload_settings['udw_stage']}/{prefix}
+            FILE_FORMAT = (TYPE = PARQUET USE_LOGICAL_TYPE = TRUE)
+            MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE
+            ;
+        ''')
+
+        print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> UDW copied the unloaded files into {table_name}")
+
+    finally:
+        cdw_cur.close()
+        udw_cur.close()
+
+        # a failed clean up is reported but does not hide the result of the transfer
+        if not unload_settings['keep_files']:
+            try:
+                delete_files(s3, bucket, prefix)
+            except Exception as e:
+                print(datetime.now().strftime("%Y-%m-%d %H:%M"), "\n", f"---> Unloaded files could not be removed from s3://{bucket}/{prefix}: {e}")
+
+    return row_count, file_bytes
+
+
+def list_files(s3, bucket, prefix):
+
+    files = []
+    for page in s3.get_paginator('list_objects_v2').paginate(Bucket = bucket, Prefix = prefix):
+        files.extend(page.get('Contents', []))
+
+    return files
+
+
+def delete_files(s3, bucket, prefix):
+    '''
+    remove the files of one transfer. delete_objects takes up to 1000 keys per call.
+    '''
+
+    keys = [{'Key': f['Key']} for f in list_files(s3, bucket, prefix)]
+
+    for i in range(0, len(keys), 1000):
+        s3.delete_objects(Bucket = bucket, Delete = {'Objects': keys[i:i + 1000]})
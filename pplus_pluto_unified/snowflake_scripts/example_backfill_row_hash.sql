@@ -0,0 +1,98 @@
+/**
+One time backfill of the row_hash column used by custom_global_exposures.py and
+custom_global_app_use.py to find rows that are already loaded.
+
+Run this once per table BEFORE the next nightly run that uses row_hash.
+Rows without a hash are not matched by the dedup step and would be inserted again.
+
+The formulas below must match the MD5 expressions in the CDW queries of the
+python loaders. Timestamps are formatted to the second and NULLs are treated as ''.
+**/
+
+-- connection settings
+USE ROLE UDW_CLIENTSOLUTIONS_REPORTING_MAINTAINER_ROLE_PROD;
+USE WAREHOUSE UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD_MEDIUM;
+USE DATABASE UDW_PROD;
+USE SCHEMA UDW_CLIENTSOLUTIONS_CS;
+
+
+
+--===============================
+-- EXPOSURES
+--===============================
+ALTER TABLE udw_clientsolutions_cs.paramount_custom_global_exposure ADD COLUMN IF NOT EXISTS row_hash VARCHAR(32);
+ALTER TABLE udw_clientsolutions_cs.pluto_custom_global_exposure ADD COLUMN IF NOT EXISTS row_hash VARCHAR(32);
+
+
+-- backfill paramount+
+UPDATE udw_clientsolutions_cs.paramount_custom_global_exposure
+SET row_hash = MD5(
+    COALESCE(vao::VARCHAR, '')
+    || '|' || COALESCE(vtifa::VARCHAR, '')
+    || '|' || COALESCE(TO_VARCHAR(exposure_datetime, 'YYYY-MM-DD HH24:MI:SS'), '')
+    || '|' || COALESCE(country::VARCHAR, '')
+    || '|' || COALESCE(campaign_id::VARCHAR, '')
+    || '|' || COALESCE(creative_id::VARCHAR, '')
+    || '|' || COALESCE(flight_id::VARCHAR, '')
+    || '|' || COALESCE(type::VARCHAR, '')
+)
+WHERE row_hash IS NULL
+;
+
+
+-- backfill pluto
+UPDATE udw_clientsolutions_cs.pluto_custom_global_exposure
+SET row_hash = MD5(
+    COALESCE(vao::VARCHAR, '')
+    || '|' || COALESCE(vtifa::VARCHAR, '')
+    || '|' || COALESCE(TO_VARCHAR(exposure_datetime, 'YYYY-MM-DD HH24:MI:SS'), '')
+    || '|' || COALESCE(country::VARCHAR, '')
+    || '|' || COALESCE(campaign_id::VARCHAR, '')
+    || '|' || COALESCE(creative_id::VARCHAR, '')
+    || '|' || COALESCE(flight_id::VARCHAR, '')
+    || '|' || COALESCE(type::VARCHAR, '')
+)
+WHERE row_hash IS NULL
+;
+
+
+
+--===============================
+-- APP USAGE
+--===============================
+ALTER TABLE udw_clientsolutions_cs.paramount_custom_app_usage ADD COLUMN IF NOT EXISTS row_hash VARCHAR(32);
+ALTER TABLE udw_clientsolutions_cs.pluto_custom_app_usage ADD COLUMN IF NOT EXISTS row_hash VARCHAR(32);
+
+
+-- backfill paramount+
+UPDATE udw_clientsolutions_cs.paramount_custom_app_usage
+SET row_hash = MD5(
+    COALESCE(tifa::VARCHAR, '')
+    || '|' || COALESCE(TO_VARCHAR(app_usage_datetime, 'YYYY-MM-DD HH24:MI:SS'), '')
+    || '|' || COALESCE(country::VARCHAR, '')
+    || '|' || COALESCE(app_id::VARCHAR, '')
+    || '|' || COALESCE(time_spent_min::VARCHAR, '')
+)
+WHERE row_hash IS NULL
+;
+
+
+-- backfill pluto
+UPDATE udw_clientsolutions_cs.pluto_custom_app_usage
+SET row_hash = MD5(
+    COALESCE(tifa::VARCHAR, '')
+    || '|' || COALESCE(TO_VARCHAR(app_usage_datetime, 'YYYY-MM-DD HH24:MI:SS'), '')
+    || '|' || COALESCE(country::VARCHAR, '')
+    || '|' || COALESCE(app_id::VARCHAR, '')
+    || '|' || COALESCE(time_spent_min::VARCHAR, '')
+)
+WHERE row_hash IS NULL
+;
+
+
+
+-- check that every row has a hash (expect 0)
+SELECT COUNT(*) FROM udw_clientsolutions_cs.paramount_custom_global_exposure WHERE row_hash IS NULL;
+SELECT COUNT(*) FROM udw_clientsolutions_cs.pluto_custom_global_exposure WHERE row_hash IS NULL;
+SELECT COUNT(*) FROM udw_clientsolutions_cs.paramount_custom_app_usage WHERE row_hash IS NULL;
+SELECT COUNT(*) FROM udw_clientsolutions_cs.pluto_custom_app_usage WHERE row_hash IS NULL;
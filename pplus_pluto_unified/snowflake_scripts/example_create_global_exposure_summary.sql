@@ -0,0 +1,134 @@
+/**
+Creates the daily exposure summary tables loaded by custom_global_exposures.py
+in summary mode (exposure_summary = true under [runSettings] in config.ini).
+
+One row per device, campaign/creative/flight, type, and day instead of one row per
+impression/click. exposure_count is the number of events and first/last_exposure_datetime
+are the first and last event of the day. row_hash identifies the group and must match
+the formula in the summary query in custom_global_exposures.py.
+
+The weekly report procedure reads the summary when exposure_summary_table is set
+(see sp_pluto_get_weekly_reports.sql and sp_paramount_get_weekly_reports.sql).
+
+Summary mode has its own watermark (destination_table = the _summary table), so the
+first run pulls the default look back. Use backfill_start for a longer history or the
+one time fill from the event table below.
+**/
+
+-- connection settings
+USE ROLE UDW_CLIENTSOLUTIONS_REPORTING_MAINTAINER_ROLE_PROD;
+USE WAREHOUSE UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD_MEDIUM;
+USE DATABASE UDW_PROD;
+USE SCHEMA UDW_CLIENTSOLUTIONS_CS;
+
+
+-- create paramount+ summary table
+CREATE TABLE IF NOT EXISTS udw_clientsolutions_cs.paramount_custom_global_exposure_summary (
+    vao                         INT
+    ,vtifa                      VARCHAR
+    ,exposure_date              DATE
+    ,country                    VARCHAR(8)
+    ,campaign_id                INT
+    ,creative_id                INT
+    ,flight_id                  INT
+    ,type                       INT
+    ,exposure_count             INT
+    ,first_exposure_datetime    TIMESTAMP
+    ,last_exposure_datetime     TIMESTAMP
+    ,date_imported              DATE
+    ,row_hash                   VARCHAR(32)
+)
+CLUSTER BY (exposure_date)
+;
+
+
+-- create pluto summary table
+CREATE TABLE IF NOT EXISTS udw_clientsolutions_cs.pluto_custom_global_exposure_summary (
+    vao                         INT
+    ,vtifa                      VARCHAR
+    ,exposure_date              DATE
+    ,country                    VARCHAR(8)
+    ,campaign_id                INT
+    ,creative_id                INT
+    ,flight_id                  INT
+    ,type                       INT
+    ,exposure_count             INT
+    ,first_exposure_datetime    TIMESTAMP
+    ,last_exposure_datetime     TIMESTAMP
+    ,date_imported              DATE
+    ,row_hash                   VARCHAR(32)
+)
+CLUSTER BY (exposure_date)
+;
+
+
+-- compare row counts of the event and summary tables
+SELECT
+    'pluto' AS partner
+    ,(SELECT COUNT(*) FROM udw_clientsolutions_cs.pluto_custom_global_exposure) AS event_rows
+    ,(SELECT COUNT(*) FROM udw_clientsolutions_cs.pluto_custom_global_exposure_summary) AS summary_rows
+    ,(SELECT SUM(exposure_count) FROM udw_clientsolutions_cs.pluto_custom_global_exposure_summary) AS summary_events
+;
+
+
+/**
+
+-- one time fill of the pluto summary from the event table (repeat for paramount)
+-- the row_hash formula must match the summary query in custom_global_exposures.py
+INSERT INTO udw_clientsolutions_cs.pluto_custom_global_exposure_summary (
+    vao
+    ,vtifa
+    ,exposure_date
+    ,country
+    ,campaign_id
+    ,creative_id
+    ,flight_id
+    ,type
+    ,exposure_count
+    ,first_exposure_datetime
+    ,last_exposure_datetime
+    ,date_imported
+    ,row_hash
+)
+SELECT
+    e.vao
+    ,e.vtifa
+    ,e.exposure_datetime::DATE AS exposure_date
+    ,e.country
+    ,e.campaign_id
+    ,e.creative_id
+    ,e.flight_id
+    ,e.type
+    ,COUNT(*) AS exposure_count
+    ,MIN(e.exposure_datetime) AS first_exposure_datetime
+    ,MAX(e.exposure_datetime) AS last_exposure_datetime
+    ,CURRENT_DATE::DATE AS date_imported
+    ,MD5(
+        COALESCE(e.vao::VARCHAR, '')
+        || '|' || COALESCE(e.vtifa::VARCHAR, '')
+        || '|' || COALESCE(TO_CHAR(e.exposure_datetime::DATE, 'YYYY-MM-DD'), '')
+        || '|' || COALESCE(e.country::VARCHAR, '')
+        || '|' || COALESCE(e.campaign_id::VARCHAR, '')
+        || '|' || COALESCE(e.creative_id::VARCHAR, '')
+        || '|' || COALESCE(e.flight_id::VARCHAR, '')
+        || '|' || COALESCE(e.type::VARCHAR, '')
+    ) AS row_hash
+FROM udw_clientsolutions_cs.pluto_custom_global_exposure e
+GROUP BY
+    1, 2, 3, 4, 5, 6, 7, 8
+;
+
+
+-- copy the event table watermarks so summary mode continues where the event loads stopped
+INSERT INTO udw_clientsolutions_cs.custom_cdw_extraction_state (destination_table, cdw_config, high_water_ts, last_run_ts)
+SELECT
+    destination_table || '_summary'
+    ,cdw_config
+    ,high_water_ts
+    ,last_run_ts
+FROM udw_clientsolutions_cs.custom_cdw_extraction_state
+WHERE
+    destination_table = 'udw_clientsolutions_cs.pluto_custom_global_exposure'
+;
+
+**/
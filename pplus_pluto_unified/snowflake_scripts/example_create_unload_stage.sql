@@ -0,0 +1,31 @@
+/**
+Creates the external stage used by unload_transfer.py for the bulk CDW to UDW
+transfer (large backfills and app usage resets).
+
+CDW writes parquet files to the bucket with UNLOAD and COPY INTO reads them
+from this stage. The stage must point at the root of the bucket set under
+[unloadTransfer] in config.ini, as each transfer gets its own folder below
+the configured prefix.
+
+The storage integration has to be created by an account admin and allowed
+to read the bucket. The bucket also needs the IAM role in iam_role
+(config.ini) so CDW can write to it.
+**/
+
+-- connection settings
+USE ROLE UDW_CLIENTSOLUTIONS_REPORTING_MAINTAINER_ROLE_PROD;
+USE WAREHOUSE UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD_MEDIUM;
+USE DATABASE UDW_PROD;
+USE SCHEMA UDW_CLIENTSOLUTIONS_CS;
+
+
+-- create stage
+CREATE STAGE IF NOT EXISTS udw_clientsolutions_cs.cdw_unload_stage
+    URL = 's3://<bucket>/'
+    STORAGE_INTEGRATION = <storage_integration>
+    FILE_FORMAT = (TYPE = PARQUET USE_LOGICAL_TYPE = TRUE)
+;
+
+
+-- check files left by a transfer (keep_files = true in config.ini)
+LIST @udw_clientsolutions_cs.cdw_unload_stage/cdw_unload/;
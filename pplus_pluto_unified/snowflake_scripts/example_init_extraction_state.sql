@@ -0,0 +1,45 @@
+/**
+Creates the state table used by custom_global_exposures.py to only extract new
+CDW exposure data each night.
+
+One row per destination table (partner) and CDW config (region). high_water_ts is
+the latest exposure_datetime that was loaded successfully. Each run extracts from
+high_water_ts minus late_arrival_grace_hours (config.ini [runSettings]).
+
+For a manual backfill (e.g., the 6 month initial load), pass backfill_start to
+get_exposures_from_cdw_to_udw instead of editing the script.
+**/
+
+-- connection settings
+USE ROLE UDW_CLIENTSOLUTIONS_REPORTING_MAINTAINER_ROLE_PROD;
+USE WAREHOUSE UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD_MEDIUM;
+USE DATABASE UDW_PROD;
+USE SCHEMA UDW_CLIENTSOLUTIONS_CS;
+
+
+-- create state table
+CREATE TABLE IF NOT EXISTS udw_clientsolutions_cs.custom_cdw_extraction_state (
+    destination_table       VARCHAR
+    ,cdw_config             VARCHAR
+    ,high_water_ts          TIMESTAMP
+    ,last_run_ts            TIMESTAMP
+);
+
+
+-- check watermarks
+SELECT * 
+FROM udw_clientsolutions_cs.custom_cdw_extraction_state
+ORDER BY destination_table, cdw_config
+;
+
+
+/**
+
+-- reset a watermark so the next run falls back to the default 2 week look back
+DELETE FROM udw_clientsolutions_cs.custom_cdw_extraction_state
+WHERE 
+    destination_table = 'udw_clientsolutions_cs.pluto_custom_global_exposure'
+    AND cdw_config = 'personalAccountEU'
+;
+
+**/
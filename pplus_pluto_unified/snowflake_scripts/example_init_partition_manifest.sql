@@ -0,0 +1,53 @@
+/**
+Creates the partition manifest used by custom_global_app_use.py to only re-extract
+CDW app usage partitions that changed since they were loaded
+(app_usage_change_detection = true under [runSettings] in config.ini).
+
+One row per destination table (partner), region, and CDW partition (partition_datehour
+for EU, APAC, and SA, partition_date for Nordics). row_count and checksum are the values
+read from CDW when the partition was last loaded. Partitions that have left the
+reporting window are removed by the loader.
+**/
+
+-- connection settings
+USE ROLE UDW_CLIENTSOLUTIONS_REPORTING_MAINTAINER_ROLE_PROD;
+USE WAREHOUSE UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD_MEDIUM;
+USE DATABASE UDW_PROD;
+USE SCHEMA UDW_CLIENTSOLUTIONS_CS;
+
+
+-- create manifest table
+CREATE TABLE IF NOT EXISTS udw_clientsolutions_cs.custom_cdw_partition_manifest (
+    destination_table       VARCHAR
+    ,region                 VARCHAR
+    ,partition_key          VARCHAR(16)
+    ,row_count              BIGINT
+    ,checksum               VARCHAR
+    ,last_loaded_ts         TIMESTAMP
+);
+
+
+-- check partitions loaded per table and region
+SELECT 
+    destination_table
+    ,region
+    ,COUNT(*) AS partitions
+    ,MIN(partition_key) AS first_partition
+    ,MAX(partition_key) AS last_partition
+    ,MAX(last_loaded_ts) AS last_loaded_ts
+FROM udw_clientsolutions_cs.custom_cdw_partition_manifest
+GROUP BY 1, 2
+ORDER BY 1, 2
+;
+
+
+/**
+
+-- reset a region so the next run re-extracts the whole window
+DELETE FROM udw_clientsolutions_cs.custom_cdw_partition_manifest
+WHERE 
+    destination_table = 'udw_clientsolutions_cs.pluto_custom_app_usage'
+    AND region = 'cdw_eu'
+;
+
+**/
@@ -1,60 +1,71 @@
-
-
--- connection settings
-USE ROLE UDW_CLIENTSOLUTIONS_DEFAULT_CONSUMER_ROLE_PROD;
-USE WAREHOUSE UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD_MEDIUM;
-USE DATABASE UDW_PROD;
-USE SCHEMA PUBLIC;
-
-
--- check pluto counts
-SELECT COUNT(*) 
-FROM udw_clientsolutions_cs.pluto_custom_global_exposure 
-LIMIT 1000
-;
-
- /**
-This shows how to reset the exposures table.
-This shouldn't be needed unless you are making changes to the columns
-and want to wipe the data and re=pull everything.
-**/
-
- 
--- check paramount+ counts
-SELECT COUNT(*)  
-FROM udw_clientsolutions_cs.paramount_custom_global_exposure 
-LIMIT 1000
-;
-
-
-/** 
-
--- reset paramount+
-CREATE OR REPLACE TABLE udw_clientsolutions_cs.paramount_custom_global_exposure (
-    vao                     INT
-    ,vtifa                  VARCHAR
-    ,exposure_datetime      TIMESTAMP
-    ,country                VARCHAR(8)
-    ,campaign_id            INT
-    ,creative_id            INT
-    ,flight_id              INT
-    ,type                   INT
-    ,date_imported          DATE
-);
-
-
--- reset pluto   
-CREATE OR REPLACE TABLE udw_clientsolutions_cs.pluto_custom_global_exposure (
-    vao                     INT
-    ,vtifa                  VARCHAR
-    ,exposure_datetime      TIMESTAMP
-    ,country                VARCHAR(8)
-    ,campaign_id            INT
-    ,creative_id            INT
-    ,flight_id              INT
-    ,type                   INT
-    ,date_imported          DATE
-);
-
-**/
-
+
+
+-- connection settings
+USE ROLE UDW_CLIENTSOLUTIONS_DEFAULT_CONSUMER_ROLE_PROD;
+USE WAREHOUSE UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD_MEDIUM;
+USE DATABASE UDW_PROD;
+USE SCHEMA PUBLIC;
+
+
+-- check pluto counts
+SELECT COUNT(*) 
+FROM udw_clientsolutions_cs.pluto_custom_global_exposure 
+LIMIT 1000
+;
+
+ /**
+This shows how to reset the exposures table.
+This shouldn't be needed unless you are making changes to the columns
+and want to wipe the data and re=pull everything.
+**/
+
+ 
+-- check paramount+ counts
+SELECT COUNT(*)  
+FROM udw_clientsolutions_cs.paramount_custom_global_exposure 
+LIMIT 1000
+;
+
+
+/** 
+
+-- reset paramount+
+CREATE OR REPLACE TABLE udw_clientsolutions_cs.paramount_custom_global_exposure (
+    vao                     INT
+    ,vtifa                  VARCHAR
+    ,exposure_datetime      TIMESTAMP
+    ,country                VARCHAR(8)
+    ,campaign_id            INT
+    ,creative_id            INT
+    ,flight_id              INT
+    ,type                   INT
+    ,date_imported          DATE
+    ,row_hash               VARCHAR(32)
+);
+
+
+-- reset pluto   
+CREATE OR REPLACE TABLE udw_clientsolutions_cs.pluto_custom_global_exposure (
+    vao                     INT
+    ,vtifa                  VARCHAR
+    ,exposure_datetime      TIMESTAMP
+    ,country                VARCHAR(8)
+    ,campaign_id            INT
+    ,creative_id            INT
+    ,flight_id              INT
+    ,type                   INT
+    ,date_imported          DATE
+    ,row_hash               VARCHAR(32)
+);
+
+
+-- clear the extraction watermarks so the next run re-pulls
+-- (see example_init_extraction_state.sql)
+DELETE FROM udw_clientsolutions_cs.custom_cdw_extraction_state
+WHERE destination_table IN (
+    'udw_clientsolutions_cs.paramount_custom_global_exposure'
+    ,'udw_clientsolutions_cs.pluto_custom_global_exposure'
+);
+
+**/
+
@@ -0,0 +1,286 @@
+/***********************************
+
+Generate Alexa Audience Files Daily (EU)
+
+Builds the 10% control and the last 45 day segment of one EU country and saves
+them to UDW and s3. Same steps as build_audiences() in alexa_eu.py, which
+transfers the registrations from CDW first (CDW is not reachable from UDW).
+Raises when cdw_[c]_alexa_current_day was not rebuilt today by that transfer.
+
+PARAMETERS
+------------
+country     = 2-digit country code (e.g., 'DE')
+sampling    = (optional) how yesterday's registrations are sampled into the control.
+              'random' = NTILE over a random sort, 'hash' = stable hash buckets of the psid.
+              not set = control_sampling of the country in alexa_eu_run_settings ('random' when it has no row)
+
+TABLES
+------------
+udw_prod.udw_clientsolutions_cs.alexa_eu_run_settings               (written by alexa_eu.py, see task_alexa_register_eu_daily.sql)
+udw_prod.udw_clientsolutions_cs.cdw_[c]_alexa_current_day           (written by alexa_eu.py)
+udw_prod.udw_clientsolutions_cs.cdw_eu_alexa_registers_load_log     (written by alexa_eu.py)
+udw_prod.udw_clientsolutions_cs.cdw_[c]_alexa_last_45_registers     (view, see alexa_eu_registers_daily_migration.sql)
+udw_prod.udw_clientsolutions_cs.cdw_[c]_alexa_new_control
+udw_prod.udw_clientsolutions_cs.cdw_[c]_alexa_new_segment
+
+STAGES
+------------
+@UDW_PROD.UDW_CLIENTSOLUTIONS_CS.audience_planner_remote_files_udw_s/230912_[c]_alexa_register_last_45_230912to231231.csv
+@UDW_PROD.UDW_CLIENTSOLUTIONS_CS.audience_planner_remote_files_udw_s/220601_[c]_alexa_10per_control.csv
+
+RETURNS
+------------
+json with the running time and row count of every step, e.g.,
+{"country": "DE", "sampling": "hash", "total_ms": 5210, "steps": [{"step": "current_control", "rows": 81234, "ms": 410}, ...]}
+
+
+CALL udw_prod.udw_clientsolutions_cs.sp_alexa_register_eu_daily('DE', 'random');
+CALL udw_prod.udw_clientsolutions_cs.sp_alexa_register_eu_daily('DE');
+
+***********************************/
+CREATE OR REPLACE PROCEDURE udw_prod.udw_clientsolutions_cs.sp_alexa_register_eu_daily(country VARCHAR, sampling VARCHAR DEFAULT NULL)
+RETURNS VARCHAR(16777216)
+LANGUAGE SQL
+EXECUTE AS OWNER
+AS $$
+DECLARE
+    c_lower VARCHAR;
+    control_sampling VARCHAR;
+    yesterday_start VARCHAR;
+
+    current_day_table VARCHAR;
+    last_45_table VARCHAR;
+    new_control_table VARCHAR;
+    new_segment_table VARCHAR;
+
+    copy_query VARCHAR;
+    current_day_created DATE;
+
+    run_start TIMESTAMP_LTZ;
+    step_start TIMESTAMP_LTZ;
+    step_rows INT;
+    new_control_rows INT;
+    new_seg_rows INT;
+    steps ARRAY DEFAULT ARRAY_CONSTRUCT();
+
+    stale_transfer EXCEPTION (-20001, 'cdw_[c]_alexa_current_day was not rebuilt today. Run the CDW transfer in alexa_eu.py first.');
+
+BEGIN
+
+    -- set variables
+    run_start := CURRENT_TIMESTAMP();
+    c_lower := LOWER(country);
+
+    -- the tasks call the procedure without a sampling. alexa_eu.py saves the configured one first
+    control_sampling := sampling;
+    IF (control_sampling IS NULL) THEN
+        control_sampling := COALESCE(
+            (SELECT MAX(control_sampling) FROM udw_prod.udw_clientsolutions_cs.alexa_eu_run_settings WHERE country = :country)
+            ,'random'
+        );
+    END IF;
+
+    -- the latest day loaded by alexa_eu.py (its clock, not the session timezone).
+    -- the load log also has the days without registrations
+    yesterday_start := (
+        SELECT CONCAT(TO_CHAR(MAX(register_date),'yyyymmdd'),'00')
+        FROM udw_prod.udw_clientsolutions_cs.cdw_eu_alexa_registers_load_log
+        WHERE country = :country
+    );
+
+    current_day_table := 'udw_prod.udw_clientsolutions_cs.cdw_' || c_lower || '_alexa_current_day';
+    last_45_table := 'udw_prod.udw_clientsolutions_cs.cdw_' || c_lower || '_alexa_last_45_registers';
+    new_control_table := 'udw_prod.udw_clientsolutions_cs.cdw_' || c_lower || '_alexa_new_control';
+    new_segment_table := 'udw_prod.udw_clientsolutions_cs.cdw_' || c_lower || '_alexa_new_segment';
+
+
+    -- the control is cumulative. sampling from a current_day left by an earlier run would add
+    -- a second sample of the same registrations to the control for good, so refuse to run
+    current_day_created := (
+        SELECT created::DATE
+        FROM udw_prod.information_schema.tables
+        WHERE
+            table_schema = 'UDW_CLIENTSOLUTIONS_CS'
+            AND table_name = UPPER('cdw_' || :c_lower || '_alexa_current_day')
+    );
+
+    IF (current_day_created IS NULL OR current_day_created < CURRENT_DATE()) THEN
+        RAISE stale_transfer;
+    END IF;
+
+
+    /***********************
+     previous control
+    ***********************/
+    -- the "current control" is the previous "new control"
+    step_start := CURRENT_TIMESTAMP();
+
+    DROP TABLE IF EXISTS current_control;
+    CREATE TEMP TABLE current_control AS (
+        SELECT psid
+        FROM IDENTIFIER(:new_control_table)
+    );
+
+    step_rows := (SELECT COUNT(*) FROM current_control);
+    steps := ARRAY_APPEND(steps, OBJECT_CONSTRUCT('step', 'current_control', 'rows', step_rows, 'ms', DATEDIFF('millisecond', step_start, CURRENT_TIMESTAMP())));
+
+
+    /***********************
+     create the control group and segment
+    ***********************/
+    step_start := CURRENT_TIMESTAMP();
+
+    IF (control_sampling = 'hash') THEN
+
+        -- every psid sampled by hash is in the first 10 of 100 buckets, so the hash alone keeps them
+        -- out of the segment. only control psids outside those buckets (sampled at random before the
+        -- hash sampling) are joined. unlike the whole control, that set does not grow
+        DROP TABLE IF EXISTS random_sampled_control;
+        CREATE TEMP TABLE random_sampled_control AS (
+            SELECT psid
+            FROM current_control
+            WHERE MOD(ABS(HASH(psid, 'alexa_eu_control')), 100) >= 10
+        );
+
+        -- one pass over the last 45 day registrations. yesterday's registrations go to the control
+        -- when the hash of the psid falls in the first 10 of 100 buckets (same salt as alexa_eu.py)
+        DROP TABLE IF EXISTS audience_split;
+        CREATE TEMP TABLE audience_split AS (
+            SELECT
+                l.psid
+                ,MOD(ABS(HASH(l.psid, 'alexa_eu_control')), 100) < 10 AS in_bucket
+                ,in_bucket AND l.last_register_hour >= :yesterday_start AS in_control
+                ,rc.psid IS NOT NULL AS in_random_sampled_control
+            FROM IDENTIFIER(:last_45_table) l
+                LEFT JOIN random_sampled_control rc ON rc.psid = l.psid
+        );
+
+        DROP TABLE IF EXISTS new_control;
+        CREATE TEMP TABLE new_control AS (
+            SELECT psid FROM current_control
+            UNION
+            SELECT psid FROM audience_split WHERE in_control
+        );
+
+        DROP TABLE IF EXISTS new_seg;
+        CREATE TEMP TABLE new_seg AS (
+            SELECT psid
+            FROM audience_split
+            WHERE
+                NOT in_bucket
+                AND NOT in_random_sampled_control
+        );
+
+    ELSE
+
+        -- 10% random sample of yesterday's registrations
+        DROP TABLE IF EXISTS aa_seg_100;
+        CREATE TEMP TABLE aa_seg_100 AS (
+            SELECT
+                psid,
+                NTILE(100) OVER (ORDER BY RANDOM()) rownum
+            FROM IDENTIFIER(:current_day_table)
+        );
+
+        DROP TABLE IF EXISTS control;
+        CREATE TEMP TABLE control AS (
+            SELECT DISTINCT
+                psid
+            FROM aa_seg_100
+            WHERE
+                rownum <= 10
+        );
+
+        -- new control = DISTINCT (this control + previous control)
+        DROP TABLE IF EXISTS new_control;
+        CREATE TEMP TABLE new_control AS (
+            SELECT psid FROM control
+            UNION
+            SELECT psid FROM current_control
+        );
+
+        -- new segment = last 45 day registrations - new control
+        DROP TABLE IF EXISTS new_seg;
+        CREATE TEMP TABLE new_seg AS (
+            SELECT
+                l.psid
+            FROM IDENTIFIER(:last_45_table) l
+                LEFT JOIN new_control nc ON nc.psid = l.psid
+            WHERE
+                nc.psid IS NULL
+        );
+
+    END IF;
+
+    new_control_rows := (SELECT COUNT(*) FROM new_control);
+    steps := ARRAY_APPEND(steps, OBJECT_CONSTRUCT('step', 'new_control', 'rows', new_control_rows, 'ms', DATEDIFF('millisecond', step_start, CURRENT_TIMESTAMP())));
+
+    step_start := CURRENT_TIMESTAMP();
+    new_seg_rows := (SELECT COUNT(*) FROM new_seg);
+    steps := ARRAY_APPEND(steps, OBJECT_CONSTRUCT('step', 'new_seg', 'rows', new_seg_rows, 'ms', DATEDIFF('millisecond', step_start, CURRENT_TIMESTAMP())));
+
+
+    /***********************
+     save to UDW
+    ***********************/
+    step_start := CURRENT_TIMESTAMP();
+
+    CREATE OR REPLACE TABLE IDENTIFIER(:new_control_table) AS (
+        SELECT psid
+        FROM new_control
+    );
+
+    CREATE OR REPLACE TABLE IDENTIFIER(:new_segment_table) AS (
+        SELECT psid
+        FROM new_seg
+    );
+
+    -- rows written to both tables
+    step_rows := new_control_rows + new_seg_rows;
+    steps := ARRAY_APPEND(steps, OBJECT_CONSTRUCT('step', 'save_udw', 'rows', step_rows, 'ms', DATEDIFF('millisecond', step_start, CURRENT_TIMESTAMP())));
+
+
+    /***********************
+     save to s3
+    ***********************/
+    -- stage paths cannot be bound, so the unloads run as dynamic sql
+    step_start := CURRENT_TIMESTAMP();
+
+    copy_query := 'COPY INTO @UDW_PROD.UDW_CLIENTSOLUTIONS_CS.audience_planner_remote_files_udw_s/230912_' || c_lower || '_alexa_register_last_45_230912to231231.csv
+        FROM (SELECT DISTINCT psid FROM new_seg)
+        file_format = (format_name = adbiz_data.analytics_csv COMPRESSION = ''none'')
+        single = TRUE
+        header = TRUE
+        overwrite = TRUE
+        max_file_size = 4900000000';
+
+    EXECUTE IMMEDIATE :copy_query;
+    step_rows := (SELECT SUM("rows_unloaded") FROM TABLE(RESULT_SCAN(LAST_QUERY_ID())));
+    steps := ARRAY_APPEND(steps, OBJECT_CONSTRUCT('step', 'save_s3_segment', 'rows', step_rows, 'ms', DATEDIFF('millisecond', step_start, CURRENT_TIMESTAMP())));
+
+
+    step_start := CURRENT_TIMESTAMP();
+
+    copy_query := 'COPY INTO @UDW_PROD.UDW_CLIENTSOLUTIONS_CS.audience_planner_remote_files_udw_s/220601_' || c_lower || '_alexa_10per_control.csv
+        FROM (SELECT DISTINCT psid FROM new_control)
+        file_format = (format_name = adbiz_data.analytics_csv COMPRESSION = ''none'')
+        single = TRUE
+        header = TRUE
+        overwrite = TRUE
+        max_file_size = 4900000000';
+
+    EXECUTE IMMEDIATE :copy_query;
+    step_rows := (SELECT SUM("rows_unloaded") FROM TABLE(RESULT_SCAN(LAST_QUERY_ID())));
+    steps := ARRAY_APPEND(steps, OBJECT_CONSTRUCT('step', 'save_s3_control', 'rows', step_rows, 'ms', DATEDIFF('millisecond', step_start, CURRENT_TIMESTAMP())));
+
+
+    RETURN TO_JSON(OBJECT_CONSTRUCT(
+        'country', country
+        ,'sampling', control_sampling
+        ,'total_ms', DATEDIFF('millisecond', run_start, CURRENT_TIMESTAMP())
+        ,'steps', steps
+    ));
+
+END;
+$$
+;
@@ -0,0 +1,67 @@
+/**
+ Create tasks.
+
+ The registrations are transferred from CDW by alexa_eu.py. With alexa_audience_build = transfer
+ under [runSettings] in config.ini, the script only does the CDW transfer and then starts the task
+ of the country (EXECUTE TASK) once its transfer succeeded. It waits for the run in TASK_HISTORY
+ and fails when the run fails.
+
+ The task definitions are never changed by the script. The tasks call sp_alexa_register_eu_daily
+ without a sampling, so it reads control_sampling of the country from alexa_eu_run_settings. The
+ script saves alexa_control_sampling there before it starts the task.
+
+ The tasks have no schedule on purpose. The control is cumulative, so a run on a late or failed
+ transfer would add a second sample of old registrations to it. sp_alexa_register_eu_daily also
+ refuses to run when cdw_[c]_alexa_current_day was not rebuilt today.
+
+ With alexa_audience_build = procedure the script calls sp_alexa_register_eu_daily itself and the
+ tasks are not used.
+
+ Steps (Do on https://app.snowflake.com/ not DbVisualizer):
+ 1. Create stored procedure (sp_alexa_register_eu_daily.sql)
+ 2. Create the run settings table
+ 3. Create a task per country for stored procedure
+ 4. View tasks with "SHOW TASKS". Tasks stay "suspended". They only run when alexa_eu.py starts them.
+ 5. View the runs started by alexa_eu.py
+**/
+
+
+-- Step 2.
+-- one row per country. written by alexa_eu.py before it starts the task of the country
+CREATE TABLE IF NOT EXISTS udw_prod.udw_clientsolutions_cs.alexa_eu_run_settings (
+    country                 VARCHAR(2)
+    ,control_sampling       VARCHAR(10)
+    ,updated_at             TIMESTAMP_LTZ
+);
+
+
+
+-- Step 3.
+-- no SCHEDULE. started by alexa_eu.py after the CDW transfer of the country
+CREATE OR REPLACE TASK udw_prod.udw_clientsolutions_cs.task_alexa_register_eu_daily_de
+  WAREHOUSE = 'UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD'
+AS
+  CALL udw_prod.udw_clientsolutions_cs.sp_alexa_register_eu_daily('DE');
+
+
+CREATE OR REPLACE TASK udw_prod.udw_clientsolutions_cs.task_alexa_register_eu_daily_gb
+  WAREHOUSE = 'UDW_CLIENTSOLUTIONS_DEFAULT_WH_PROD'
+AS
+  CALL udw_prod.udw_clientsolutions_cs.sp_alexa_register_eu_daily('GB');
+
+
+
+-- Step 4
+-- view tasks
+SHOW TASKS;
+
+
+
+-- Step 5
+-- the step timings returned by each run are in the RETURN_VALUE column
+SELECT name, state, scheduled_time, completed_time, return_value, error_message
+FROM TABLE(udw_prod.information_schema.task_history())
+WHERE name ILIKE 'task_alexa_register_eu_daily%'
+ORDER BY scheduled_time DESC
+LIMIT 10
+;